@@ -9,6 +9,13 @@ from psycopg2.extras import RealDictCursor
 from flask import Flask, jsonify, render_template, request, session, redirect, url_for, g, make_response
 from werkzeug.security import generate_password_hash, check_password_hash
 
+import cache_bus
+import db
+import identity
+import metrics
+import refcache
+import scheduler
+from commands import register_commands
 from db import get_connection
 
 from blueprints.admin import admin_bp
@@ -20,6 +27,11 @@ from blueprints.player import player_bp
 
 app = Flask(__name__)
 app.secret_key = os.environ.get("FLASK_SECRET_KEY", "dev-secret-key")
+db.init_app(app)
+metrics.init_app(app)
+scheduler.init_app(app)
+cache_bus.init_app(app)
+register_commands(app)
 
 app.register_blueprint(admin_bp)
 app.register_blueprint(superadmin_bp)
@@ -74,97 +86,18 @@ def inject_now():
 
 @app.before_request
 def _set_default_banner():
-    # Fetch user name if logged in
-    user_id = session.get("user_id")
-    g.user_first_name = None
-    g.user_last_name = None
-    if user_id:
-        conn = get_connection()
+    # Identity is cached in the session at login (see identity.py), so this
+    # normally costs no database round trip
+    user = None
+    if session.get("user_id"):
         try:
-            with conn.cursor() as cur:
-                cur.execute(
-                    "SELECT FirstName, LastName FROM Users WHERE UsersID = %s;",
-                    (user_id,),
-                )
-                row = cur.fetchone()
-                if row:
-                    g.user_first_name = row[0]
-                    g.user_last_name = row[1]
-        except Exception:
+            user = identity.current(session)
+        except psycopg2.Error:
             pass  # Silently fail if DB query fails
-        finally:
-            conn.close()
-    
-    role = session.get("role")
-    if role == "superadmin":
-        g.banner_view_endpoint = "superadmin.view_tournaments"
-        g.banner_league_endpoint = "superadmin.view_leagues"
-        g.banner_all_matches_endpoint = None
-        g.banner_create_league_endpoint = None
-        g.banner_owner_endpoint = None
-        g.banner_reports_endpoint = None
-        g.banner_statistics_endpoint = None
-    elif role in ("admin", "tournament_admin"):
-        g.banner_view_endpoint = "admin.view_tournaments"
-        g.banner_league_endpoint = "admin.view_leagues"
-        g.banner_all_matches_endpoint = "admin.view_all_matches_lock"
-        g.banner_create_league_endpoint = None
-        g.banner_owner_endpoint = None
-        g.banner_reports_endpoint = "admin.reports"
-        g.banner_statistics_endpoint = None
-        g.banner_team_rankings_endpoint = "admin.team_rankings"
-        g.banner_player_rankings_endpoint = "admin.player_rankings"
-    elif role == "team_owner":
-        g.banner_view_endpoint = None
-        g.banner_league_endpoint = None
-        g.banner_all_matches_endpoint = None
-        g.banner_create_league_endpoint = None
-        g.banner_home_endpoint = "home_team_owner"
-        g.banner_owner_endpoint = "owner.view_teams"
-        g.banner_reports_endpoint = None
-        g.banner_statistics_endpoint = None
-        g.banner_employ_coach_endpoint = "owner.employ_coach"
-    elif role == "coach":
-        g.banner_view_endpoint = None
-        g.banner_league_endpoint = None
-        g.banner_all_matches_endpoint = None
-        g.banner_create_league_endpoint = None
-        g.banner_owner_endpoint = "coach.view_team"
-        g.banner_reports_endpoint = None
-        g.banner_statistics_endpoint = None
-        g.banner_transfer_market_endpoint = "coach.view_transfer_market"
-        g.banner_view_team_offers_endpoint = "coach.view_team_offers"
-        g.banner_assign_training_endpoint = "coach.view_trainings"
-    elif role == "player":
-        g.banner_view_endpoint = None
-        g.banner_league_endpoint = None
-        g.banner_all_matches_endpoint = None
-        g.banner_create_league_endpoint = None
-        g.banner_home_endpoint = "player.home"
-        g.banner_owner_endpoint = "player.view_team"
-        g.banner_reports_endpoint = None
-        g.banner_statistics_endpoint = None
-        g.banner_trainings_endpoint = "player.view_trainings"
-        g.banner_offers_endpoint = "player.view_offers"
-    elif role == "referee":
-        g.banner_view_endpoint = None
-        g.banner_league_endpoint = None
-        g.banner_all_matches_endpoint = None
-        g.banner_create_league_endpoint = None
-        g.banner_owner_endpoint = None
-        g.banner_reports_endpoint = None
-        g.banner_statistics_endpoint = None
-        g.banner_assigned_matches_endpoint = "artunsPart.view_referee_dashboard"
-    else:
-        g.banner_view_endpoint = None
-        g.banner_league_endpoint = None
-        g.banner_all_matches_endpoint = None
-        g.banner_create_league_endpoint = None
-        g.banner_owner_endpoint = None
-        g.banner_reports_endpoint = None
-        g.banner_statistics_endpoint = None
-    g.banner_create_endpoint = None
-    g.banner_allow_create = False
+    g.user_first_name = user["first_name"] if user else None
+    g.user_last_name = user["last_name"] if user else None
+    g.user_team_id = user["team_id"] if user else None
+    identity.apply_banner(g, session.get("role"))
 
 
 # Role to home endpoint mapping - tournamnet-admin is now also league admin
@@ -221,6 +154,7 @@ def login():
             #user = _authenticate_user_bypass(email, password)
             session["user_id"] = user["id"]
             session["role"] = user["role"]
+            identity.remember(session, user["id"])
 
             # Determine redirect URL
             next_path = session.pop("next", None)
@@ -500,6 +434,7 @@ def _insert_user(cur, data):
             data["nationality"],
         ),
     )
+    refcache.bump("user")
     return cur.fetchone()[0]
 
 
@@ -518,6 +453,7 @@ def _insert_player(cur, user_id, height, weight, position):
         """,
         (user_id, height, weight, None, position, "eligible"),
     )
+    refcache.bump("player")
 
 
 def _insert_coach(cur, user_id, certification):
@@ -1,4 +1,20 @@
+from datetime import datetime
+
+import psycopg2
+import revision
+import singleflight
 from db import get_connection
+from db_helper import (
+    PLAY_SHEET_FIELDS,
+    bulk_set_match_lock,
+    fetch_all_teams,
+    fetch_leagues_for_dropdown,
+    fetch_season_dates_for_dropdown,
+    fetch_tournaments_for_dropdown,
+    lock_match_by_referee,
+    save_play_sheet,
+    toggle_tournament_match_lock_by_admin,
+)
 from psycopg2.extras import RealDictCursor
 from flask import Flask, request, jsonify, Blueprint, render_template
 
@@ -57,73 +73,81 @@ def execute_query(query, params=None, fetch_one=False, fetch_all=False, commit=F
 # ------------------------------------------------------------------------------
 
 
+REFEREE_FEED_PAGE_SIZE = 50
+REFEREE_FEED_MAX_PAGE_SIZE = 200
+
+
+def _id_list(raw):
+    """'1, 2,3' -> [1, 2, 3]; raises ValueError on anything that is not an id."""
+    return [int(part) for part in raw.split(',') if part.strip()]
+
+
 @artunsPart.route('/referee/matches', methods=['GET'])
 def get_referee_matches():
     """
     Corresponds to Figure 8 & Source [1002-1005].
-    Retrieves assigned matches for the referee for the current day.
+    Retrieves assigned matches for the referee, oldest kickoff first.
     Supports multiple selections for teams, leagues, and tournaments.
+    Pages by (matchstartdatetime, matchid): pass the X-Next-Cursor header of the
+    previous page back as ?after= to get the next one.
     """
-    ref_id = request.args.get('referee_id')
-    team_ids = request.args.get('team_ids', '')
-    league_ids = request.args.get('league_ids', '')
-    tourn_ids = request.args.get('tournament_ids', '')
-
+    ref_id = request.args.get('referee_id', type=int)
     if not ref_id:
         return jsonify({'error': 'Referee ID is required'}), 400
 
+    try:
+        team_list = _id_list(request.args.get('team_ids', ''))
+        league_list = _id_list(request.args.get('league_ids', ''))
+        tourn_list = _id_list(request.args.get('tournament_ids', ''))
+        after = request.args.get('after')
+        if after:
+            after_start, after_id = after.rsplit(',', 1)
+            after = (datetime.fromisoformat(after_start), int(after_id))
+    except ValueError:
+        return jsonify({'error': 'Invalid filter or cursor'}), 400
+
+    limit = request.args.get('limit', REFEREE_FEED_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, REFEREE_FEED_MAX_PAGE_SIZE))
+
     query = """
         SELECT *
         FROM RefereeMatchView
         WHERE refereeid = %s
     """
+    params = [ref_id]
 
     if 'today' in request.args:
-        query += "AND matchstartdatetime::date = CURRENT_DATE"
-
-    params = [ref_id]
+        query += " AND matchstartdatetime >= CURRENT_DATE AND matchstartdatetime < CURRENT_DATE + 1"
 
     # [cite_start]Dynamic Filtering [cite: 991, 1002]
-    # Handle multiple team selections
-    if team_ids:
-        team_list = [tid.strip() for tid in team_ids.split(',') if tid.strip()]
-        if team_list:
-            team_conditions = []
-            for team_id in team_list:
-                team_conditions.append("(hometeamid = %s OR awayteamid = %s)")
-                params.extend([team_id, team_id])
-            query += " AND (" + " OR ".join(team_conditions) + ")"
+    if team_list:
+        query += " AND (hometeamid = ANY(%s) OR awayteamid = ANY(%s))"
+        params.extend([team_list, team_list])
 
     # Competition filter (Multiple Leagues OR Multiple Tournaments)
     competition_conditions = []
-    
-    # Handle multiple league selections
-    if league_ids:
-        league_list = [lid.strip() for lid in league_ids.split(',') if lid.strip()]
-        for league_id in league_list:
-            competition_conditions.append("competitionname = (SELECT Name FROM League WHERE LeagueID = %s)")
-            params.append(league_id)
-    
-    # Handle multiple tournament selections
-    if tourn_ids:
-        tourn_list = [tid.strip() for tid in tourn_ids.split(',') if tid.strip()]
-        for tourn_id in tourn_list:
-            competition_conditions.append("competitionname = (SELECT Name FROM Tournament WHERE TournamentID = %s)")
-            params.append(tourn_id)
-    
-    # Join all competition conditions with OR
+    if league_list:
+        competition_conditions.append("(competitiontype = 'league' AND competitionid = ANY(%s))")
+        params.append(league_list)
+    if tourn_list:
+        competition_conditions.append("(competitiontype = 'tournament' AND competitionid = ANY(%s))")
+        params.append(tourn_list)
     if competition_conditions:
         query += " AND (" + " OR ".join(competition_conditions) + ")"
 
-    query += ";"
+    if after:
+        query += " AND (matchstartdatetime, matchid) > (%s, %s)"
+        params.extend(after)
 
-    # Debug logging
-    print(f"[DEBUG] Referee Matches Query: {query}")
-    print(f"[DEBUG] Parameters: {params}")
+    query += " ORDER BY matchstartdatetime, matchid LIMIT %s;"
+    params.append(limit + 1)
 
-    matches = execute_query(query, tuple(params), fetch_all=True)
-    print(f"[DEBUG] Found {len(matches) if matches else 0} matches")
-    return jsonify(matches if matches else [])
+    matches = execute_query(query, tuple(params), fetch_all=True) or []
+    response = jsonify(matches[:limit])
+    if len(matches) > limit:
+        last = matches[limit - 1]
+        response.headers['X-Next-Cursor'] = f"{last['matchstartdatetime'].isoformat()},{last['matchid']}"
+    return response
 
 
 @artunsPart.route('/referee/filters', methods=['GET'])
@@ -132,12 +156,9 @@ def get_referee_filter_options():
     Corresponds to Source [992-1000].
     Populates dropdowns for Teams, Leagues, and Tournaments.
     """
-    teams = execute_query(
-        "SELECT teamid, teamname FROM Team ORDER BY teamname;", fetch_all=True)
-    leagues = execute_query(
-        "SELECT leagueid, name AS leaguename FROM League ORDER BY name;", fetch_all=True)
-    tournaments = execute_query(
-        "SELECT tournamentid, name AS tournamentname FROM Tournament ORDER BY name;", fetch_all=True)
+    teams = fetch_all_teams()
+    leagues = fetch_leagues_for_dropdown()
+    tournaments = fetch_tournaments_for_dropdown()
 
     return jsonify({
         'teams': teams,
@@ -184,7 +205,7 @@ def get_home_roster(match_id):
             LEFT JOIN Play P1 ON P1.matchid = M1.matchid AND P1.playerid = U1.usersid
             LEFT JOIN Users U2 ON (P1.substitutionid = U2.usersid)
         WHERE M1.matchid = %s
-        AND (M1.matchstartdatetime BETWEEN A1.startdate AND COALESCE(A1.enddate, NOW() + INTERVAL '1 year'))
+        AND A1.period @> M1.matchstartdatetime
         ORDER BY U1.firstname, U1.lastname;
     """
     roster = execute_query(query, (match_id,), fetch_all=True)
@@ -225,7 +246,7 @@ def get_away_roster(match_id):
             LEFT JOIN Play P1 ON (P1.matchid = M1.matchid AND P1.playerid = U1.usersid)
             LEFT JOIN Users U2 ON (P1.substitutionid = U2.usersid)
         WHERE M1.matchid = %s
-        AND (M1.matchstartdatetime BETWEEN A1.startdate AND COALESCE(A1.enddate, NOW() + INTERVAL '1 year'))
+        AND A1.period @> M1.matchstartdatetime
         ORDER BY U1.firstname, U1.lastname;
     """
     roster = execute_query(query, (match_id,), fetch_all=True)
@@ -246,7 +267,7 @@ def get_substitute_roster():
         JOIN Users U USING (usersid)
         CROSS JOIN playdate PD
         WHERE AE.teamid = %s AND AE.usersid <> %s
-        AND ( PD.value BETWEEN AE.startdate AND AE.enddate )
+        AND AE.period @> PD.value
         AND NOT EXISTS (SELECT injuryid FROM Injury
                 WHERE playerid = U.usersid
                 AND (PD.value BETWEEN injurydate AND recoverydate))
@@ -279,36 +300,27 @@ def save_play_info():
     """
     data = request.json
 
-    # 1. Try UPDATE first
-    update_query = """
-        UPDATE Play
-        SET SubstitutionID = %s, StartTime = %s, StopTime = %s,
-            SuccessfulPasses = %s, GoalsScored = %s, AssistsMade = %s,
-            TotalPasses = %s, YellowCards = %s, RedCards = %s,
-            Saves = %s, PenaltiesScored = %s
-        WHERE playid = %s
-    """
+    # Saved through the same single-statement path as the referee play sheet
+    play = {field: data.get(field) for field in PLAY_SHEET_FIELDS}
+    play["playid"] = data.get('playid')
+    if play["substitutionid"] == '':
+        play["substitutionid"] = None
 
-    substitutionId = data.get('substitutionid')
-    if substitutionId == '':
-        substitutionId = None
-
-    update_params = (
-        substitutionId,
-        data.get('starttime'),
-        data.get('stoptime'),
-        data.get('successfulpasses'),
-        data.get('goalsscored'),
-        data.get('assistsmade'),
-        data.get('totalpasses'),
-        data.get('yellowcards'),
-        data.get('redcards'),
-        data.get('saves'),
-        data.get('penaltiesscored'),
-        data.get('playid'),
-    )
+    match_id = data.get('matchid')
+    if match_id is None:
+        row = execute_query("SELECT matchid FROM Play WHERE playid = %s", (data.get('playid'),), fetch_one=True)
+        match_id = row['matchid'] if row else None
+    if match_id is None:
+        return jsonify({"error": "Play not found"}), 404
 
-    result = execute_query(update_query, update_params, commit=True)
+    try:
+        save_play_sheet(match_id, [play])
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except psycopg2.Error as e:
+        print(f"Query Error: {e}")
+        return jsonify({"error": "Database error"}), 500
+    result = "success"
 
     # According to the design play shouldn't be inserted manually
     # if not result:
@@ -462,12 +474,9 @@ def get_admin_filter_options():
     Corresponds to Source [1374-1382].
     Dropdowns for Admin Match View (Season, League, Tournament).
     """
-    seasons = execute_query(
-        "SELECT DISTINCT SeasonYear FROM Season ORDER BY SeasonYear;", fetch_all=True)
-    leagues = execute_query(
-        "SELECT leagueid, name AS leaguename FROM League ORDER BY name;", fetch_all=True)
-    tournaments = execute_query(
-        "SELECT tournamentid, name AS tournamentname FROM Tournament ORDER BY name;", fetch_all=True)
+    seasons = fetch_season_dates_for_dropdown()
+    leagues = fetch_leagues_for_dropdown()
+    tournaments = fetch_tournaments_for_dropdown()
 
     return jsonify({'seasons': seasons, 'leagues': leagues, 'tournaments': tournaments})
 
@@ -503,53 +512,72 @@ def lock_match():
         if result:
             return jsonify({'status': 'success', 'type': 'season', 'matchid': result['matchid']})
 
-        # 2. Attempt lock/unlock for Tournament Match (Source 1397)
-        query_tournament = """
-            UPDATE Match M1
-            SET IsLocked = NOT IsLocked
-            WHERE EXISTS (
-                SELECT 1
-                FROM TournamentModeration TMOD
-                JOIN Tournament T ON TMOD.T_ID = T.TournamentID
-                JOIN Round R ON T.TournamentID = R.TournamentID
-                JOIN TournamentMatch TM ON R.T_MatchID = TM.MatchID
-                WHERE TM.MatchID = %s
-                AND M1.MatchID = TM.MatchID
-                AND TMOD.AdminID = %s
-            ) RETURNING MatchID;
-        """
-        result = execute_query(query_tournament, (mid, aid), commit=True)
-
-        if result:
-            return jsonify({'status': 'success', 'type': 'tournament', 'matchid': result['matchid']})
+        # 2. Attempt lock/unlock for Tournament Match (Source 1397); a lock advances
+        # the bracket in the same transaction
+        if toggle_tournament_match_lock_by_admin(mid, aid):
+            return jsonify({'status': 'success', 'type': 'tournament', 'matchid': int(mid)})
 
     if 'refereeid' in data:
         rid = data.get('refereeid')
 
-        # 1. Attempt lock for Seasonal Match (Source 1386)
-        query_season = """
-            UPDATE Match M1
-            SET IsLocked = TRUE
-            WHERE M1.MatchID = %s
-            AND EXISTS (
-                SELECT 1
-                FROM RefereeMatchAttendance RMa1
-                WHERE RMa1.MatchID = M1.MatchID
-                AND RMa1.RefereeID = %s
-            ) RETURNING MatchID;
-        """
-        result = execute_query(query_season, (mid, rid), commit=True)
+        # Lock any match the referee is assigned to (Source 1386); tournament matches
+        # advance their bracket in the same transaction
+        competition = lock_match_by_referee(mid, rid)
 
-        if result:
-            return jsonify({'status': 'success', 'type': 'season', 'matchid': result['matchid']})
+        if competition:
+            return jsonify({'status': 'success', 'type': competition, 'matchid': int(mid)})
 
     return jsonify({'status': 'failed', 'message': 'Match not found or Admin unauthorized'}), 403
 
+@artunsPart.route('/match/lock/bulk', methods=['POST'])
+def bulk_lock_matches():
+    """
+    Locks (lock: true, the default) or unlocks every match of a league season
+    (leagueid, seasonno, seasonyear), a tournament (tournamentid), a kickoff range
+    (date_from inclusive, date_to exclusive, ISO) and/or matchids, for an admin,
+    in one permission check and one UPDATE.
+    """
+    data = request.json or {}
+    aid = data.get('adminid')
+    if not aid:
+        return jsonify({'error': 'Admin ID is required'}), 400
+    lock = data.get('lock', True)
+    # "false" or 0 must not lock by being truthy
+    if not isinstance(lock, bool):
+        return jsonify({'error': 'lock must be true or false'}), 400
+
+    try:
+        date_from = data.get('date_from')
+        date_to = data.get('date_to')
+        result = bulk_set_match_lock(
+            aid,
+            lock,
+            league_id=data.get('leagueid'),
+            season_no=data.get('seasonno'),
+            season_year=data.get('seasonyear'),
+            tournament_id=data.get('tournamentid'),
+            date_from=datetime.fromisoformat(date_from) if date_from else None,
+            date_to=datetime.fromisoformat(date_to) if date_to else None,
+            match_ids=data.get('matchids'),
+        )
+    except PermissionError as e:
+        return jsonify({'status': 'failed', 'message': str(e)}), 403
+    except (TypeError, ValueError) as e:
+        return jsonify({'status': 'failed', 'message': str(e)}), 400
+
+    return jsonify(dict(result, status='success'))
+
 # ------------------------------------------------------------------------------
 # [cite_start]2.6 Player Statistics [cite: 1431, 1440, 1469]
 # ------------------------------------------------------------------------------
 
 
+def _league_scope(raw_league_id):
+    # a malformed id matches nothing; fall back to the revision of every league
+    league_id = str(raw_league_id or "").strip()
+    return ("league", int(league_id) if league_id.isdigit() else None)
+
+
 @artunsPart.route('/stats/player/season', methods=['GET'])
 def get_player_season_stats():
     """
@@ -561,16 +589,20 @@ def get_player_season_stats():
     sno = request.args.get('seasonno')
     syear = request.args.get('seasonyear')
 
+    etag, not_modified = revision.check([_league_scope(lid)])
+    if not_modified:
+        return not_modified
+
     query = """
         SELECT *
-        FROM PlayerSeasonStats PS1
+        FROM PlayerSeasonStatsCached PS1
         WHERE PS1.usersid = %s
         AND PS1.leagueid = %s
         AND PS1.seasonno = %s
         AND PS1.seasonyear = %s;
     """
     stats = execute_query(query, (pid, lid, sno, syear), fetch_all=True)
-    return jsonify(stats)
+    return revision.tagged(jsonify(stats), etag)
 
 
 @artunsPart.route('/stats/player/tournament', methods=['GET'])
@@ -580,9 +612,15 @@ def get_player_tournament_stats():
     Get stats for a player in a specific tournament.
     """
     uid = request.args.get('usersid')
-    query = "SELECT * FROM PlayerTournamentStats WHERE usersid = %s;"
+
+    # every tournament the player played in
+    etag, not_modified = revision.check([("tournament", None)])
+    if not_modified:
+        return not_modified
+
+    query = "SELECT * FROM PlayerTournamentStatsCached WHERE usersid = %s;"
     stats = execute_query(query, (uid,), fetch_all=True)
-    return jsonify(stats)
+    return revision.tagged(jsonify(stats), etag)
 
 
 @artunsPart.route('/stats/season/top_scorer', methods=['GET'])
@@ -595,15 +633,32 @@ def get_season_top_scorer():
     sno = request.args.get('seasonno')
     syear = request.args.get('seasonyear')
 
+    etag, not_modified = revision.check([_league_scope(lid)])
+    if not_modified:
+        return not_modified
+
+    scorers = _season_top_scorers(lid, sno, syear, etag)
+    if scorers is None:
+        return jsonify(scorers)
+    return revision.tagged(jsonify(scorers), etag)
+
+
+# etag carries the league's data revision, so a kept result is never older than the
+# data; within TOP_SCORER_MAX_AGE identical requests share one query
+TOP_SCORER_MAX_AGE = 60
+
+
+@singleflight.coalesce(max_age=TOP_SCORER_MAX_AGE)
+def _season_top_scorers(lid, sno, syear, etag):
     query = """
         SELECT *
-        FROM PlayerSeasonStats PS1
+        FROM PlayerSeasonStatsCached PS1
         WHERE PS1.leagueid = %s
         AND PS1.seasonno = %s
         AND PS1.seasonyear = %s
-        AND PS1.totalgoals = (
-            SELECT MAX(totalgoals)
-            FROM PlayerSeasonStats PS2
+        AND PS1.total_goals = (
+            SELECT MAX(total_goals)
+            FROM PlayerSeasonStatsCached PS2
             WHERE PS2.leagueid = %s
             AND PS2.seasonno = %s
             AND PS2.seasonyear = %s
@@ -611,8 +666,7 @@ def get_season_top_scorer():
     """
     # Note: Params must be repeated for the subquery
     params = (lid, sno, syear, lid, sno, syear)
-    result = execute_query(query, params, fetch_all=True)
-    return jsonify(result)
+    return execute_query(query, params, fetch_all=True)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,170 @@
+# Compares the old per-row bracket builder (one INSERT per Round, one UPDATE per Round
+# for the links, then INSERT Match / INSERT TournamentMatch / UPDATE Round per leaf)
+# with db_helper._build_bracket_tree, for bracket sizes 2 .. --max-size teams.
+#
+#   cd app && python -m benchmarks.bracket_build [--max-size 1024] [--repeat 3]
+#
+# Throwaway owners/teams and every bracket are created inside one transaction that
+# is rolled back at the end. The teams have no players, so Play seeding is not part
+# of the numbers; both builders fire the same match insert trigger anyway.
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from db import get_connection
+from db_helper import _build_bracket_tree
+
+
+class _CountingCursor:
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.statements = 0
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def execute(self, query, params=None):
+        self.statements += 1
+        return self._cursor.execute(query, params)
+
+
+def _build_bracket_tree_per_row(cur, tournament_id, team_ids, start_date):
+    # the statement pattern _build_bracket_tree used before it became set-based
+    team_count = len(team_ids)
+    leaf_start = team_count // 2
+    for round_no in range(1, team_count):
+        cur.execute(
+            """
+            INSERT INTO Round (TournamentID, RoundNo, T_MatchID, Child1RoundNo, Child2RoundNo, ParentRoundNo)
+            VALUES (%s, %s, NULL, NULL, NULL, NULL);
+            """,
+            (tournament_id, round_no),
+        )
+    for round_no in range(1, team_count):
+        leaf = round_no >= leaf_start
+        cur.execute(
+            """
+            UPDATE Round
+            SET Child1RoundNo = %s,
+                Child2RoundNo = %s,
+                ParentRoundNo = %s
+            WHERE TournamentID = %s AND RoundNo = %s;
+            """,
+            (
+                None if leaf else 2 * round_no,
+                None if leaf else 2 * round_no + 1,
+                round_no // 2 or None,
+                tournament_id,
+                round_no,
+            ),
+        )
+    shuffled_ids = team_ids[:]
+    random.shuffle(shuffled_ids)
+    match_ids = []
+    for leaf_index in range(leaf_start):
+        home_id, away_id = shuffled_ids[2 * leaf_index], shuffled_ids[2 * leaf_index + 1]
+        cur.execute(
+            """
+            INSERT INTO Match (
+                HomeTeamID, AwayTeamID, MatchStartDatetime, MatchEndDatetime, VenuePlayed,
+                HomeTeamName, AwayTeamName, HomeTeamScore, AwayTeamScore, WinnerTeam, IsLocked
+            )
+            SELECT %s, %s, %s, NULL, NULL, ht.TeamName, awt.TeamName, NULL, NULL, NULL, FALSE
+            FROM Team ht, Team awt
+            WHERE ht.TeamID = %s AND awt.TeamID = %s
+            RETURNING MatchID;
+            """,
+            (home_id, away_id, start_date + timedelta(days=leaf_index, hours=19), home_id, away_id),
+        )
+        match_id = cur.fetchone()[0]
+        match_ids.append(match_id)
+        cur.execute("INSERT INTO TournamentMatch (MatchID) VALUES (%s);", (match_id,))
+        cur.execute(
+            "UPDATE Round SET T_MatchID = %s WHERE TournamentID = %s AND RoundNo = %s;",
+            (match_id, tournament_id, leaf_start + leaf_index),
+        )
+    return match_ids
+
+
+BUILDERS = {
+    "per_row": _build_bracket_tree_per_row,
+    "set_based": _build_bracket_tree,
+}
+
+
+def _create_teams(cur, count):
+    cur.execute(
+        """
+        WITH owners AS (
+            INSERT INTO Users (FirstName, LastName, Email, HashedPassword, Salt, BirthDate, Role)
+            SELECT 'Bench', 'Owner ' || g, 'bracket_bench_' || g || '@example.com', 'x', 'x',
+                   DATE '1990-01-01', 'team_owner'
+            FROM generate_series(1, %s) AS g
+            RETURNING UsersID
+        ),
+        team_owners AS (
+            INSERT INTO TeamOwner (UsersID, NetWorth)
+            SELECT UsersID, 1000000 FROM owners
+            RETURNING UsersID
+        )
+        INSERT INTO Team (OwnerID, TeamName, EstablishedDate, HomeVenue)
+        SELECT UsersID, 'Bracket Bench ' || UsersID, NOW(), 'Bench Arena'
+        FROM team_owners
+        RETURNING TeamID;
+        """,
+        (count,),
+    )
+    return [row[0] for row in cur.fetchall()]
+
+
+def run(max_size, repeat):
+    sizes = [1 << k for k in range(1, max_size.bit_length()) if (1 << k) <= max_size]
+    conn = get_connection()
+    results = []
+    try:
+        with conn.cursor() as raw:
+            team_ids = _create_teams(raw, max_size)
+            start_date = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+            for size in sizes:
+                for mode, builder in BUILDERS.items():
+                    best = None
+                    for attempt in range(repeat):
+                        raw.execute("SAVEPOINT bracket_bench;")
+                        raw.execute(
+                            "INSERT INTO Tournament (Name, Size) VALUES (%s, %s) RETURNING TournamentID;",
+                            (f"bracket bench {mode} {size} {attempt}", size),
+                        )
+                        tournament_id = raw.fetchone()[0]
+                        cur = _CountingCursor(raw)
+                        started = time.perf_counter()
+                        match_ids = builder(cur, tournament_id, team_ids[:size], start_date)
+                        elapsed = time.perf_counter() - started
+                        raw.execute("SELECT COUNT(*) FROM Round WHERE TournamentID = %s;", (tournament_id,))
+                        rounds = raw.fetchone()[0]
+                        raw.execute("ROLLBACK TO SAVEPOINT bracket_bench;")
+                        if len(match_ids) != size // 2 or rounds != size - 1:
+                            raise RuntimeError(f"{mode} built a wrong bracket for {size} teams")
+                        if best is None or elapsed < best[0]:
+                            best = (elapsed, cur.statements)
+                    results.append({"size": size, "mode": mode, "seconds": best[0], "statements": best[1]})
+        return results
+    finally:
+        conn.rollback()
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-row vs set-based bracket construction.")
+    parser.add_argument("--max-size", type=int, default=1024)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    results = run(args.max_size, args.repeat)
+    print(f"{'teams':>6}  {'builder':<10} {'statements':>10} {'ms (best)':>10}")
+    for r in results:
+        print(f"{r['size']:>6}  {r['mode']:<10} {r['statements']:>10} {r['seconds'] * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# Compares the row-level Play triggers (play_insert / play_update / play_change_recalc)
+# with the statement-level set (play_*_stmt) on a real match sheet.
+#
+#   cd app && python -m benchmarks.play_triggers [--match-id N] [--rounds 20]
+#
+# Everything runs inside one transaction per trigger set and is rolled back, so the
+# database is left untouched. Both sets must produce the same final scores/winner.
+import argparse
+import time
+
+from db import get_connection
+
+ROW_TRIGGERS = ("play_insert", "play_update", "play_change_recalc")
+STATEMENT_TRIGGERS = ("play_insert_stmt", "play_update_stmt", "play_delete_stmt")
+
+
+def _use_trigger_set(cur, mode):
+    enable, disable = (ROW_TRIGGERS, STATEMENT_TRIGGERS) if mode == "row" else (STATEMENT_TRIGGERS, ROW_TRIGGERS)
+    for name in enable:
+        cur.execute(f"ALTER TABLE Play ENABLE TRIGGER {name};")
+    for name in disable:
+        cur.execute(f"ALTER TABLE Play DISABLE TRIGGER {name};")
+
+
+def _match_updates(cur):
+    # per-transaction counter, so it includes the updates done inside triggers
+    cur.execute("SELECT COALESCE(n_tup_upd, 0) FROM pg_stat_xact_user_tables WHERE relname = 'match';")
+    row = cur.fetchone()
+    return row[0] if row else 0
+
+
+def _pick_match(cur, match_id):
+    if match_id is None:
+        cur.execute(
+            """
+            SELECT MatchID
+            FROM Play
+            GROUP BY MatchID
+            ORDER BY COUNT(*) DESC, MatchID
+            LIMIT 1;
+            """
+        )
+        row = cur.fetchone()
+        if not row:
+            raise ValueError("No match with plays to benchmark.")
+        match_id = row[0]
+    cur.execute("SELECT PlayID FROM Play WHERE MatchID = %s ORDER BY PlayID;", (match_id,))
+    return match_id, [r[0] for r in cur.fetchall()]
+
+
+def run(mode, match_id, rounds):
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            _use_trigger_set(cur, mode)
+            match_id, play_ids = _pick_match(cur, match_id)
+            # give every play a start time so goal changes count towards the score
+            cur.execute("UPDATE Play SET StartTime = COALESCE(StartTime, 0) WHERE MatchID = %s;", (match_id,))
+
+            updates_before = _match_updates(cur)
+            timings = {}
+
+            # what referee.save_plays did: one UPDATE per play row
+            started = time.perf_counter()
+            for i in range(rounds):
+                for play_id in play_ids:
+                    cur.execute(
+                        "UPDATE Play SET GoalsScored = %s, TotalPasses = COALESCE(TotalPasses, 0) + 1 WHERE PlayID = %s;",
+                        (i % 3, play_id),
+                    )
+            timings["per_row_statements"] = time.perf_counter() - started
+            per_row_updates = _match_updates(cur) - updates_before
+
+            # the whole sheet in one statement
+            started = time.perf_counter()
+            for i in range(rounds):
+                cur.execute(
+                    "UPDATE Play SET GoalsScored = %s, TotalPasses = COALESCE(TotalPasses, 0) + 1 WHERE PlayID = ANY(%s);",
+                    ((i + 1) % 3, play_ids),
+                )
+            timings["single_statement"] = time.perf_counter() - started
+            single_updates = _match_updates(cur) - updates_before - per_row_updates
+
+            cur.execute(
+                "SELECT HomeTeamScore, AwayTeamScore, WinnerTeam FROM Match WHERE MatchID = %s;",
+                (match_id,),
+            )
+            final = cur.fetchone()
+        return {
+            "mode": mode,
+            "match_id": match_id,
+            "plays": len(play_ids),
+            "timings": timings,
+            "match_updates": {"per_row_statements": per_row_updates, "single_statement": single_updates},
+            "final": final,
+        }
+    finally:
+        conn.rollback()
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark row-level vs statement-level Play triggers.")
+    parser.add_argument("--match-id", type=int, default=None)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    results = [run(mode, args.match_id, args.rounds) for mode in ("row", "statement")]
+    for result in results:
+        print(f"[{result['mode']}] match {result['match_id']}, {result['plays']} plays, {args.rounds} rounds")
+        for pattern, seconds in result["timings"].items():
+            print(
+                f"  {pattern:<20} {seconds * 1000:9.1f} ms"
+                f"   {result['match_updates'][pattern]:6d} Match row updates"
+            )
+        print(f"  final score/winner: {result['final']}")
+
+    if results[0]["final"] != results[1]["final"]:
+        print("WARNING: trigger sets disagree on the final match state")
+
+
+if __name__ == "__main__":
+    main()
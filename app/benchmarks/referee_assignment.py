@@ -0,0 +1,110 @@
+# Times referee_assignment.plan_assignments on synthetic seasons, checks that no
+# referee ends up on two overlapping matches, and reports unfilled slots and the
+# spread between the busiest and idlest referee.
+#
+#   cd app && python -m benchmarks.referee_assignment [--matches 2000] [--referees 40] [--per-match 1]
+#
+# Kickoffs are drawn from a few evening slots across the season, so many matches
+# overlap; a share of referees start with assignments elsewhere. No database needed.
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from referee_assignment import match_window, plan_assignments
+
+KICKOFF_HOURS = (13, 15, 17, 19, 21)
+
+
+def _season(match_count, seed):
+    rng = random.Random(seed)
+    start = datetime(2025, 8, 1)
+    days = max(1, match_count // 8)
+    matches = []
+    for match_id in range(1, match_count + 1):
+        kickoff = start + timedelta(days=rng.randrange(days), hours=rng.choice(KICKOFF_HOURS))
+        matches.append((match_id, kickoff, None, 0))
+    return matches
+
+
+def _busy(referee_ids, matches, seed):
+    # about one outside assignment per referee per week of season
+    rng = random.Random(seed + 1)
+    first = min(m[1] for m in matches)
+    last = max(m[1] for m in matches)
+    weeks = max(1, (last - first).days // 7)
+    busy = {}
+    for ref in referee_ids:
+        for _ in range(rng.randrange(weeks + 1)):
+            kickoff = first + timedelta(days=rng.randrange((last - first).days + 1), hours=rng.choice(KICKOFF_HOURS))
+            busy.setdefault(ref, []).append(match_window(kickoff, None))
+    return busy
+
+
+def _check(matches, busy, assignments):
+    windows = {m[0]: match_window(m[1], m[2]) for m in matches}
+    planned = {}
+    for match_id, ref in assignments:
+        planned.setdefault(ref, []).append(windows[match_id])
+    for ref, taken in planned.items():
+        outside = busy.get(ref, [])
+        taken.sort()
+        for (_, end), (start, _) in zip(taken, taken[1:]):
+            if start < end:
+                raise RuntimeError(f"referee {ref} double-booked")
+        for start, end in taken:
+            if any(s < end and start < e for s, e in outside):
+                raise RuntimeError(f"referee {ref} booked over an existing assignment")
+
+
+def run(match_count, referee_count, per_match, repeat, seed=7):
+    matches = _season(match_count, seed)
+    referee_ids = list(range(1, referee_count + 1))
+    busy = _busy(referee_ids, matches, seed)
+    loads = {ref: len(windows) for ref, windows in busy.items()}
+
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        assignments, unfilled = plan_assignments(matches, referee_ids, busy, loads, per_match)
+        elapsed = time.perf_counter() - started
+        if best is None or elapsed < best[0]:
+            best = (elapsed, assignments, unfilled)
+
+    elapsed, assignments, unfilled = best
+    _check(matches, busy, assignments)
+    after = dict(loads)
+    for _, ref in assignments:
+        after[ref] = after.get(ref, 0) + 1
+    totals = [after.get(ref, 0) for ref in referee_ids]
+    return {
+        "matches": match_count,
+        "referees": referee_count,
+        "assignments": len(assignments),
+        "unfilled": sum(unfilled.values()),
+        "load_min": min(totals),
+        "load_max": max(totals),
+        "ms": elapsed * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the bulk referee assignment planner.")
+    parser.add_argument("--matches", type=int, default=2000)
+    parser.add_argument("--referees", type=int, default=40)
+    parser.add_argument("--per-match", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'matches':>8} {'referees':>8} {'assigned':>8} {'unfilled':>8} {'load min/max':>12} {'ms (best)':>10}")
+    for match_count in sorted({250, 1000, args.matches}):
+        r = run(match_count, args.referees, args.per_match, args.repeat)
+        loads = f"{r['load_min']}/{r['load_max']}"
+        print(
+            f"{r['matches']:>8} {r['referees']:>8} {r['assignments']:>8} {r['unfilled']:>8} "
+            f"{loads:>12} {r['ms']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
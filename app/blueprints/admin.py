@@ -10,11 +10,13 @@ from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
 
-from flask import Blueprint, render_template, request, redirect, url_for, session, abort, make_response
+from flask import Blueprint, render_template, request, redirect, url_for, session, abort, make_response, jsonify
 from psycopg2.extras import RealDictCursor
 
 from db_helper import * 
 
+import referee_assignment
+import revision
 from db import get_connection
 
 admin_bp = Blueprint("admin", __name__, url_prefix="/admin")
@@ -35,31 +37,41 @@ def view_tournaments():
     if not admin_id:
         return redirect(url_for("login"))
 
+    etag, not_modified = revision.check([("tournament", None)], revision.viewer())
+    if not_modified:
+        return not_modified
+
     tournaments = fetch_tournaments(admin_id)
     if not tournaments:
-        return render_template(
-            "admin_view_tournaments.html",
-            tournaments=[],
-            selected_tournament=None,
-            matches_by_round={},
-            create_endpoint="admin.create_tournament_form",
-            list_endpoint="admin.view_tournaments",
-            allow_create=False,
+        return revision.tagged(
+            render_template(
+                "admin_view_tournaments.html",
+                tournaments=[],
+                selected_tournament=None,
+                matches_by_round={},
+                create_endpoint="admin.create_tournament_form",
+                list_endpoint="admin.view_tournaments",
+                allow_create=False,
+            ),
+            etag,
         )
 
     requested_tournament_id = request.args.get("tournament_id")
     selected_tournament = _select_tournament(requested_tournament_id, tournaments)
     matches_by_round = fetch_matches_grouped(selected_tournament["tournamentid"])
 
-    return render_template(
-        "admin_view_tournaments.html",
-        tournaments=tournaments,
-        selected_tournament=selected_tournament,
-        matches_by_round=matches_by_round,
-        create_endpoint="admin.create_tournament_form",
-        list_endpoint="admin.view_tournaments",
-        delete_endpoint="admin.delete_tournament",
-        allow_create=False,
+    return revision.tagged(
+        render_template(
+            "admin_view_tournaments.html",
+            tournaments=tournaments,
+            selected_tournament=selected_tournament,
+            matches_by_round=matches_by_round,
+            create_endpoint="admin.create_tournament_form",
+            list_endpoint="admin.view_tournaments",
+            delete_endpoint="admin.delete_tournament",
+            allow_create=False,
+        ),
+        etag,
     )
 
 
@@ -75,7 +87,9 @@ def view_leagues():
         league_entry = dict(league)
         league_entry["teams"] = fetch_league_teams(league["leagueid"])
         league_entry["available_teams"] = fetch_league_available_teams(league["leagueid"])
-        league_entry["matches"] = fetch_league_matches(league["leagueid"])
+        league_entry["matches"], league_entry["more_matches"] = match_page(
+            fetch_league_matches(league["leagueid"], limit=MATCH_PAGE_SIZE), MATCH_PAGE_SIZE
+        )
         leagues_with_teams.append(league_entry)
 
     return render_template(
@@ -250,9 +264,11 @@ def view_matches_for_referees():
         return redirect(url_for("login"))
     
     matches = fetch_admin_tournament_matches(admin_id)
+    tournaments = {m["tournamentid"]: m["tournament_name"] for m in matches if m["match_type"] == "tournament"}
     return render_template(
         "admin_matches_referees.html",
         matches=matches,
+        tournaments=sorted(tournaments.items(), key=lambda item: item[1] or ""),
     )
 
 
@@ -293,17 +309,24 @@ def league_matches_referees(league_id):
     if not admin_id:
         return redirect(url_for("login"))
 
-    allowed_leagues = {l["leagueid"] for l in fetch_admin_leagues(admin_id)}
-    if league_id not in allowed_leagues:
+    admin_leagues = fetch_admin_leagues(admin_id)
+    if not any(l["leagueid"] == league_id for l in admin_leagues):
         abort(403)
 
-    matches = [m for m in fetch_league_matches(league_id)]
+    before = _match_cursor_arg()
+    matches, next_cursor = match_page(
+        fetch_league_matches(league_id, before, MATCH_PAGE_SIZE), MATCH_PAGE_SIZE
+    )
     referees = fetch_all_referees()
+    seasons = [(l["seasonno"], l["seasonyear"]) for l in admin_leagues if l["leagueid"] == league_id]
     return render_template(
         "admin_league_matches_referees.html",
         league_id=league_id,
         matches=matches,
         referees=referees,
+        seasons=seasons,
+        before=before,
+        next_cursor=next_cursor,
     )
 
 
@@ -347,6 +370,69 @@ def remove_match_referee(match_id, referee_id):
     return redirect(url_for("admin.match_referee_assignment", match_id=match_id, league_id=league_id))
 
 
+def _render_auto_assign(scope_title, back_url, **scope):
+    """Dry-run preview on GET, write on POST; both render the same report."""
+    per_match = request.values.get("per_match", type=int) or referee_assignment.REFEREES_PER_MATCH
+    error_message = None
+    report = None
+    try:
+        report = referee_assignment.auto_assign(
+            per_match=per_match,
+            dry_run=request.method != "POST",
+            **scope,
+        )
+    except ValueError as exc:
+        error_message = str(exc)
+    return render_template(
+        "admin_referee_auto_assign.html",
+        scope_title=scope_title,
+        back_url=back_url,
+        per_match=per_match,
+        report=report,
+        error_message=error_message,
+    )
+
+
+@admin_bp.route(
+    "/leagues/<int:league_id>/seasons/<int:season_no>/<season_year>/referees/auto", methods=["GET", "POST"]
+)
+def auto_assign_season_referees(league_id, season_no, season_year):
+    """Assign referees to every open match of a season at once (GET previews)."""
+    admin_id = session.get("user_id")
+    if not admin_id:
+        return redirect(url_for("login"))
+
+    allowed_leagues = {l["leagueid"] for l in fetch_admin_leagues(admin_id)}
+    if league_id not in allowed_leagues:
+        abort(403)
+
+    return _render_auto_assign(
+        f"League {league_id} • Season {season_no} ({season_year})",
+        url_for("admin.league_matches_referees", league_id=league_id),
+        league_id=league_id,
+        season_no=season_no,
+        season_year=season_year,
+    )
+
+
+@admin_bp.route("/tournaments/<int:tournament_id>/referees/auto", methods=["GET", "POST"])
+def auto_assign_tournament_referees(tournament_id):
+    """Assign referees to every open match of a tournament at once (GET previews)."""
+    admin_id = session.get("user_id")
+    if not admin_id:
+        return redirect(url_for("login"))
+
+    tournament = next((t for t in fetch_tournaments(admin_id) if t["tournamentid"] == tournament_id), None)
+    if tournament is None:
+        abort(403)
+
+    return _render_auto_assign(
+        tournament["name"],
+        url_for("admin.view_matches_for_referees"),
+        tournament_id=tournament_id,
+    )
+
+
 @admin_bp.route("/leagues/<int:league_id>/teams/add", methods=["GET", "POST"])
 def add_team_to_league_route(league_id):
     admin_id = session.get("user_id")
@@ -411,8 +497,8 @@ def create_season_match_form(league_id, season_no, season_year):
         )
 
     if request.method == "GET":
-        # Display the form
-        return _render_form()
+        # Display the form (fixture generation redirects back here with ?error=)
+        return _render_form(request.args.get("error"))
     
     # Handle POST
     home_team_id = request.form.get("home_team_id")
@@ -474,17 +560,88 @@ def create_season_match_form(league_id, season_no, season_year):
     return redirect(url_for("admin.view_leagues"))
 
 
+@admin_bp.route("/leagues/<int:league_id>/seasons/<int:season_no>/<season_year>/fixtures/generate", methods=["POST"])
+def generate_season_fixtures(league_id, season_no, season_year):
+    """Create the whole home/away round robin for a season in one go."""
+    admin_id = session.get("user_id")
+    if not admin_id:
+        return redirect(url_for("login"))
+
+    allowed_leagues = {l["leagueid"] for l in fetch_admin_leagues(admin_id)}
+    if league_id not in allowed_leagues:
+        abort(403)
+
+    try:
+        schedule_season_fixtures(
+            league_id,
+            season_no,
+            season_year,
+            kickoff=request.form.get("kickoff_time") or "19:00",
+            double_round=request.form.get("single_round") != "1",
+        )
+    except ValueError as exc:
+        return redirect(
+            url_for(
+                "admin.create_season_match_form",
+                league_id=league_id,
+                season_no=season_no,
+                season_year=season_year,
+                error=str(exc),
+            )
+        )
+
+    return redirect(url_for("admin.view_leagues"))
+
+
+def _match_cursor_arg():
+    """The ?before= keyset cursor of a paged match list; 400 if it does not parse."""
+    try:
+        return parse_match_cursor(request.args.get("before"))
+    except ValueError:
+        abort(400)
+
+
+def _match_page_size_arg():
+    limit = request.args.get("limit", MATCH_PAGE_SIZE, type=int)
+    return max(1, min(limit, MATCH_PAGE_SIZE_MAX))
+
+
+def _all_matches_filter_args():
+    """(season_year, league_id, tournament_id) from the all-matches filter form."""
+    season_year_params = request.args.getlist("season_year")
+    league_id_params = request.args.getlist("league_id")
+    tournament_id_params = request.args.getlist("tournament_id")
+    try:
+        season_year = int(season_year_params[0]) if season_year_params and season_year_params[0] else None
+    except ValueError:
+        abort(400)
+    league_id = league_id_params[0] if league_id_params and league_id_params[0] else None
+    tournament_id = tournament_id_params[0] if tournament_id_params and tournament_id_params[0] else None
+    return season_year, league_id, tournament_id
+
+
+def _match_group(match):
+    if match["match_type"] == "league":
+        return f"League: {match['league_name']} (Season {match['seasonno']} - {match['seasonyear']})"
+    return f"Tournament: {match['tournament_name']}"
+
+
 @admin_bp.route("/matches/seasonal/lock-status")
 def view_seasonal_matches_lock():
-    """View all seasonal matches with lock/unlock controls."""
+    """View seasonal matches with lock/unlock controls, one page at a time."""
     admin_id = session.get("user_id")
     if not admin_id:
         return redirect(url_for("login"))
     
-    matches = fetch_seasonal_matches_for_admin(admin_id)
+    before = _match_cursor_arg()
+    matches, next_cursor = match_page(
+        fetch_seasonal_matches_for_admin(admin_id, before, MATCH_PAGE_SIZE), MATCH_PAGE_SIZE
+    )
     return render_template(
         "admin_seasonal_matches_lock.html",
         matches=matches,
+        before=before,
+        next_cursor=next_cursor,
     )
 
 
@@ -495,21 +652,20 @@ def view_all_matches_lock():
     if not admin_id:
         return redirect(url_for("login"))
     
-    # Get filter parameters - handle both single and multiple values
-    season_year_params = request.args.getlist("season_year")
-    season_year = int(season_year_params[0]) if season_year_params and season_year_params[0] else None
-    league_id_params = request.args.getlist("league_id")
-    league_id = league_id_params[0] if league_id_params and league_id_params[0] else None
-    tournament_id_params = request.args.getlist("tournament_id")
-    tournament_id = tournament_id_params[0] if tournament_id_params and tournament_id_params[0] else None
+    season_year, league_id, tournament_id = _all_matches_filter_args()
+    before = _match_cursor_arg()
     
     # Fetch dropdown data
     seasons = fetch_seasons_for_dropdown()
     leagues = fetch_leagues_for_dropdown()
     tournaments = fetch_tournaments_for_dropdown()
     
-    # Fetch filtered matches
-    matches = fetch_all_matches_with_filters(admin_id, season_year, league_id, tournament_id)
+    # Fetch the first page of filtered matches; the page scrolls the rest in from
+    # view_all_matches_lock_page
+    matches, next_cursor = match_page(
+        fetch_all_matches_with_filters(admin_id, season_year, league_id, tournament_id, before, MATCH_PAGE_SIZE),
+        MATCH_PAGE_SIZE,
+    )
     
     return render_template(
         "admin_all_matches_lock.html",
@@ -517,12 +673,109 @@ def view_all_matches_lock():
         seasons=seasons,
         leagues=leagues,
         tournaments=tournaments,
-        selected_season_year=season_year_params[0] if season_year_params and season_year_params[0] else None,
-        selected_league_id=league_id_params[0] if league_id_params and league_id_params[0] else None,
-        selected_tournament_id=tournament_id_params[0] if tournament_id_params and tournament_id_params[0] else None,
+        selected_season_year=season_year,
+        selected_league_id=league_id,
+        selected_tournament_id=tournament_id,
+        before=before,
+        next_cursor=next_cursor,
+        message=request.args.get("message"),
+        error_message=request.args.get("error"),
     )
 
 
+@admin_bp.route("/matches/all/lock-status/page")
+def view_all_matches_lock_page():
+    """
+    JSON page of view_all_matches_lock for infinite scroll: same filters, plus
+    ?before=<next_cursor of the previous page> and an optional ?limit=.
+    """
+    admin_id = session.get("user_id")
+    if not admin_id:
+        return jsonify({"error": "Not authenticated"}), 401
+
+    season_year, league_id, tournament_id = _all_matches_filter_args()
+    before = _match_cursor_arg()
+    limit = _match_page_size_arg()
+    matches, next_cursor = match_page(
+        fetch_all_matches_with_filters(admin_id, season_year, league_id, tournament_id, before, limit),
+        limit,
+    )
+    return jsonify(
+        {
+            "matches": [
+                {
+                    "matchid": m["matchid"],
+                    "match_type": m["match_type"],
+                    "group": _match_group(m),
+                    "hometeamname": m["hometeamname"],
+                    "awayteamname": m["awayteamname"],
+                    "matchstartdatetime": m["matchstartdatetime"].isoformat(),
+                    "kickoff": m["matchstartdatetime"].strftime("%b %d, %Y %H:%M"),
+                    "hometeamscore": m["hometeamscore"],
+                    "awayteamscore": m["awayteamscore"],
+                    "islocked": m["islocked"],
+                    "toggle_url": url_for(
+                        "admin.toggle_match_lock_route",
+                        match_id=m["matchid"],
+                        season_year=season_year,
+                        league_id=league_id,
+                        tournament_id=tournament_id,
+                    )
+                    if m["match_type"] == "league"
+                    else None,
+                }
+                for m in matches
+            ],
+            "next_cursor": next_cursor,
+        }
+    )
+
+
+@admin_bp.route("/matches/bulk-lock", methods=["POST"])
+def bulk_lock_matches():
+    """
+    Lock or unlock a whole league season, tournament, kickoff date range and/or a
+    list of match ids at once (see bulk_set_match_lock). Goes back to the all
+    matches page with its filters and a summary or error.
+    """
+    admin_id = session.get("user_id")
+    if not admin_id:
+        return redirect(url_for("login"))
+
+    form = request.form
+    lock_state = form.get("action") == "lock"
+    filters = {
+        "season_year": request.args.get("season_year"),
+        "league_id": request.args.get("league_id"),
+        "tournament_id": request.args.get("tournament_id"),
+    }
+    try:
+        date_from = form.get("date_from")
+        date_to = form.get("date_to")
+        result = bulk_set_match_lock(
+            admin_id,
+            lock_state,
+            league_id=form.get("league_id") or None,
+            season_no=form.get("season_no") or None,
+            season_year=form.get("season_year") or None,
+            tournament_id=form.get("tournament_id") or None,
+            date_from=datetime.strptime(date_from, "%Y-%m-%d") if date_from else None,
+            # the form's end date is inclusive
+            date_to=datetime.strptime(date_to, "%Y-%m-%d") + timedelta(days=1) if date_to else None,
+            match_ids=[int(match_id) for match_id in form.getlist("match_ids") if match_id] or None,
+        )
+    except PermissionError:
+        abort(403)
+    except ValueError as exc:
+        return redirect(url_for("admin.view_all_matches_lock", error=str(exc), **filters))
+
+    verb = "Locked" if lock_state else "Unlocked"
+    message = f"{verb} {result['changed']} of {result['matched']} matches."
+    if result["advanced"]:
+        message += f" {result['advanced']} bracket matches created."
+    return redirect(url_for("admin.view_all_matches_lock", message=message, **filters))
+
+
 @admin_bp.route("/matches/<int:match_id>/toggle-lock", methods=["POST"])
 def toggle_match_lock_route(match_id):
     """Toggle lock/unlock for a league match only (with permission check)."""
@@ -594,6 +847,11 @@ def team_rankings():
     season_no = int(season_no) if season_no else None
     season_year = request.args.get("season_year")
     season_year = datetime.strptime(season_year, "%Y-%m-%d").date() if season_year else None
+
+    # every league, since the filter dropdowns list them all
+    etag, not_modified = revision.check([("league", None)], revision.viewer())
+    if not_modified:
+        return not_modified
     
     # Fetch rankings
     rankings = fetch_team_rankings(league_id, season_no, season_year)
@@ -602,14 +860,17 @@ def team_rankings():
     leagues = fetch_leagues_for_dropdown()
     seasons = fetch_all_seasons_for_dropdown()
     
-    return render_template(
-        "admin_team_rankings.html",
-        rankings=rankings,
-        leagues=leagues,
-        seasons=seasons,
-        selected_league_id=league_id,
-        selected_season_no=season_no,
-        selected_season_year=season_year,
+    return revision.tagged(
+        render_template(
+            "admin_team_rankings.html",
+            rankings=rankings,
+            leagues=leagues,
+            seasons=seasons,
+            selected_league_id=league_id,
+            selected_season_no=season_no,
+            selected_season_year=season_year,
+        ),
+        etag,
     )
 
 
@@ -627,22 +888,32 @@ def player_rankings():
     season_no = int(season_no) if season_no else None
     season_year = request.args.get("season_year")
     season_year = datetime.strptime(season_year, "%Y-%m-%d").date() if season_year else None
+
+    # tournaments too: the freshness banner counts players queued from any match
+    etag, not_modified = revision.check([("league", None), ("tournament", None)], revision.viewer())
+    if not_modified:
+        return not_modified
     
     # Fetch rankings
     rankings = fetch_player_rankings(league_id, season_no, season_year)
+    stats_freshness = fetch_player_stats_freshness()
     
     # Fetch filter options
     leagues = fetch_leagues_for_dropdown()
     seasons = fetch_all_seasons_for_dropdown()
     
-    return render_template(
-        "admin_player_rankings.html",
-        rankings=rankings,
-        leagues=leagues,
-        seasons=seasons,
-        selected_league_id=league_id,
-        selected_season_no=season_no,
-        selected_season_year=season_year,
+    return revision.tagged(
+        render_template(
+            "admin_player_rankings.html",
+            rankings=rankings,
+            stats_freshness=stats_freshness,
+            leagues=leagues,
+            seasons=seasons,
+            selected_league_id=league_id,
+            selected_season_no=season_no,
+            selected_season_year=season_year,
+        ),
+        etag,
     )
 
 
@@ -1,10 +1,11 @@
-from flask import Blueprint, render_template, request, redirect, url_for, session, flash
+from flask import Blueprint, render_template, request, redirect, url_for, session, flash, abort
 from datetime import datetime, timedelta, timezone
 import psycopg2
 
+import player_search
+
 from db_helper import (
     check_coach_can_make_transfer_offer,
-    fetch_transferable_players,
     fetch_all_nationalities,
     fetch_all_positions,
     fetch_all_teams,
@@ -22,7 +23,6 @@ from db_helper import (
     log_player_injury_db,
     clear_player_injury_db,
     team_has_match_on_date,
-    update_expired_injuries,
 )
 
 coach_bp = Blueprint("coach", __name__, url_prefix="/coach")
@@ -38,8 +38,6 @@ def require_coach_session():
         session["next"] = request.path
         return redirect(url_for("login"))
 
-    update_expired_injuries()
-
 
 @coach_bp.route("/transfer_market", methods=["GET"])
 def view_transfer_market():
@@ -52,9 +50,6 @@ def view_transfer_market():
     current_team = request.args.get("team")
     contact_expiration_date = request.args.get("contactExpirationDate")
 
-    # nationality, position, min_age, and max_age
-    # do not have sanitation because I didn't care
-
     if name is not None:
         name = name.strip()
 
@@ -65,17 +60,27 @@ def view_transfer_market():
         "max_age": max_age,
         "team": current_team,
         "position": position,
-        "contact_expiration_date": contact_expiration_date,
+        "contract_expires_before": contact_expiration_date,
     }
 
-    players = fetch_transferable_players(filters, coachid)
+    try:
+        after = player_search.decode_cursor(request.args.get("after"))
+        results = player_search.search_players(filters, coach_id=coachid, after=after)
+    except ValueError:
+        abort(400)
+
     nationalities = fetch_all_nationalities()
     positions = fetch_all_positions()
     teams = fetch_all_teams()
 
     return render_template(
         "coach_transfer_market.html",
-        players=players,
+        players=results["players"],
+        next_cursor=results["next_cursor"],
+        facets=results["facets"],
+        total=results["total"],
+        age_bands=player_search.AGE_BANDS,
+        after=after,
         nationalities=nationalities,
         positions=positions,
         teams=teams,
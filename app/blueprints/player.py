@@ -19,7 +19,6 @@ from db_helper import (
     is_player_eligible,
     get_player_injury_status,
     fetch_session_date,
-    update_expired_injuries,
 )
 
 player_bp = Blueprint("player", __name__, url_prefix="/player")
@@ -30,7 +29,6 @@ def require_player_session():
     if session.get("user_id") is None or session.get("role") != "player":
         session["next"] = request.path
         return redirect(url_for("login"))
-    update_expired_injuries()
 
 
 @player_bp.route("/home")
@@ -63,14 +61,11 @@ def home():
     finally:
         conn.close()
     
-    # Fetch all season stats (no filtering)
-    all_season_stats = fetch_player_season_stats(player_id)
-    
     return render_template(
         "home_player.html",
         player_info=player_info,
         overall_stats=overall_stats,
-        season_stats=all_season_stats,
+        season_stats=season_stats,
         tournament_stats=tournament_stats,
     )
 
@@ -1,6 +1,8 @@
 import psycopg2
 from flask import Blueprint, render_template, request, redirect, url_for, session
 
+import revision
+
 from db_helper import (
     create_tournament_with_bracket,
     fetch_all_admins,
@@ -28,32 +30,42 @@ def require_superadmin_session():
 
 @superadmin_bp.route("/tournaments")
 def view_tournaments():
+    etag, not_modified = revision.check([("tournament", None)], revision.viewer())
+    if not_modified:
+        return not_modified
+
     tournaments = fetch_all_tournaments()
     if not tournaments:
-        return render_template(
-            "admin_view_tournaments.html",
-            tournaments=[],
-            selected_tournament=None,
-            matches_by_round={},
-            create_endpoint="superadmin.create_tournament_form",
-            list_endpoint="superadmin.view_tournaments",
-            delete_endpoint="superadmin.delete_tournament",
-            allow_create=True,
+        return revision.tagged(
+            render_template(
+                "admin_view_tournaments.html",
+                tournaments=[],
+                selected_tournament=None,
+                matches_by_round={},
+                create_endpoint="superadmin.create_tournament_form",
+                list_endpoint="superadmin.view_tournaments",
+                delete_endpoint="superadmin.delete_tournament",
+                allow_create=True,
+            ),
+            etag,
         )
 
     requested_tournament_id = request.args.get("tournament_id")
     selected_tournament = _select_tournament(requested_tournament_id, tournaments)
     matches_by_round = fetch_matches_grouped(selected_tournament["tournamentid"])
 
-    return render_template(
-        "admin_view_tournaments.html",
-        tournaments=tournaments,
-        selected_tournament=selected_tournament,
-        matches_by_round=matches_by_round,
-        create_endpoint="superadmin.create_tournament_form",
-        list_endpoint="superadmin.view_tournaments",
-        delete_endpoint="superadmin.delete_tournament",
-        allow_create=True,
+    return revision.tagged(
+        render_template(
+            "admin_view_tournaments.html",
+            tournaments=tournaments,
+            selected_tournament=selected_tournament,
+            matches_by_round=matches_by_round,
+            create_endpoint="superadmin.create_tournament_form",
+            list_endpoint="superadmin.view_tournaments",
+            delete_endpoint="superadmin.delete_tournament",
+            allow_create=True,
+        ),
+        etag,
     )
 
 
@@ -0,0 +1,251 @@
+# tournament bracket engine: a cached in-process model of each bracket for display,
+# and the advancement step that used to live in the fill_parent_match trigger
+#
+# Rounds use heap numbering (see db_helper._build_bracket_tree): the final is round 1,
+# round n is fed by rounds 2n and 2n + 1, so a round's depth is just n.bit_length().
+# A Bracket is loaded with one query and kept per process until
+# Tournament.BracketVersion moves; triggers bump that column whenever a bracket match
+# (teams, scores, winner, lock, kickoff) or a Round link changes, so a page view only
+# costs a primary-key lookup.
+#
+# Advancement does not trust the cached snapshot: a sibling match may have been
+# finalized a moment ago by another worker. advance() locks the parent Round row
+# first, so two referees finishing both halves at once are serialized, and the second
+# one sees the first one's winner once it gets the lock.
+#
+# cache_bus drops a tournament's entry as soon as its BracketVersion moves ('bracket')
+# or the tournament is renamed or removed ('tournament'), so stale brackets do not
+# sit in the LRU; the version check stays the source of truth.
+import threading
+from collections import OrderedDict
+
+from psycopg2.extras import RealDictCursor, execute_values
+
+import cache_bus
+from db import get_connection
+
+CACHE_SIZE = 64
+PARENT_MATCH_DELAY = "1 week"
+
+DISPLAY_COLUMNS = (
+    "roundno",
+    "child1roundno",
+    "child2roundno",
+    "parentroundno",
+    "matchid",
+    "hometeamname",
+    "awayteamname",
+    "hometeamscore",
+    "awayteamscore",
+    "matchstartdatetime",
+)
+
+_cache = OrderedDict()  # tournament id -> Bracket, least recently used first
+_cache_lock = threading.Lock()
+
+
+class Bracket:
+    def __init__(self, tournament_id, version, rows):
+        self.tournament_id = tournament_id
+        self.version = version
+        self.rounds = {row["roundno"]: row for row in rows}
+        self.depth = max(self.rounds).bit_length() if self.rounds else 0
+        self._grouped = None
+
+    def level(self, round_no):
+        """Display level: first round (leaves) = 1, final = depth."""
+        return self.depth - round_no.bit_length() + 1
+
+    def grouped(self):
+        """
+        Rounds grouped by display level, in the shape fetch_matches_grouped has always
+        returned: {level: [round row, ...]}, levels ascending, rounds by RoundNo.
+        Computed once per version.
+        """
+        if self._grouped is None:
+            grouped = {}
+            for round_no in sorted(self.rounds):
+                row = self.rounds[round_no]
+                grouped.setdefault(self.level(round_no), []).append({key: row[key] for key in DISPLAY_COLUMNS})
+            self._grouped = dict(sorted(grouped.items()))
+        return self._grouped
+
+
+def _load(cur, tournament_id, version):
+    cur.execute(
+        """
+        SELECT r.roundno,
+               r.child1roundno,
+               r.child2roundno,
+               r.parentroundno,
+               m.matchid,
+               m.hometeamname,
+               m.awayteamname,
+               m.hometeamscore,
+               m.awayteamscore,
+               m.winnerteam,
+               m.islocked,
+               m.matchstartdatetime
+        FROM Round r
+        LEFT JOIN Match m ON r.t_matchid = m.matchid
+        WHERE r.tournamentid = %s
+        ORDER BY r.roundno;
+        """,
+        (tournament_id,),
+    )
+    return Bracket(tournament_id, version, cur.fetchall())
+
+
+def get_bracket(tournament_id):
+    """The current Bracket of a tournament (None if the tournament does not exist)."""
+    conn = get_connection()
+    try:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute("SELECT BracketVersion FROM Tournament WHERE TournamentID = %s;", (tournament_id,))
+            row = cur.fetchone()
+            if row is None:
+                invalidate(tournament_id)
+                return None
+            version = row["bracketversion"]
+
+            with _cache_lock:
+                cached = _cache.get(tournament_id)
+                if cached is not None and cached.version == version:
+                    _cache.move_to_end(tournament_id)
+                    return cached
+
+            bracket = _load(cur, tournament_id, version)
+    finally:
+        conn.close()
+
+    with _cache_lock:
+        _cache[tournament_id] = bracket
+        _cache.move_to_end(tournament_id)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return bracket
+
+
+def invalidate(tournament_id=None):
+    with _cache_lock:
+        if tournament_id is None:
+            _cache.clear()
+        else:
+            _cache.pop(tournament_id, None)
+
+
+def _on_tournament_change(key):
+    invalidate(int(key) if key is not None else None)
+
+
+cache_bus.register_invalidator("tournament", _on_tournament_change)
+cache_bus.register_invalidator("bracket", _on_tournament_change)
+
+
+def grouped_rounds(tournament_id):
+    bracket = get_bracket(tournament_id)
+    return bracket.grouped() if bracket is not None else {}
+
+
+def advance(cur, match_ids):
+    """
+    Create the parent match of every round in match_ids whose two child matches are
+    now locked with a winner. Runs inside the caller's transaction (cur is the cursor
+    that just locked or finalized the matches).
+
+    Per tournament this is one SELECT ... FOR UPDATE on the open parent rounds and one
+    statement that inserts the parent Matches, their TournamentMatch rows and links
+    the Rounds. The parent kicks off PARENT_MATCH_DELAY from now, with the child1
+    winner at home, as the old trigger did.
+
+    Returns the new parent match ids.
+    """
+    match_ids = [int(match_id) for match_id in match_ids if match_id is not None]
+    if not match_ids:
+        return []
+    with cur.connection.cursor() as plain:
+        return _advance(plain, match_ids)
+
+
+def _advance(cur, match_ids):
+    cur.execute(
+        """
+        SELECT p.TournamentID, p.RoundNo, p.Child1RoundNo, p.Child2RoundNo
+        FROM Round c
+        JOIN Round p ON p.TournamentID = c.TournamentID AND p.RoundNo = c.ParentRoundNo
+        WHERE c.T_MatchID = ANY(%s)
+          AND p.T_MatchID IS NULL
+          AND p.Child1RoundNo IS NOT NULL
+          AND p.Child2RoundNo IS NOT NULL
+        ORDER BY p.TournamentID, p.RoundNo
+        FOR UPDATE OF p;
+        """,
+        (match_ids,),
+    )
+    open_parents = {}
+    for tournament_id, round_no, child1, child2 in cur.fetchall():
+        open_parents.setdefault(tournament_id, []).append((round_no, child1, child2))
+
+    created = []
+    for tournament_id, parents in open_parents.items():
+        # one statement per tournament: a team is in at most one open parent of a
+        # bracket, so (home, away) identifies the inserted match below
+        rows = execute_values(
+            cur,
+            """
+            WITH parents AS (
+                SELECT *
+                FROM (VALUES %s) AS v (tournament_id, round_no, child1, child2, start_delay)
+            ),
+            ready AS (
+                SELECT p.tournament_id,
+                       p.round_no,
+                       p.start_delay,
+                       CASE WHEN m1.WinnerTeam = m1.HomeTeamName THEN m1.HomeTeamID ELSE m1.AwayTeamID END AS home_id,
+                       CASE WHEN m2.WinnerTeam = m2.HomeTeamName THEN m2.HomeTeamID ELSE m2.AwayTeamID END AS away_id,
+                       m1.WinnerTeam AS home_name,
+                       m2.WinnerTeam AS away_name
+                FROM parents p
+                JOIN Round r1 ON r1.TournamentID = p.tournament_id AND r1.RoundNo = p.child1
+                JOIN Match m1 ON m1.MatchID = r1.T_MatchID
+                JOIN Round r2 ON r2.TournamentID = r1.TournamentID AND r2.RoundNo = p.child2
+                JOIN Match m2 ON m2.MatchID = r2.T_MatchID
+                WHERE m1.IsLocked AND m1.WinnerTeam IS NOT NULL
+                  AND m2.IsLocked AND m2.WinnerTeam IS NOT NULL
+            ),
+            inserted AS (
+                INSERT INTO Match (
+                    HomeTeamID,
+                    AwayTeamID,
+                    MatchStartDatetime,
+                    HomeTeamName,
+                    AwayTeamName,
+                    HomeTeamScore,
+                    AwayTeamScore,
+                    WinnerTeam,
+                    IsLocked
+                )
+                SELECT home_id, away_id, NOW() + start_delay, home_name, away_name, NULL, NULL, NULL, FALSE
+                FROM ready
+                RETURNING MatchID, HomeTeamID, AwayTeamID
+            ),
+            tournament_matches AS (
+                INSERT INTO TournamentMatch (MatchID)
+                SELECT MatchID FROM inserted
+            )
+            UPDATE Round r
+            SET T_MatchID = i.MatchID
+            FROM inserted i
+            JOIN ready rd ON rd.home_id = i.HomeTeamID AND rd.away_id = i.AwayTeamID
+            WHERE r.TournamentID = rd.tournament_id
+              AND r.RoundNo = rd.round_no
+            RETURNING i.MatchID;
+            """,
+            [(tournament_id, round_no, child1, child2, PARENT_MATCH_DELAY) for round_no, child1, child2 in parents],
+            template="(%s::int, %s::int, %s::int, %s::int, %s::interval)",
+            page_size=len(parents),
+            fetch=True,
+        )
+        created.extend(row[0] for row in rows)
+    return created
+
@@ -0,0 +1,127 @@
+# cache invalidation bus: Postgres change notifications fanned out to the in-process
+# caches (refcache, identity, bracket)
+#
+# Triggers on every cached table (migration 0011_cache_notify) send 'table:key' on
+# the cache_invalidation channel, so writes made by other workers, by other
+# triggers (handle_accepted_transfer_offer moving Employee.TeamID, BracketVersion
+# bumps, sent as 'bracket:<id>') or straight in psql all reach every app process. Each process runs one
+# listener thread on its own connection (LISTEN cannot share a pooled one) and
+# hands each notification to the invalidators registered for that table.
+#
+# Notifications sent while the listener is disconnected are lost, so after every
+# (re)connect each invalidator is called once with key None, meaning "drop
+# everything".
+import os
+import select
+import threading
+import time
+
+import psycopg2
+import psycopg2.extensions
+
+import db
+
+CHANNEL = "cache_invalidation"
+POLL_TIMEOUT = 5.0  # seconds between checks of the stop flag
+RECONNECT_DELAY = 1.0
+RECONNECT_DELAY_MAX = 30.0
+
+_invalidators = {}  # table -> [callback(key)]
+_lock = threading.Lock()
+
+
+def register_invalidator(table, callback):
+    """Call callback(key) after each committed write to table (key is a str, None = all)."""
+    with _lock:
+        _invalidators.setdefault(table.lower(), []).append(callback)
+
+
+def dispatch(table, key):
+    with _lock:
+        callbacks = list(_invalidators.get(table, ()))
+    for callback in callbacks:
+        try:
+            callback(key)
+        except Exception as e:
+            # one broken cache must not stop the others from being invalidated
+            print(f"[cache_bus] invalidator for {table} failed: {e}")
+
+
+def dispatch_all():
+    with _lock:
+        tables = list(_invalidators)
+    for table in tables:
+        dispatch(table, None)
+
+
+def parse(payload):
+    """'table:key' -> (table, key); an empty key means the whole table."""
+    table, _, key = payload.partition(":")
+    return table, key or None
+
+
+class Listener:
+    def __init__(self, dsn):
+        self.dsn = dsn
+        self._stop = threading.Event()
+        self._thread = None
+        self.received = 0
+        self.reconnects = 0
+
+    def _listen(self):
+        conn = psycopg2.connect(self.dsn)
+        conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with conn.cursor() as cur:
+            cur.execute(f"LISTEN {CHANNEL};")
+        return conn
+
+    def _drain(self, conn):
+        conn.poll()
+        while conn.notifies:
+            notify = conn.notifies.pop(0)
+            self.received += 1
+            dispatch(*parse(notify.payload))
+
+    def run_forever(self):
+        delay = RECONNECT_DELAY
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = self._listen()
+                delay = RECONNECT_DELAY
+                # anything sent before LISTEN took effect was missed
+                dispatch_all()
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], POLL_TIMEOUT) != ([], [], []):
+                        self._drain(conn)
+            except (psycopg2.Error, OSError) as e:
+                print(f"[cache_bus] listener lost its connection: {e}")
+                self.reconnects += 1
+                self._stop.wait(delay)
+                delay = min(delay * 2, RECONNECT_DELAY_MAX)
+            finally:
+                if conn is not None and not conn.closed:
+                    conn.close()
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run_forever, name="cache-bus", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+def init_app(app):
+    # CACHE_BUS_ENABLED=0 leaves the caches on their MAX_AGE expiry alone
+    if os.environ.get("CACHE_BUS_ENABLED", "1") != "1" or not db.DATABASE_URL:
+        return None
+    # with the debug reloader only the serving child process listens
+    if app.debug and os.environ.get("WERKZEUG_RUN_MAIN") != "true":
+        return None
+    listener = Listener(db.DATABASE_URL)
+    listener.start()
+    app.extensions["cache_bus"] = listener
+    return listener
@@ -0,0 +1,75 @@
+# maintenance commands, run from the app directory with `flask --app app <command>`
+from datetime import timedelta
+
+import click
+
+from db_helper import rebuild_player_stats, rebuild_team_season_standings, seed_match_plays
+from index_advisor import format_report, run_advisor
+from migrate import apply_migrations, pending_migrations
+
+
+def register_commands(app):
+    @app.cli.command("rebuild-player-stats")
+    def rebuild_player_stats_command():
+        """Recompute all materialized player statistics from Play."""
+        rebuild_player_stats()
+        click.echo("Player statistics rebuilt.")
+
+    @app.cli.command("rebuild-standings")
+    def rebuild_standings_command():
+        """Recompute TeamSeasonStanding from all scored seasonal matches."""
+        rows = rebuild_team_season_standings()
+        click.echo(f"Standings rebuilt ({rows} team-season rows).")
+
+    @app.cli.command("migrate")
+    @click.option("--list", "list_only", is_flag=True, help="Only show pending migrations.")
+    def migrate_command(list_only):
+        """Apply pending SQL migrations from migrations/."""
+        if list_only:
+            pending = pending_migrations()
+            for version, _ in pending:
+                click.echo(version)
+            if not pending:
+                click.echo("Database is up to date.")
+            return
+        if not apply_migrations(log=click.echo):
+            click.echo("Database is up to date.")
+
+    @app.cli.command("index-advisor")
+    @click.option("--min-rows", default=100, show_default=True, help="Report seq scans reading at least this many rows.")
+    def index_advisor_command(min_rows):
+        """Replay db_helper read queries under EXPLAIN ANALYZE and report seq scans / missing indexes."""
+        click.echo(format_report(run_advisor(min_rows=min_rows)))
+
+    @app.cli.command("seed-plays")
+    @click.option("--league", "league_id", type=int, help="League of the season to seed.")
+    @click.option("--season-no", type=int, help="Season number (with --league and --season-year).")
+    @click.option("--season-year", type=click.DateTime(["%Y-%m-%d"]), help="Season year date, e.g. 2025-01-01.")
+    @click.option("--tournament", "tournament_id", type=int, help="Tournament to seed.")
+    @click.option("--level", "bracket_level", type=int, help="Only this bracket level of --tournament (1 = first round).")
+    @click.option("--from", "date_from", type=click.DateTime(["%Y-%m-%d"]), help="First kickoff day to include.")
+    @click.option("--to", "date_to", type=click.DateTime(["%Y-%m-%d"]), help="Last kickoff day to include.")
+    @click.option("--match", "match_ids", type=int, multiple=True, help="Match id; repeat for more.")
+    @click.option("--eligible-only", is_flag=True, help="Skip players whose IsEligible is not 'eligible'.")
+    def seed_plays_command(
+        league_id, season_no, season_year, tournament_id, bracket_level, date_from, date_to, match_ids, eligible_only
+    ):
+        """Add the missing Play rows for a season, tournament, date range or list of matches in one statement."""
+        try:
+            report = seed_match_plays(
+                match_ids=list(match_ids) or None,
+                league_id=league_id,
+                season_no=season_no,
+                season_year=season_year.date() if season_year else None,
+                tournament_id=tournament_id,
+                bracket_level=bracket_level,
+                date_from=date_from,
+                date_to=date_to + timedelta(days=1) if date_to else None,
+                eligible_only=eligible_only,
+            )
+        except ValueError as exc:
+            raise click.UsageError(str(exc))
+        click.echo(
+            f"Seeded {report['inserted']} Play rows across {report['seeded_matches']} "
+            f"of {report['matches']} matches."
+        )
@@ -1,10 +1,140 @@
 import os
-import psycopg2
+import threading
+
+import psycopg2.extensions
+from flask import g, has_request_context
+
+from db_pool import pool_from_env
 
 DATABASE_URL = os.environ.get("DATABASE_URL")
 
+_pool = None
+_pool_lock = threading.Lock()
+_connection_factory = None
 
-def get_connection():
+
+def set_connection_factory(factory):
+    # psycopg2 connection class for new pool connections (metrics.init_app installs an
+    # instrumented one); only affects connections opened after the call
+    global _connection_factory
+    _connection_factory = factory
+
+
+def get_pool():
+    global _pool
     if not DATABASE_URL:
         raise RuntimeError("DATABASE_URL environment variable is not set.")
-    return psycopg2.connect(DATABASE_URL)
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = pool_from_env(DATABASE_URL, connection_factory=_connection_factory)
+    return _pool
+
+
+class BorrowedConnection:
+    # handed to helpers while a request owns a connection; close() does not give it
+    # back, it only clears a failed transaction so the next helper can keep going.
+    # A `with conn:` block nested inside another one (helper calling helper) becomes a
+    # savepoint, so only the outermost block commits.
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        depth = g.get("_db_tx_depth", 0)
+        if depth:
+            with self._conn.cursor() as cur:
+                cur.execute(f"SAVEPOINT unit_of_work_{depth};")
+        else:
+            self._conn.__enter__()
+        g._db_tx_depth = depth + 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        depth = g._db_tx_depth = g._db_tx_depth - 1
+        if not depth:
+            return self._conn.__exit__(exc_type, exc, tb)
+        failed = (
+            exc_type is not None
+            or self._conn.get_transaction_status() == psycopg2.extensions.TRANSACTION_STATUS_INERROR
+        )
+        with self._conn.cursor() as cur:
+            if failed:
+                cur.execute(f"ROLLBACK TO SAVEPOINT unit_of_work_{depth};")
+            cur.execute(f"RELEASE SAVEPOINT unit_of_work_{depth};")
+        return False
+
+    @property
+    def closed(self):
+        return self._conn.closed
+
+    def close(self):
+        if self._conn.closed or g.get("_db_tx_depth", 0):
+            return
+        if self._conn.get_transaction_status() == psycopg2.extensions.TRANSACTION_STATUS_INERROR:
+            self._conn.rollback()
+
+
+def get_connection():
+    # inside a request every helper shares one lazily opened connection (committed at
+    # teardown); elsewhere (CLI, background jobs) this is a plain pool checkout
+    if has_request_context():
+        conn = g.get("_db_conn")
+        if conn is None:
+            conn = g._db_conn = get_pool().getconn()
+        return BorrowedConnection(conn)
+    # callers still call conn.close(); for pooled connections that returns it to the pool
+    return get_pool().getconn()
+
+
+def connection():
+    return get_pool().connection()
+
+
+def on_commit(callback):
+    # run callback once the current work is committed: inside a request that is the
+    # commit at teardown (dropped if the request rolls back), elsewhere helpers have
+    # already committed when they return, so it runs right away
+    if has_request_context() and g.get("_db_conn") is not None:
+        g.setdefault("_db_on_commit", []).append(callback)
+    else:
+        callback()
+
+
+def pool_stats():
+    return _pool.snapshot() if _pool is not None else {}
+
+
+def _close_request_connection(exc):
+    conn = g.pop("_db_conn", None)
+    g.pop("_db_tx_depth", None)
+    callbacks = g.pop("_db_on_commit", [])
+    if conn is None:
+        return
+    committed = False
+    try:
+        if conn.closed:
+            return
+        status = conn.get_transaction_status()
+        if exc is None and status != psycopg2.extensions.TRANSACTION_STATUS_INERROR:
+            conn.commit()
+            committed = True
+        else:
+            conn.rollback()
+    except psycopg2.Error as e:
+        print(f"Error finishing request transaction: {e}")
+    finally:
+        conn.close()
+    if committed:
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error in on_commit callback: {e}")
+
+
+def init_app(app):
+    app.teardown_appcontext(_close_request_connection)
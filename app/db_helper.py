@@ -1,13 +1,17 @@
 # this is a mediator file that talks with the database and does common database tasks
-import math
 import random
 from datetime import date, datetime, timedelta
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
 from collections import defaultdict
 
 import os
 
+import bracket
+import identity
+import player_search
+import refcache
+import singleflight
 from db import get_connection
 
 
@@ -57,6 +61,7 @@ def fetch_one(query, params=None):
             conn.close()
 
 
+@refcache.cached("team")
 def fetch_all_teams():
     conn = get_connection()
     try:
@@ -122,80 +127,12 @@ def fetch_all_training_sessions():
 
 
 def fetch_filtered_players(filters):
-    conn = get_connection()
-    try:
-        name = filters.get("name")
-        nationality = filters.get("nationality")
-        min_age = filters.get("min_age")
-        max_age = filters.get("max_age")
-        current_team = filters.get("team")
-        position = filters.get("position")
-
-        min_birthdate = None
-        max_birthdate = None
-        if min_age and max_age:
-            today = date.today()
-            min_birthdate = date(today.year - max_age, today.month, today.day)
-            max_birthdate = date(today.year - min_age, today.month, today.day)
-
-        params = []
-        conditions = []
-        if name and name.strip() != "":
-            stripped_name = name.strip()
-            name_parts = stripped_name.split()
-            if len(name_parts) == 2:
-                conditions.append("(u.firstname ILIKE %s AND u.lastname ILIKE %s)")
-                params.append(name_parts[0])
-                params.append(name_parts[1])
-            else:
-                conditions.append("(u.firstname ILIKE %s OR u.lastname ILIKE %s)")
-                params.append(stripped_name)
-                params.append(stripped_name)
-        if nationality:
-            conditions.append("u.nationality = %s")
-            params.append(nationality)
-        if min_birthdate:
-            conditions.append("u.birthdate <= %s")
-            params.append(min_birthdate)
-        if max_birthdate:
-            conditions.append("u.birthdate >= %s")
-            params.append(max_birthdate)
-        if current_team:
-            conditions.append("t.teamid = %s")
-            params.append(current_team)
-        if position:
-            conditions.append("p.position = %s")
-            params.append(position)
-
-        where_clause = " AND ".join(conditions) if conditions else "1=1"
-
-        query = f"""
-            SELECT u.usersid,
-                   u.firstname,
-                   u.lastname,
-                   u.nationality,
-                   u.birthdate,
-                   p.height,
-                   p.weight,
-                   p.overall,
-                   p.position,
-                   p.iseligible,
-                   t.teamid,
-                   t.teamname
-            FROM Player p
-            JOIN Employee e ON p.usersid = e.usersid
-            JOIN Users u ON p.usersid = u.usersid
-            LEFT JOIN Team t ON e.teamid = t.teamid
-            WHERE {where_clause}
-            ORDER BY u.lastname, u.firstname;
-        """  # Does not have salary information, which should exist
-        # TODO: Make a view in init.sql that returns a player and their current employment
-
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute(query, params)
-            return cur.fetchall()
-    finally:
-        conn.close()
+    """
+    Every player matching filters (name, nationality, min_age, max_age, team,
+    position), best name match first, then by last and first name. See
+    player_search.search_players for pages and facet counts.
+    """
+    return player_search.search_players(filters, limit=None, with_facets=False)["players"]
 
 
 def fetch_player_by_id(playerid):
@@ -233,6 +170,7 @@ def fetch_player_by_id(playerid):
         conn.close()
 
 
+@refcache.cached("user")
 def fetch_all_nationalities():
     conn = get_connection()
     try:
@@ -250,6 +188,7 @@ def fetch_all_nationalities():
         conn.close()
 
 
+@refcache.cached("player")
 def fetch_all_positions():
     conn = get_connection()
     try:
@@ -379,90 +318,47 @@ def report_players(filters):
 
 
 def report_league_standings(league_id, season_no, season_year):
-    """Simple standings: wins/draws/losses/points from SeasonalMatch scores."""
+    """Simple standings: wins/draws/losses/points from the TeamSeasonStanding table."""
     conn = get_connection()
     try:
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
             # Build query dynamically based on which parameters are provided
             query = """
                 SELECT
-                    m.HomeTeamID,
-                    m.AwayTeamID,
-                    m.HomeTeamName,
-                    m.AwayTeamName,
-                    m.HomeTeamScore,
-                    m.AwayTeamScore
-                FROM Match m
-                JOIN SeasonalMatch sm ON m.MatchID = sm.MatchID
-                WHERE sm.LeagueID = %s
+                    ts.TeamID AS teamid,
+                    MAX(ts.TeamName) AS teamname,
+                    SUM(ts.Played)::INT AS played,
+                    SUM(ts.Wins)::INT AS wins,
+                    SUM(ts.Draws)::INT AS draws,
+                    SUM(ts.Losses)::INT AS losses,
+                    SUM(ts.GoalsFor)::INT AS gf,
+                    SUM(ts.GoalsAgainst)::INT AS ga,
+                    SUM(ts.Points)::INT AS points
+                FROM TeamSeasonStanding ts
+                WHERE ts.LeagueID = %s
             """
             params = [league_id]
             
             if season_no is not None:
-                query += " AND sm.SeasonNo = %s"
+                query += " AND ts.SeasonNo = %s"
                 params.append(season_no)
             
             if season_year is not None:
-                query += " AND sm.SeasonYear = %s"
+                query += " AND ts.SeasonYear = %s"
                 params.append(season_year)
+
+            query += """
+                GROUP BY ts.TeamID
+                HAVING SUM(ts.Played) > 0
+                ORDER BY points DESC, SUM(ts.GoalsFor) - SUM(ts.GoalsAgainst) DESC, wins DESC, teamname
+            """
             
             cur.execute(query, tuple(params))
-            rows = cur.fetchall()
+            return cur.fetchall()
 
     finally:
         conn.close()
 
-    stats = {}
-
-    def ensure(team_id, name):
-        if team_id not in stats:
-            stats[team_id] = {
-                "teamid": team_id,
-                "teamname": name,
-                "played": 0,
-                "wins": 0,
-                "draws": 0,
-                "losses": 0,
-                "gf": 0,
-                "ga": 0,
-                "points": 0,
-            }
-
-    for row in rows:
-        home_id = row["hometeamid"]
-        away_id = row["awayteamid"]
-        home_name = row["hometeamname"]
-        away_name = row["awayteamname"]
-        hs = row["hometeamscore"]
-        as_ = row["awayteamscore"]
-        if hs is None or as_ is None:
-            continue
-        ensure(home_id, home_name)
-        ensure(away_id, away_name)
-        stats[home_id]["played"] += 1
-        stats[away_id]["played"] += 1
-        stats[home_id]["gf"] += hs
-        stats[home_id]["ga"] += as_
-        stats[away_id]["gf"] += as_
-        stats[away_id]["ga"] += hs
-        if hs > as_:
-            stats[home_id]["wins"] += 1
-            stats[home_id]["points"] += 3
-            stats[away_id]["losses"] += 1
-        elif hs < as_:
-            stats[away_id]["wins"] += 1
-            stats[away_id]["points"] += 3
-            stats[home_id]["losses"] += 1
-        else:
-            stats[home_id]["draws"] += 1
-            stats[away_id]["draws"] += 1
-            stats[home_id]["points"] += 1
-            stats[away_id]["points"] += 1
-
-    return sorted(
-        stats.values(), key=lambda s: (-s["points"], -(s["gf"] - s["ga"]), -s["wins"])
-    )
-
 
 def report_player_attendance(date_from=None, date_to=None, player_ids=None, session_ids=None, team_id=None, all_teams=False):
     """
@@ -553,59 +449,9 @@ def fetch_matches_grouped(tournament_id):
     Fetch tournament bracket with all rounds (including those without matches).
     Returns rounds grouped by level (for display).
     Levels increase as teams advance: first round = level 1, final = highest level.
+    Served from the per-process bracket cache (see bracket.py).
     """
-    
-    conn = get_connection()
-    try:
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute(
-                """
-                SELECT r.roundno,
-                       r.child1roundno,
-                       r.child2roundno,
-                       r.parentroundno,
-                       m.matchid,
-                       m.hometeamname,
-                       m.awayteamname,
-                       m.hometeamscore,
-                       m.awayteamscore,
-                       m.matchstartdatetime
-                FROM Round r
-                LEFT JOIN Match m ON r.t_matchid = m.matchid
-                WHERE r.tournamentid = %s
-                ORDER BY r.roundno;
-                """,
-                (tournament_id,),
-            )
-            rows = cur.fetchall()
-    finally:
-        conn.close()
-
-    # Find the maximum depth (level) in the tournament
-    # The round_no follows: level 0 = 1 (final/root), level 1 = 2-3, level 2 = 4-7, etc.
-    # Leaves (first round matches) are at the highest internal level
-    if not rows:
-        return {}
-    
-    max_round_no = max(row["roundno"] for row in rows)
-    max_internal_level = math.floor(math.log2(max_round_no)) if max_round_no > 0 else 0
-    
-    def _round_level(round_no):
-        """Calculate display level: first round (leaves) = 1, final (root) = highest level"""
-        if round_no <= 0:
-            return max_internal_level + 1  # Root (final) is the highest display level
-        # Calculate the internal level (0-based from root, where root=0)
-        internal_level = math.floor(math.log2(round_no)) if round_no > 0 else 0
-        # Convert to display level: leaves (highest internal) = 1, root (0) = max_internal_level + 1
-        return max_internal_level - internal_level + 1
-
-    grouped = defaultdict(list)
-    for row in rows:
-        level = _round_level(row["roundno"])
-        grouped[level].append(row)
-
-    # Return sorted by level (1, 2, 3, ...) so first round appears first (left side)
-    return dict(sorted(grouped.items()))
+    return bracket.grouped_rounds(tournament_id)
 
 
 def check_coach_can_make_transfer_offer(coachid):
@@ -636,96 +482,14 @@ def check_coach_can_make_transfer_offer(coachid):
         conn.close()
 
 def fetch_transferable_players(filters, coachid):
-    conn = get_connection()
-    try:
-        name = filters.get("name")
-        nationality = filters.get("nationality")
-
-        min_age = None
-        max_age = None
-        if filters.get("min_age"):
-            min_age = int(filters.get("min_age"))
-        if filters.get("max_age"):
-            max_age = int(filters.get("max_age"))
-        current_team = filters.get("team")
-        position = filters.get("position")
-        contact_expiration_date = filters.get("contact_expiration_date")
-
-        min_birthdate = None
-        max_birthdate = None
-        today = date.today()
-        if max_age:
-            max_birthdate = date(today.year - max_age, today.month, today.day)
-        if min_age:
-            min_birthdate = date(today.year - min_age, today.month, today.day)
-
-        params = []
-        conditions = []
-        if name and name.strip() != "":
-            stripped_name = name.strip()
-            name_parts = stripped_name.split()
-            if len(name_parts) == 2:
-                conditions.append("(u.firstname ILIKE %s AND u.lastname ILIKE %s)")
-                params.append(f"%{name_parts[0]}%")
-                params.append(f"%{name_parts[1]}%")
-            else:
-                conditions.append("(u.firstname ILIKE %s OR u.lastname ILIKE %s)")
-                params.append(f"%{stripped_name}%")
-                params.append(f"%{stripped_name}%")
-        if nationality:
-            conditions.append("u.nationality = %s")
-            params.append(nationality)
-        if min_birthdate:
-            conditions.append("u.birthdate <= %s")
-            params.append(min_birthdate)
-        if max_birthdate:
-            conditions.append("u.birthdate >= %s")
-            params.append(max_birthdate)
-        if current_team:
-            conditions.append("ce.teamid = %s")
-            params.append(current_team)
-        if position:
-            conditions.append("p.position = %s")
-            params.append(position)
-        if contact_expiration_date:
-            # Include players with no contract (NULL EndDate) OR contracts expiring before the date
-            conditions.append("(ce.EndDate IS NULL OR ce.EndDate < %s)")
-            params.append(contact_expiration_date)
-
-        # Exclude players from the coach's own team
-        # Always include players with no contract (ce.EndDate IS NULL)
-        # For players with contracts: include if they have no team OR not on coach's team
-        conditions.append("(ce.EndDate IS NULL OR e.teamid IS NULL OR e.teamid <> (SELECT teamid FROM Employee WHERE usersid = %s))")
-        params.append(coachid)
-
-        where_clause = " AND ".join(conditions) if conditions else "1=1"
-
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute(
-                f"""
-                SELECT 
-                    p.UsersID, 
-                    u.FirstName, 
-                    u.LastName, 
-                    u.nationality,
-                    u.Email, 
-                    p.Position,
-                    u.birthdate,
-                    ce.Salary,
-                    ce.EndDate,
-                    ce.TeamName
-                FROM Player p
-                JOIN Users u ON p.UsersID = u.UsersID
-                LEFT JOIN Employee e ON p.UsersID = e.UsersID
-                LEFT JOIN CurrentEmployment ce ON p.UsersID = ce.UsersID
-                WHERE {where_clause}
-                """,
-                (params),
-            )
-            rows = cur.fetchall()
-            return rows
-    finally:
-        conn.close()
+    """
+    Every player on the transfer market for this coach (anyone not under contract
+    with the coach's team) matching filters; contact_expiration_date keeps players
+    without a contract or with one ending before that date. See
+    player_search.search_players for pages and facet counts.
+    """
+    filters = dict(filters, contract_expires_before=filters.get("contact_expiration_date"))
+    return player_search.search_players(filters, coach_id=coachid, limit=None, with_facets=False)["players"]
 
 
 def fetch_player_transfer_offers(playerid):
@@ -956,15 +720,20 @@ def finalize_transfer_offer(offerid, decision):
                 UPDATE Offer
                 SET OfferStatus = %s
                 WHERE OfferId = %s
+                RETURNING RequestedPlayer
                 """,
                 (
                     decision,
                     offerid,
                 ),
             )
+            row = cur.fetchone()
             conn.commit()
     finally:
         conn.close()
+    if decision and row:
+        # an accepted offer moves the player to the coach's team
+        identity.invalidate(row["requestedplayer"])
 
 
 def create_tournament_with_bracket(form_data, admin_id, moderator_ids=None):
@@ -1020,26 +789,24 @@ def create_tournament_with_bracket(form_data, admin_id, moderator_ids=None):
                 )
                 tournament_id = cur.fetchone()[0]
 
-                for moderator_id in moderator_ids:
-                    cur.execute(
-                        """
-                        INSERT INTO TournamentModeration (T_ID, AdminID)
-                        VALUES (%s, %s)
-                        ON CONFLICT DO NOTHING;
-                        """,
-                        (tournament_id, moderator_id),
-                    )
+                cur.execute(
+                    """
+                    INSERT INTO TournamentModeration (T_ID, AdminID)
+                    SELECT %s, m.AdminID
+                    FROM unnest(%s::int[]) AS m (AdminID)
+                    ON CONFLICT DO NOTHING;
+                    """,
+                    (tournament_id, moderator_ids),
+                )
 
                 leaf_match_ids = _build_bracket_tree(
                     cur, tournament_id, team_ids, start_date
                 )
 
-        # NOTE: Play rows are now created automatically via the database trigger
-        # trg_auto_create_plays_on_match_insert when matches are inserted.
-        # The following code is commented out as the trigger handles this:
-        # for match_id in leaf_match_ids:
-        #     create_plays_for_match_players_on_insert(match_id)
+        # NOTE: Play rows are created by the statement-level trigger
+        # trg_auto_create_plays_on_match_insert, inside the bracket transaction.
 
+        refcache.bump("tournament")
         return {"tournament_id": tournament_id, "match_ids": leaf_match_ids}
     finally:
         conn.close()
@@ -1047,134 +814,68 @@ def create_tournament_with_bracket(form_data, admin_id, moderator_ids=None):
 
 def _build_bracket_tree(cur, tournament_id, team_ids, start_date):
     """
-    Build complete binary bracket tree in memory, then INSERT all at once.
+    Write the complete binary bracket in two statements, whatever its size.
+
+    Rounds use heap numbering: the final is RoundNo 1, node n has children 2n and
+    2n + 1 and parent n // 2, and the leaves are RoundNo team_count/2 .. team_count-1
+    (one match each). This is the same numbering as 2^level + index.
 
-    Steps:
-    1. Validate team_count is power of 2
-    2. Calculate tree depth (leaf level)
-    3. Generate all RoundNo's with parent-child links (no DB yet)
-    4. INSERT all rounds into DB (single transaction)
-    5. CREATE matches ONLY for leaf rounds
-    6. UPDATE leaf rounds with MatchID
+    1. One INSERT ... SELECT FROM generate_series creates every Round row with its
+       child/parent links (the self-referencing foreign keys are checked at the end
+       of the statement, so insertion order does not matter).
+    2. One statement inserts the leaf Matches, their TournamentMatch rows and points
+       the leaf Rounds at them. The statement-level match insert trigger seeds all
+       Play rows inside the same transaction.
 
-    Tree structure:
-    - Root: RoundNo=1, ParentRoundNo=NULL
-    - Level L: 2^L nodes, RoundNo from 2^L to 2^L + (2^L - 1)
-    - Leaves: depth level, team_count/2 nodes
-    - Each leaf has exactly 1 match
+    Returns the leaf match ids in bracket order.
     """
     team_count = len(team_ids)
 
-    # Validate power of 2 (already done in _create_tournament_with_bracket, but be safe)
-    if (team_count & (team_count - 1)) != 0:
+    # Validate power of 2 (already done in create_tournament_with_bracket, but be safe)
+    if team_count < 2 or (team_count & (team_count - 1)) != 0:
         raise ValueError("Team count must be a power of 2.")
 
-    # Calculate depth
-    # depth = level of leaves
-    # leaf count = 2^depth = team_count / 2
-    # So depth = log2(team_count) - 1
-    depth = int(math.log2(team_count)) - 1
-
-    # Helper functions
-    def get_round_no(level, index):
-        """Convert (level, index) to RoundNo. RoundNo = 2^level + index."""
-        return (1 << level) + index
-
-    def get_children(level, index):
-        """Get (child1_round_no, child2_round_no) for node at (level, index)."""
-        if level == depth:
-            # Leaves have no children
-            return None, None
-        child_level = level + 1
-        child1_no = get_round_no(child_level, index * 2)
-        child2_no = get_round_no(child_level, index * 2 + 1)
-        return child1_no, child2_no
-
-    def get_parent(level, index):
-        """Get parent_round_no for node at (level, index)."""
-        if level == 0:
-            # Root has no parent
-            return None
-        parent_level = level - 1
-        parent_index = index // 2
-        return get_round_no(parent_level, parent_index)
-
-    # Generate all rounds in memory (no DB access yet)
-    rounds_to_insert = (
-        []
-    )  # List of tuples: (tournament_id, round_no, child1_no, child2_no, parent_no)
-
-    for level in range(depth + 1):
-        nodes_at_level = 1 << level  # 2^level
-        for index in range(nodes_at_level):
-            round_no = get_round_no(level, index)
-            child1, child2 = get_children(level, index)
-            parent = get_parent(level, index)
-
-            rounds_to_insert.append((tournament_id, round_no, child1, child2, parent))
-
-    # INSERT all rounds with links left NULL, then set them after all rows exist
-    for (
-        tournament_id_val,
-        round_no,
-        child1_no,
-        child2_no,
-        parent_no,
-    ) in rounds_to_insert:
-        cur.execute(
-            """
-            INSERT INTO Round (TournamentID, RoundNo, T_MatchID, Child1RoundNo, Child2RoundNo, ParentRoundNo)
-            VALUES (%s, %s, NULL, NULL, NULL, NULL);
-            """,
-            (tournament_id_val, round_no),
-        )
+    leaf_start = team_count // 2
 
-    for (
-        tournament_id_val,
-        round_no,
-        child1_no,
-        child2_no,
-        parent_no,
-    ) in rounds_to_insert:
-        cur.execute(
-            """
-            UPDATE Round
-            SET Child1RoundNo = %s,
-                Child2RoundNo = %s,
-                ParentRoundNo = %s
-            WHERE TournamentID = %s AND RoundNo = %s;
-            """,
-            (child1_no, child2_no, parent_no, tournament_id_val, round_no),
-        )
+    cur.execute(
+        """
+        INSERT INTO Round (TournamentID, RoundNo, T_MatchID, Child1RoundNo, Child2RoundNo, ParentRoundNo)
+        SELECT %s,
+               n,
+               NULL,
+               CASE WHEN n < %s THEN 2 * n END,
+               CASE WHEN n < %s THEN 2 * n + 1 END,
+               NULLIF(n / 2, 0)
+        FROM generate_series(1, %s) AS n;
+        """,
+        (tournament_id, leaf_start, leaf_start, team_count - 1),
+    )
 
-    # CREATE matches for leaf rounds only
-    # Shuffle teams and pair them
+    # Shuffle teams and pair them: (team0, team1), (team2, team3), ...
     shuffled_ids = team_ids[:]
     random.shuffle(shuffled_ids)
-    team_names = lookup_team_names(cur, team_ids)
-
-    # Create pairs: (team0, team1), (team2, team3), ...
-    leaf_pairs = [
-        (shuffled_ids[i], shuffled_ids[i + 1]) for i in range(0, len(shuffled_ids), 2)
-    ]
-
-    created_match_ids = []
-
-    for leaf_index, (home_team_id, away_team_id) in enumerate(leaf_pairs):
-        leaf_round_no = get_round_no(depth, leaf_index)
-
-        home_team_name = team_names.get(home_team_id)
-        away_team_name = team_names.get(away_team_id)
-        if not home_team_name or not away_team_name:
-            raise ValueError("One or more selected teams no longer exist.")
 
+    leaves = []
+    for leaf_index in range(leaf_start):
         # Match datetime: start_date + (leaf_index * 1 day), 19:00
-        match_datetime = start_date + timedelta(days=leaf_index)
-        match_datetime = match_datetime.replace(hour=19, minute=0, second=0)
+        match_datetime = (start_date + timedelta(days=leaf_index)).replace(hour=19, minute=0, second=0)
+        leaves.append(
+            (
+                leaf_start + leaf_index,
+                shuffled_ids[2 * leaf_index],
+                shuffled_ids[2 * leaf_index + 1],
+                match_datetime,
+            )
+        )
 
-        # INSERT Match
-        cur.execute(
-            """
+    rows = execute_values(
+        cur,
+        """
+        WITH leaves AS (
+            SELECT *
+            FROM (VALUES %s) AS v (round_no, home_id, away_id, start_at)
+        ),
+        inserted AS (
             INSERT INTO Match (
                 HomeTeamID,
                 AwayTeamID,
@@ -1188,40 +889,35 @@ def _build_bracket_tree(cur, tournament_id, team_ids, start_date):
                 WinnerTeam,
                 IsLocked
             )
-            VALUES (%s, %s, %s, NULL, NULL, %s, %s, NULL, NULL, NULL, FALSE)
-            RETURNING MatchID;
-            """,
-            (
-                home_team_id,
-                away_team_id,
-                match_datetime,
-                home_team_name,
-                away_team_name,
-            ),
-        )
-        match_id = cur.fetchone()[0]
-        created_match_ids.append(match_id)
-
-        # INSERT into TournamentMatch
-        cur.execute(
-            "INSERT INTO TournamentMatch (MatchID) VALUES (%s);",
-            (match_id,),
-        )
-
-        # UPDATE leaf round with match ID
-        cur.execute(
-            """
-            UPDATE Round
-            SET T_MatchID = %s
-            WHERE TournamentID = %s AND RoundNo = %s;
-            """,
-            (match_id, tournament_id, leaf_round_no),
+            SELECT l.home_id, l.away_id, l.start_at, NULL, NULL, ht.TeamName, awt.TeamName, NULL, NULL, NULL, FALSE
+            FROM leaves l
+            JOIN Team ht ON ht.TeamID = l.home_id
+            JOIN Team awt ON awt.TeamID = l.away_id
+            RETURNING MatchID, HomeTeamID, AwayTeamID
+        ),
+        tournament_matches AS (
+            INSERT INTO TournamentMatch (MatchID)
+            SELECT MatchID FROM inserted
         )
+        UPDATE Round r
+        SET T_MatchID = i.MatchID
+        FROM inserted i
+        JOIN leaves l ON l.home_id = i.HomeTeamID AND l.away_id = i.AwayTeamID
+        WHERE r.TournamentID = """
+        + str(int(tournament_id))
+        + """
+          AND r.RoundNo = l.round_no
+        RETURNING r.RoundNo, i.MatchID;
+        """,
+        leaves,
+        template="(%s::int, %s::int, %s::int, %s::timestamp)",
+        page_size=len(leaves),
+        fetch=True,
+    )
+    if len(rows) != len(leaves):
+        raise ValueError("One or more selected teams no longer exist.")
 
-        # Seed Play rows for the tournament match (uses employment at match start)
-        create_plays_for_match_players_on_insert(match_id)
-
-    return created_match_ids
+    return [match_id for _, match_id in sorted(rows)]
 
 
 def lookup_team_names(cur, team_ids):
@@ -1297,13 +993,39 @@ def delete_tournament_and_matches(tournament_id):
                     """,
                     (tournament_id, tournament_id),
                 )
+        refcache.bump("tournament")
+    finally:
+        conn.close()
+
+
+def fetch_teams_at(pairs):
+    """
+    Resolves the team each employee belonged to at a point in time, for many
+    (users_id, timestamp) pairs in a single query (GiST lookup on Employed.Period).
+    Returns {(users_id, timestamp): team_id or None}.
+    """
+    pairs = list(pairs)
+    if not pairs:
+        return {}
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT Ord, TeamID
+                FROM teams_at(%s::int[], %s::timestamp[]);
+                """,
+                ([int(user_id) for user_id, _ in pairs], [at for _, at in pairs]),
+            )
+            teams = dict(cur.fetchall())
+        return {pair: teams.get(i) for i, pair in enumerate(pairs, start=1)}
     finally:
         conn.close()
 
 
 def _insert_play_rows_for_match(match_id, include_tournament_matches=False):
     """
-    Shared insertion logic to add Play rows for a match.
+    Shared insertion logic to add Play rows for a match (eligible players only).
     If include_tournament_matches is False, tournament matches are ignored.
     """
     conn = get_connection()
@@ -1312,59 +1034,94 @@ def _insert_play_rows_for_match(match_id, include_tournament_matches=False):
             with conn.cursor() as cur:
                 cur.execute(
                     """
-                    SELECT HomeTeamID, AwayTeamID, MatchStartDatetime
-                    FROM Match
-                    WHERE MatchID = %s;
+                    SELECT COALESCE(SUM(inserted), 0)
+                    FROM seed_match_plays(
+                        ARRAY(
+                            SELECT m.MatchID
+                            FROM Match m
+                            WHERE m.MatchID = %s
+                              AND (%s OR NOT EXISTS (
+                                  SELECT 1 FROM TournamentMatch tm WHERE tm.MatchID = m.MatchID
+                              ))
+                        ),
+                        TRUE
+                    );
                     """,
-                    (match_id,),
+                    (match_id, include_tournament_matches),
                 )
-                row = cur.fetchone()
-                if not row:
-                    return 0
+                return cur.fetchone()[0]
+    finally:
+        conn.close()
 
-                home_team_id, away_team_id, match_time = row
 
-                if not include_tournament_matches:
-                    cur.execute(
-                        "SELECT 1 FROM TournamentMatch WHERE MatchID = %s;",
-                        (match_id,),
-                    )
-                    if cur.fetchone():
-                        return 0
+def seed_match_plays(
+    match_ids=None,
+    league_id=None,
+    season_no=None,
+    season_year=None,
+    tournament_id=None,
+    bracket_level=None,
+    date_from=None,
+    date_to=None,
+    eligible_only=False,
+):
+    """
+    Add the missing Play rows for a whole set of matches: a league season, a
+    tournament (optionally one bracket level, 1 = first round), a kickoff range
+    [date_from, date_to) and/or explicit match ids. Filters combine with AND.
+
+    One statement resolves every match's players at kickoff through Employed.Period
+    and inserts what is missing (seed_match_plays() in init.sql), so reseeding after
+    a bulk fixture import or a batch of signings is a single round trip. With
+    eligible_only, players whose IsEligible is not 'eligible' are skipped, as in
+    create_plays_for_match_players.
+
+    Returns {'matches': matches in scope, 'seeded_matches': matches that got rows,
+    'inserted': Play rows inserted}.
+    """
+    if match_ids is not None:
+        match_ids = sorted({int(match_id) for match_id in match_ids})
+        if not match_ids:
+            raise ValueError("No matches selected.")
+    scope_sql, scope_params, _ = _match_scope(
+        league_id, season_no, season_year, tournament_id, date_from, date_to, match_ids
+    )
+    if bracket_level is not None:
+        if tournament_id is None:
+            raise ValueError("A bracket level needs its tournament.")
+        tournament_bracket = bracket.get_bracket(int(tournament_id))
+        depth = tournament_bracket.depth if tournament_bracket is not None else 0
+        bits = depth - int(bracket_level) + 1
+        if not 1 <= bits <= depth:
+            raise ValueError(f"The bracket has levels 1 to {depth}.")
+        # heap numbering: the rounds of one level are [2^(bits-1), 2^bits)
+        scope_sql += " AND mc.roundno >= %s AND mc.roundno < %s"
+        scope_params = [*scope_params, 1 << (bits - 1), 1 << bits]
 
-                # checks also whether player is eligible _ _ _ at that date? or now  - i can delete is eligible
+    conn = get_connection()
+    try:
+        with conn:
+            with conn.cursor() as cur:
                 cur.execute(
-                    """
-                    WITH active_players AS (
-                        SELECT em.UsersID AS player_id
-                        FROM Employed em
-                        JOIN Employment e ON e.EmploymentID = em.EmploymentID
-                        JOIN Player p ON p.UsersID = em.UsersID
-                        WHERE em.TeamID IN (%s, %s)
-                          AND e.StartDate <= %s
-                          AND e.EndDate >= %s
-                          AND COALESCE(LOWER(p.IsEligible), '') = 'eligible'
-                    ), to_insert AS (
-                        SELECT %s AS match_id, ap.player_id
-                        FROM active_players ap
-                        WHERE NOT EXISTS (
-                            SELECT 1 FROM Play pl
-                            WHERE pl.MatchID = %s AND pl.PlayerID = ap.player_id
-                        )
+                    f"""
+                    WITH scope AS (
+                        SELECT mc.matchid
+                        FROM MatchCatalog mc
+                        WHERE {scope_sql}
+                    ),
+                    seeded AS (
+                        SELECT *
+                        FROM seed_match_plays(ARRAY(SELECT matchid FROM scope), %s)
                     )
-                    INSERT INTO Play (MatchID, PlayerID)
-                    SELECT match_id, player_id FROM to_insert;
+                    SELECT (SELECT COUNT(*) FROM scope),
+                           COUNT(*),
+                           COALESCE(SUM(inserted), 0)
+                    FROM seeded;
                     """,
-                    (
-                        home_team_id,
-                        away_team_id,
-                        match_time,
-                        match_time,
-                        match_id,
-                        match_id,
-                    ),
+                    [*scope_params, bool(eligible_only)],
                 )
-                return cur.rowcount
+                matches, seeded_matches, inserted = cur.fetchone()
+                return {"matches": matches, "seeded_matches": seeded_matches, "inserted": inserted}
     finally:
         conn.close()
 
@@ -1594,6 +1351,7 @@ def delete_season(league_id, season_no, season_year):
                     """,
                     (league_id, season_no, season_year),
                 )
+        refcache.bump("season")
     finally:
         conn.close()
 
@@ -1611,6 +1369,7 @@ def delete_league(league_id):
                     """,
                     (league_id,),
                 )
+        refcache.bump("league", "season")
     finally:
         conn.close()
 
@@ -1699,30 +1458,235 @@ def team_has_match_on_date(team_id, date_str):
         conn.close()
 
 
-def fetch_league_matches(league_id):
-    """All seasonal matches for a league with season info."""
+def round_robin_rounds(team_ids, double_round=True):
+    """
+    Circle-method round robin. Returns a list of rounds, each a list of
+    (home_team_id, away_team_id). With an odd number of teams one team rests each
+    round. The second half of a double round robin mirrors the first with home and
+    away swapped.
+    """
+    teams = list(team_ids)
+    if len(teams) % 2:
+        teams.append(None)  # bye
+    n = len(teams)
+    rounds = []
+    for r in range(n - 1):
+        fixtures = []
+        for i in range(n // 2):
+            a, b = teams[i], teams[n - 1 - i]
+            if a is None or b is None:
+                continue
+            # alternate who hosts so no team plays long home/away streaks
+            fixtures.append((a, b) if (r + i) % 2 == 0 else (b, a))
+        rounds.append(fixtures)
+        # keep the first team fixed, rotate everyone else one place
+        teams = [teams[0], teams[-1]] + teams[1:-1]
+    if double_round:
+        rounds += [[(away, home) for home, away in fixtures] for fixtures in rounds]
+    return rounds
+
+
+def schedule_season_fixtures(league_id, season_no, season_year, kickoff="19:00", double_round=True):
+    """
+    Generates a full round robin for the teams in LeagueTeam and inserts it in one
+    transaction. Rounds are spread evenly over Season.StartDate..EndDate at the given
+    kickoff time (HH:MM). A fixture is moved to a later day before the next round when
+    either team already plays that day, in any competition. Home/away pairings that
+    already exist in this season are skipped, so re-running only fills the gaps.
+    Play rows are seeded by the statement-level match insert trigger.
+    Returns the number of matches created.
+    """
+    try:
+        kickoff_time = datetime.strptime(kickoff, "%H:%M").time()
+    except (TypeError, ValueError):
+        raise ValueError("Kickoff time must be HH:MM.")
+
+    conn = get_connection()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT StartDate, EndDate
+                    FROM Season
+                    WHERE LeagueID = %s AND SeasonNo = %s AND SeasonYear = %s;
+                    """,
+                    (league_id, season_no, season_year),
+                )
+                season = cur.fetchone()
+                if not season:
+                    raise ValueError("Season not found.")
+                season_start, season_end = season
+
+                cur.execute(
+                    "SELECT TeamID FROM LeagueTeam WHERE LeagueID = %s ORDER BY TeamID;",
+                    (league_id,),
+                )
+                team_ids = [row[0] for row in cur.fetchall()]
+                if len(team_ids) < 2:
+                    raise ValueError("The league needs at least two teams to generate fixtures.")
+
+                # days each team is already busy during the season, in any competition
+                cur.execute(
+                    """
+                    SELECT t.TeamID, DATE(m.MatchStartDatetime)
+                    FROM Match m
+                    JOIN unnest(%s::int[]) AS t (TeamID)
+                      ON t.TeamID IN (m.HomeTeamID, m.AwayTeamID)
+                    WHERE m.MatchStartDatetime BETWEEN %s AND %s;
+                    """,
+                    (team_ids, season_start, season_end),
+                )
+                busy = defaultdict(set)
+                for team_id, day in cur.fetchall():
+                    busy[team_id].add(day)
+
+                cur.execute(
+                    """
+                    SELECT m.HomeTeamID, m.AwayTeamID
+                    FROM SeasonalMatch sm
+                    JOIN Match m ON m.MatchID = sm.MatchID
+                    WHERE sm.LeagueID = %s AND sm.SeasonNo = %s AND sm.SeasonYear = %s;
+                    """,
+                    (league_id, season_no, season_year),
+                )
+                existing_pairs = set(cur.fetchall())
+
+                days = []
+                day = season_start.date()
+                while day <= season_end.date():
+                    if season_start <= datetime.combine(day, kickoff_time) <= season_end:
+                        days.append(day)
+                    day += timedelta(days=1)
+
+                rounds = round_robin_rounds(team_ids, double_round)
+                if len(days) < len(rounds):
+                    raise ValueError(
+                        f"The season has {len(days)} match days but {len(rounds)} rounds are needed."
+                    )
+
+                fixtures = []
+                for r, pairings in enumerate(rounds):
+                    first = r * len(days) // len(rounds)
+                    last = (r + 1) * len(days) // len(rounds)
+                    for home_id, away_id in pairings:
+                        if (home_id, away_id) in existing_pairs:
+                            continue
+                        match_day = next(
+                            (d for d in days[first:last] if d not in busy[home_id] and d not in busy[away_id]),
+                            None,
+                        )
+                        if match_day is None:
+                            raise ValueError(
+                                f"No free date in round {r + 1} for teams {home_id} and {away_id} "
+                                f"({days[first]} to {days[last - 1]})."
+                            )
+                        busy[home_id].add(match_day)
+                        busy[away_id].add(match_day)
+                        fixtures.append((home_id, away_id, datetime.combine(match_day, kickoff_time)))
+
+                if not fixtures:
+                    return 0
+
+                # one INSERT for all matches, so the match insert trigger seeds every
+                # Play row in a single statement
+                match_ids = execute_values(
+                    cur,
+                    """
+                    INSERT INTO Match (
+                        HomeTeamID, AwayTeamID,
+                        MatchStartDatetime, MatchEndDatetime,
+                        VenuePlayed,
+                        HomeTeamName, AwayTeamName,
+                        HomeTeamScore, AwayTeamScore, WinnerTeam, IsLocked
+                    )
+                    SELECT v.home_id, v.away_id, v.start_at, NULL, ht.HomeVenue, ht.TeamName, awt.TeamName,
+                           NULL, NULL, NULL, FALSE
+                    FROM (VALUES %s) AS v (home_id, away_id, start_at)
+                    JOIN Team ht ON ht.TeamID = v.home_id
+                    JOIN Team awt ON awt.TeamID = v.away_id
+                    RETURNING MatchID;
+                    """,
+                    fixtures,
+                    template="(%s::int, %s::int, %s::timestamp)",
+                    page_size=len(fixtures),
+                    fetch=True,
+                )
+                cur.execute(
+                    """
+                    INSERT INTO SeasonalMatch (MatchID, LeagueID, SeasonNo, SeasonYear)
+                    SELECT m.MatchID, %s, %s, %s
+                    FROM unnest(%s::int[]) AS m (MatchID);
+                    """,
+                    (league_id, season_no, season_year, [row[0] for row in match_ids]),
+                )
+                return len(match_ids)
+    finally:
+        conn.close()
+
+
+MATCH_PAGE_SIZE = 50
+MATCH_PAGE_SIZE_MAX = 200
+
+
+def parse_match_cursor(raw):
+    """
+    '2025-03-01T19:00:00,42' -> (datetime, 42), the (matchstartdatetime, matchid) of
+    the last match already shown; None for an empty cursor. Raises ValueError.
+    """
+    if not raw:
+        return None
+    start, match_id = raw.rsplit(",", 1)
+    return datetime.fromisoformat(start), int(match_id)
+
+
+def match_page(rows, limit):
+    """
+    Split the rows of a paged match helper (which fetches limit + 1) into
+    (page, next_cursor); next_cursor is None on the last page.
+    """
+    if limit is None or len(rows) <= limit:
+        return rows, None
+    last = rows[limit - 1]
+    return rows[:limit], f"{last['matchstartdatetime'].isoformat()},{last['matchid']}"
+
+
+def _keyset(before, alias="mc"):
+    # newest first: the next page starts strictly below the last (start, id) shown
+    if before is None:
+        return "", []
+    return f" AND ({alias}.matchstartdatetime, {alias}.matchid) < (%s, %s)", list(before)
+
+
+def fetch_league_matches(league_id, before=None, limit=None):
+    """
+    Seasonal matches for a league with season info, newest kickoff first.
+
+    With limit, returns at most limit + 1 rows older than the before cursor (see
+    parse_match_cursor / match_page).
+    """
+    keyset_sql, keyset_params = _keyset(before)
     conn = get_connection()
     try:
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
             cur.execute(
-                """
-                SELECT m.matchid,
-                       m.hometeamname,
-                       m.awayteamname,
-                       m.matchstartdatetime,
-                       m.islocked,
-                       m.winnerteam,
-                       s.seasonno,
-                       s.seasonyear
-                FROM Match m
-                JOIN SeasonalMatch sm ON m.matchid = sm.matchid
-                JOIN Season s ON sm.leagueid = s.leagueid
-                    AND sm.seasonno = s.seasonno
-                    AND sm.seasonyear = s.seasonyear
-                WHERE sm.leagueid = %s
-                ORDER BY s.seasonyear DESC, s.seasonno DESC, m.matchstartdatetime DESC;
+                f"""
+                SELECT mc.matchid,
+                       mc.hometeamname,
+                       mc.awayteamname,
+                       mc.matchstartdatetime,
+                       mc.islocked,
+                       mc.winnerteam,
+                       mc.seasonno,
+                       mc.seasonyear
+                FROM MatchCatalog mc
+                WHERE mc.leagueid = %s
+                  AND mc.competitiontype = 'league'
+                  {keyset_sql}
+                ORDER BY mc.matchstartdatetime DESC, mc.matchid DESC
+                LIMIT %s;
                 """,
-                (league_id,),
+                [league_id, *keyset_params, None if limit is None else limit + 1],
             )
             return cur.fetchall()
     finally:
@@ -1848,6 +1812,7 @@ def create_league_with_seasons(league_name, seasons_data, team_ids=None):
                             (league_id, int(team_id)),
                         )
 
+        refcache.bump("league", "season")
         return {"league_id": league_id}
     finally:
         conn.close()
@@ -2075,17 +2040,16 @@ def employ_coach_to_team(coach_id, team_id, owner_id):
                         (current_employment[0],),
                     )
 
-                # Create new employment record (1 year contract)
-                start_date = datetime.now()
-                end_date = start_date + timedelta(days=365)
-
+                # Create new employment record (1 year contract). It starts at the same
+                # database NOW() the previous one ended at, so the periods stay adjacent
+                # instead of overlapping (employed_no_overlapping_contracts).
                 cur.execute(
                     """
                     INSERT INTO Employment (StartDate, EndDate, Salary)
-                    VALUES (%s, %s, %s)
+                    VALUES (LOCALTIMESTAMP, LOCALTIMESTAMP + INTERVAL '365 days', %s)
                     RETURNING EmploymentID;
                     """,
-                    (start_date, end_date, current_salary),
+                    (current_salary,),
                 )
                 new_employment_id = cur.fetchone()[0]
 
@@ -2113,6 +2077,7 @@ def employ_coach_to_team(coach_id, team_id, owner_id):
                     raise ValueError("Failed to assign coach to team.")
     finally:
         conn.close()
+    identity.invalidate(coach_id)
 
 
 def remove_coach_from_team(coach_id, team_id, owner_id):
@@ -2193,6 +2158,7 @@ def remove_coach_from_team(coach_id, team_id, owner_id):
                     raise ValueError("Coach is not currently assigned to this team.")
     finally:
         conn.close()
+    identity.invalidate(coach_id)
 
 
 def fetch_all_referees():
@@ -2433,38 +2399,30 @@ def fetch_admin_tournament_matches(admin_id):
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
             cur.execute(
                 """
-                SELECT DISTINCT
-                       m.matchid,
-                       m.hometeamname,
-                       m.awayteamname,
-                       m.matchstartdatetime,
-                       m.matchenddatetime,
-                       m.hometeamscore,
-                       m.awayteamscore,
-                       m.winnerteam,
-                       m.islocked,
-                       CASE 
-                           WHEN tm.matchid IS NOT NULL THEN 'tournament'
-                           WHEN sm.matchid IS NOT NULL THEN 'seasonal'
-                           ELSE 'unknown'
+                SELECT mc.matchid,
+                       mc.hometeamname,
+                       mc.awayteamname,
+                       mc.matchstartdatetime,
+                       mc.matchenddatetime,
+                       mc.hometeamscore,
+                       mc.awayteamscore,
+                       mc.winnerteam,
+                       mc.islocked,
+                       CASE mc.competitiontype
+                           WHEN 'league' THEN 'seasonal'
+                           ELSE mc.competitiontype
                        END as match_type,
-                       t.tournamentid,
-                       t.name as tournament_name,
-                       l.leagueid,
-                       l.name as league_name
-                FROM Match m
-                LEFT JOIN TournamentMatch tm ON m.matchid = tm.matchid
-                LEFT JOIN Tournament t ON t.tournamentid = (
-                    SELECT tournamentid FROM Round WHERE t_matchid = m.matchid
-                )
-                LEFT JOIN SeasonalMatch sm ON m.matchid = sm.matchid
-                LEFT JOIN League l ON sm.leagueid = l.leagueid
-                WHERE t.tournamentid IN (
+                       mc.tournamentid,
+                       CASE WHEN mc.competitiontype = 'tournament' THEN mc.competitionname END as tournament_name,
+                       mc.leagueid,
+                       CASE WHEN mc.competitiontype = 'league' THEN mc.competitionname END as league_name
+                FROM MatchCatalog mc
+                WHERE mc.tournamentid IN (
                     SELECT t_id FROM TournamentModeration WHERE adminid = %s
-                ) OR sm.leagueid IN (
+                ) OR mc.leagueid IN (
                     SELECT leagueid FROM SeasonModeration WHERE adminid = %s
                 )
-                ORDER BY m.matchstartdatetime DESC;
+                ORDER BY mc.matchstartdatetime DESC;
                 """,
                 (admin_id, admin_id),
             )
@@ -2563,9 +2521,115 @@ def remove_referee_from_match(match_id, referee_id):
         conn.close()
 
 
+# Play columns a referee may fill in on the match sheet (key = lower-case column name)
+PLAY_SHEET_FIELDS = (
+    "substitutionid",
+    "starttime",
+    "stoptime",
+    "successfulpasses",
+    "goalsscored",
+    "penaltiesscored",
+    "assistsmade",
+    "totalpasses",
+    "yellowcards",
+    "redcards",
+    "saves",
+)
+
+
+def _validate_play_sheet(plays):
+    if not isinstance(plays, list) or not plays:
+        raise ValueError("The play sheet must be a non-empty list of plays.")
+
+    rows = []
+    seen = set()
+    for entry in plays:
+        if not isinstance(entry, dict):
+            raise ValueError("Every play must be an object.")
+        try:
+            play_id = int(entry.get("playid"))
+        except (TypeError, ValueError):
+            raise ValueError("Every play needs a numeric playid.")
+        if play_id in seen:
+            raise ValueError(f"Play {play_id} appears more than once.")
+        seen.add(play_id)
+
+        unknown = set(entry) - set(PLAY_SHEET_FIELDS) - {"playid", "matchid"}
+        if unknown:
+            raise ValueError(f"Unknown play fields: {', '.join(sorted(unknown))}.")
+
+        row = [play_id]
+        for field in PLAY_SHEET_FIELDS:
+            present = field in entry
+            value = entry.get(field)
+            if value == "":
+                value = None
+            if value is not None:
+                try:
+                    value = int(value)
+                except (TypeError, ValueError):
+                    raise ValueError(f"Play {play_id}: {field} must be a whole number.")
+                if value < 0:
+                    raise ValueError(f"Play {play_id}: {field} cannot be negative.")
+            row.extend([present, value])
+
+        start, stop = entry.get("starttime"), entry.get("stoptime")
+        if start not in (None, "") and stop not in (None, "") and int(stop) < int(start):
+            raise ValueError(f"Play {play_id}: stop time needs to come after start time.")
+        rows.append(tuple(row))
+    return rows
+
+
+def save_play_sheet(match_id, plays):
+    """
+    Applies a whole match sheet (list of dicts keyed by playid + PLAY_SHEET_FIELDS) in
+    one UPDATE ... FROM (VALUES ...). Only the fields present in an entry are written;
+    a present empty value clears the column. Raises ValueError if the sheet is invalid
+    or refers to plays outside the match. Returns the number of plays updated.
+    """
+    match_id = int(match_id)
+    rows = _validate_play_sheet(plays)
+
+    set_clauses = ",\n".join(
+        f"{field} = CASE WHEN v.has_{field} THEN v.{field} ELSE p.{field} END"
+        for field in PLAY_SHEET_FIELDS
+    )
+    value_columns = ", ".join(f"has_{field}, {field}" for field in PLAY_SHEET_FIELDS)
+    template = "(%s::INT, " + ", ".join("%s::BOOLEAN, %s::INT" for _ in PLAY_SHEET_FIELDS) + ")"
+
+    conn = get_connection()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                updated = execute_values(
+                    cur,
+                    f"""
+                    UPDATE Play p
+                    SET {set_clauses}
+                    FROM (VALUES %s) AS v(playid, {value_columns})
+                    WHERE p.PlayID = v.playid AND p.MatchID = {match_id}
+                    RETURNING p.PlayID;
+                    """,
+                    rows,
+                    template=template,
+                    page_size=len(rows),
+                    fetch=True,
+                )
+                missing = {row[0] for row in rows} - {r[0] for r in updated}
+                if missing:
+                    raise ValueError(
+                        f"Plays {', '.join(str(pid) for pid in sorted(missing))} do not belong to match {match_id}."
+                    )
+                return len(updated)
+    finally:
+        conn.close()
+
+
 def finalize_tournament_match_from_plays(match_id):
     """
     Recompute scores for a tournament match from Play rows, set winner, and lock the match.
+    If the other half of the pairing is already decided, the next round's match is
+    created in the same transaction (bracket.advance).
     Seasonal matches are ignored (handled by DB triggers elsewhere).
     Returns True if the match was updated, False otherwise.
     """
@@ -2573,15 +2637,23 @@ def finalize_tournament_match_from_plays(match_id):
     try:
         with conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                # both scores in one pass: each Play counts for the team its player was
+                # employed by at kickoff
                 cur.execute(
                     """
-                    SELECT m.matchid,
-                           m.hometeamid,
-                           m.awayteamid,
-                           m.matchstartdatetime
+                    SELECT m.hometeamname,
+                           m.awayteamname,
+                           COALESCE(SUM(COALESCE(pl.GoalsScored, 0) + COALESCE(pl.PenaltiesScored, 0))
+                                    FILTER (WHERE em.TeamID = m.HomeTeamID), 0) AS home_score,
+                           COALESCE(SUM(COALESCE(pl.GoalsScored, 0) + COALESCE(pl.PenaltiesScored, 0))
+                                    FILTER (WHERE em.TeamID = m.AwayTeamID), 0) AS away_score
                     FROM Match m
                     JOIN TournamentMatch tm ON tm.matchid = m.matchid
-                    WHERE m.matchid = %s;
+                    LEFT JOIN Play pl ON pl.MatchID = m.MatchID
+                    LEFT JOIN Employed em ON em.UsersID = pl.PlayerID
+                                         AND em.Period @> m.MatchStartDatetime
+                    WHERE m.matchid = %s
+                    GROUP BY m.matchid;
                     """,
                     (match_id,),
                 )
@@ -2589,35 +2661,14 @@ def finalize_tournament_match_from_plays(match_id):
                 if not match:
                     return False
 
-                match_start = match["matchstartdatetime"]
-                home_team_id = match["hometeamid"]
-                away_team_id = match["awayteamid"]
-
-                def _score_for_team(team_id):
-                    cur.execute(
-                        """
-                        SELECT COALESCE(SUM(COALESCE(pl.GoalsScored, 0) + COALESCE(pl.PenaltiesScored, 0)), 0) AS goals
-                        FROM Play pl
-                        JOIN Employed em ON em.UsersID = pl.PlayerID
-                        JOIN Employment e ON e.EmploymentID = em.EmploymentID
-                        WHERE pl.MatchID = %s
-                          AND em.TeamID = %s
-                          AND e.StartDate <= %s
-                          AND e.EndDate >= %s;
-                        """,
-                        (match_id, team_id, match_start, match_start),
-                    )
-                    row = cur.fetchone()
-                    return row["goals"] if row and row["goals"] is not None else 0
-
-                home_score = _score_for_team(home_team_id)
-                away_score = _score_for_team(away_team_id)
+                home_score = match["home_score"]
+                away_score = match["away_score"]
 
                 winner_team = None
                 if home_score > away_score:
-                    winner_team = home_team_id
+                    winner_team = match["hometeamname"]
                 elif away_score > home_score:
-                    winner_team = away_team_id
+                    winner_team = match["awayteamname"]
 
                 cur.execute(
                     """
@@ -2630,44 +2681,56 @@ def finalize_tournament_match_from_plays(match_id):
                     """,
                     (home_score, away_score, winner_team, match_id),
                 )
+                bracket.advance(cur, [match_id])
                 return True
     finally:
         conn.close()
 
 
-def fetch_seasonal_matches_for_admin(admin_id):
+def fetch_seasonal_matches_for_admin(admin_id, before=None, limit=None):
     """
-    Fetch all seasonal matches that this admin manages (for locking/unlocking).
+    Fetch the seasonal matches this admin manages (for locking/unlocking), newest
+    kickoff first.
+
+    With limit, returns at most limit + 1 rows older than the before cursor. Each
+    moderated season contributes at most limit + 1 rows from its catalog index before
+    the final sort, so a page costs the same however much history a season has.
     """
+    keyset_sql, keyset_params = _keyset(before)
+    page_limit = None if limit is None else limit + 1
     conn = get_connection()
     try:
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
             cur.execute(
-                """
-                SELECT m.matchid,
-                       m.hometeamname,
-                       m.awayteamname,
-                       m.matchstartdatetime,
-                       m.hometeamscore,
-                       m.awayteamscore,
-                       m.islocked,
-                       l.leagueid,
-                       l.name as league_name,
-                       s.seasonno,
-                       s.seasonyear
-                FROM Match m
-                JOIN SeasonalMatch sm ON m.matchid = sm.matchid
-                JOIN Season s ON sm.leagueid = s.leagueid 
-                    AND sm.seasonno = s.seasonno 
-                    AND sm.seasonyear = s.seasonyear
-                JOIN League l ON s.leagueid = l.leagueid
-                JOIN SeasonModeration smod ON s.leagueid = smod.leagueid 
-                    AND s.seasonno = smod.seasonno 
-                    AND s.seasonyear = smod.seasonyear
+                f"""
+                SELECT page.*
+                FROM SeasonModeration smod
+                CROSS JOIN LATERAL (
+                    SELECT mc.matchid,
+                           mc.hometeamname,
+                           mc.awayteamname,
+                           mc.matchstartdatetime,
+                           mc.hometeamscore,
+                           mc.awayteamscore,
+                           mc.islocked,
+                           mc.leagueid,
+                           mc.competitionname as league_name,
+                           mc.seasonno,
+                           mc.seasonyear
+                    FROM MatchCatalog mc
+                    WHERE mc.leagueid = smod.leagueid
+                      AND mc.seasonno = smod.seasonno
+                      AND mc.seasonyear = smod.seasonyear
+                      AND mc.competitiontype = 'league'
+                      {keyset_sql}
+                    ORDER BY mc.matchstartdatetime DESC, mc.matchid DESC
+                    LIMIT %s
+                ) page
                 WHERE smod.adminid = %s
-                ORDER BY m.matchstartdatetime DESC;
+                ORDER BY page.matchstartdatetime DESC, page.matchid DESC
+                LIMIT %s;
                 """,
-                (admin_id,),
+                [*keyset_params, page_limit, admin_id, page_limit],
             )
             return cur.fetchall()
     finally:
@@ -2688,6 +2751,8 @@ def toggle_match_lock(match_id, lock_state):
                     """,
                     (lock_state, match_id),
                 )
+                if lock_state:
+                    bracket.advance(cur, [match_id])
     finally:
         conn.close()
 
@@ -2708,6 +2773,7 @@ def fetch_all_seasons_for_dropdown():
         conn.close()
 
 
+@singleflight.coalesce()
 def fetch_team_rankings(league_id=None, season_no=None, season_year=None):
     """Fetch team rankings with optional filters.
     If all parameters provided: rankings for specific league/season
@@ -2718,135 +2784,90 @@ def fetch_team_rankings(league_id=None, season_no=None, season_year=None):
     conn = get_connection()
     try:
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            # First, get all teams in the filtered scope
+            standing_filters = []
+            params = []
+
             if league_id is not None:
-                # If league filter is selected, get teams in that league
-                teams_query = """
-                    SELECT DISTINCT t.TeamID, t.TeamName
+                standing_filters.append("ts.LeagueID = %s")
+                params.append(league_id)
+
+            if season_no is not None:
+                standing_filters.append("ts.SeasonNo = %s")
+                params.append(season_no)
+
+            if season_year is not None:
+                standing_filters.append("ts.SeasonYear = %s")
+                params.append(season_year)
+
+            where_clause = ("WHERE " + " AND ".join(standing_filters)) if standing_filters else ""
+
+            # Teams in the filtered scope are listed even without matches
+            if league_id is not None:
+                scope_query = """
+                    SELECT t.TeamID, t.TeamName
                     FROM Team t
                     JOIN LeagueTeam lt ON t.TeamID = lt.TeamID
                     WHERE lt.LeagueID = %s
                 """
-                cur.execute(teams_query, [league_id])
+                params.append(league_id)
             else:
-                # No filter: get all teams
-                teams_query = """
-                    SELECT TeamID, TeamName FROM Team
-                """
-                cur.execute(teams_query)
-            
-            all_teams = cur.fetchall()
-            
-            # Then get match results
-            query = """
+                scope_query = "SELECT TeamID, TeamName FROM Team"
+
+            query = f"""
+                WITH standings AS (
+                    SELECT
+                        ts.TeamID,
+                        MAX(ts.TeamName) AS TeamName,
+                        SUM(ts.Played) AS Played,
+                        SUM(ts.Wins) AS Wins,
+                        SUM(ts.Draws) AS Draws,
+                        SUM(ts.Losses) AS Losses,
+                        SUM(ts.GoalsFor) AS GoalsFor,
+                        SUM(ts.GoalsAgainst) AS GoalsAgainst,
+                        SUM(ts.Points) AS Points
+                    FROM TeamSeasonStanding ts
+                    {where_clause}
+                    GROUP BY ts.TeamID
+                    HAVING SUM(ts.Played) > 0
+                ),
+                scope AS (
+                    {scope_query}
+                )
                 SELECT
-                    m.HomeTeamID,
-                    m.AwayTeamID,
-                    m.HomeTeamName,
-                    m.AwayTeamName,
-                    m.HomeTeamScore,
-                    m.AwayTeamScore,
-                    sm.LeagueID,
-                    l.Name as LeagueName,
-                    sm.SeasonNo,
-                    sm.SeasonYear
-                FROM Match m
-                JOIN SeasonalMatch sm ON m.MatchID = sm.MatchID
-                JOIN League l ON sm.LeagueID = l.LeagueID
-                WHERE m.HomeTeamScore IS NOT NULL AND m.AwayTeamScore IS NOT NULL
+                    COALESCE(scope.TeamID, s.TeamID) AS teamid,
+                    COALESCE(scope.TeamName, s.TeamName) AS teamname,
+                    COALESCE(s.Played, 0)::INT AS played,
+                    COALESCE(s.Wins, 0)::INT AS wins,
+                    COALESCE(s.Draws, 0)::INT AS draws,
+                    COALESCE(s.Losses, 0)::INT AS losses,
+                    COALESCE(s.GoalsFor, 0)::INT AS gf,
+                    COALESCE(s.GoalsAgainst, 0)::INT AS ga,
+                    COALESCE(s.Points, 0)::INT AS points,
+                    COALESCE(s.GoalsFor - s.GoalsAgainst, 0)::INT AS gd
+                FROM scope
+                FULL OUTER JOIN standings s ON s.TeamID = scope.TeamID
+                ORDER BY points DESC, gd DESC, gf DESC, wins DESC, teamname
             """
-            params = []
-            
-            if league_id is not None:
-                query += " AND sm.LeagueID = %s"
-                params.append(league_id)
-            
-            if season_no is not None:
-                query += " AND sm.SeasonNo = %s"
-                params.append(season_no)
-            
-            if season_year is not None:
-                query += " AND sm.SeasonYear = %s"
-                params.append(season_year)
-            
             cur.execute(query, params)
-            rows = cur.fetchall()
-    
+            return cur.fetchall()
+
     finally:
         conn.close()
-    
-    stats = {}
-    
-    # Initialize all teams with 0 stats
-    for team in all_teams:
-        team_id = team["teamid"]
-        stats[team_id] = {
-            "teamid": team_id,
-            "teamname": team["teamname"],
-            "played": 0,
-            "wins": 0,
-            "draws": 0,
-            "losses": 0,
-            "gf": 0,
-            "ga": 0,
-            "points": 0,
-        }
-    
-    def ensure(team_id, name):
-        if team_id not in stats:
-            stats[team_id] = {
-                "teamid": team_id,
-                "teamname": name,
-                "played": 0,
-                "wins": 0,
-                "draws": 0,
-                "losses": 0,
-                "gf": 0,
-                "ga": 0,
-                "points": 0,
-            }
-    
-    for row in rows:
-        home_id = row["hometeamid"]
-        away_id = row["awayteamid"]
-        home_name = row["hometeamname"]
-        away_name = row["awayteamname"]
-        hs = row["hometeamscore"]
-        as_ = row["awayteamscore"]
-        
-        if hs is None or as_ is None:
-            continue
-        
-        ensure(home_id, home_name)
-        ensure(away_id, away_name)
-        stats[home_id]["played"] += 1
-        stats[away_id]["played"] += 1
-        stats[home_id]["gf"] += hs
-        stats[home_id]["ga"] += as_
-        stats[away_id]["gf"] += as_
-        stats[away_id]["ga"] += hs
-        
-        if hs > as_:
-            stats[home_id]["wins"] += 1
-            stats[home_id]["points"] += 3
-            stats[away_id]["losses"] += 1
-        elif hs < as_:
-            stats[away_id]["wins"] += 1
-            stats[away_id]["points"] += 3
-            stats[home_id]["losses"] += 1
-        else:
-            stats[home_id]["draws"] += 1
-            stats[away_id]["draws"] += 1
-            stats[home_id]["points"] += 1
-            stats[away_id]["points"] += 1
-    
-    # Calculate goal difference and sort
-    for team in stats.values():
-        team["gd"] = team["gf"] - team["ga"]
-    
-    return sorted(stats.values(), key=lambda s: (-s["points"], -s["gd"], -s["gf"], -s["wins"]))
 
 
+def rebuild_team_season_standings():
+    """Recomputes TeamSeasonStanding from all scored seasonal matches. Returns row count."""
+    conn = get_connection()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT rebuild_team_season_standings();")
+                return cur.fetchone()[0]
+    finally:
+        conn.close()
+
+
+@refcache.cached("season")
 def fetch_seasons_for_dropdown():
     """Fetch distinct season years for dropdown."""
     conn = get_connection()
@@ -2864,6 +2885,25 @@ def fetch_seasons_for_dropdown():
         conn.close()
 
 
+@refcache.cached("season")
+def fetch_season_dates_for_dropdown():
+    """Fetch distinct season start years (as stored, oldest first) for the admin match filters."""
+    conn = get_connection()
+    try:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(
+                """
+                SELECT DISTINCT SeasonYear
+                FROM Season
+                ORDER BY SeasonYear;
+                """
+            )
+            return cur.fetchall()
+    finally:
+        conn.close()
+
+
+@refcache.cached("league")
 def fetch_leagues_for_dropdown():
     """Fetch all leagues for dropdown."""
     conn = get_connection()
@@ -2881,6 +2921,7 @@ def fetch_leagues_for_dropdown():
         conn.close()
 
 
+@refcache.cached("tournament")
 def fetch_tournaments_for_dropdown():
     """Fetch all tournaments for dropdown."""
     conn = get_connection()
@@ -2899,87 +2940,106 @@ def fetch_tournaments_for_dropdown():
 
 
 def fetch_all_matches_with_filters(
-    admin_id, season_year=None, league_id=None, tournament_id=None
+    admin_id, season_year=None, league_id=None, tournament_id=None, before=None, limit=None
 ):
     """
     Fetch all matches (league and tournament) that the admin can manage,
-    with optional filters for season year, league, or tournament.
+    with optional filters for season year, league, or tournament, newest first.
+
+    With limit, returns at most limit + 1 rows older than the before cursor; as in
+    fetch_seasonal_matches_for_admin every moderated season or tournament is cut to
+    limit + 1 rows on its catalog index before the two branches are merged.
     """
+    keyset_sql, keyset_params = _keyset(before)
+    page_limit = None if limit is None else limit + 1
     conn = get_connection()
     try:
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
             # Build the query dynamically based on filters
-            query = """
+            query = f"""
                 -- League matches (seasonal matches)
-                SELECT DISTINCT
-                    m.matchid,
-                    m.hometeamname,
-                    m.awayteamname,
-                    m.matchstartdatetime,
-                    m.hometeamscore,
-                    m.awayteamscore,
-                    m.islocked,
-                    'league' as match_type,
-                    l.leagueid,
-                    l.name as league_name,
-                    s.seasonno,
-                    s.seasonyear,
-                    NULL::INT as tournamentid,
-                    NULL::VARCHAR as tournament_name
-                FROM Match m
-                JOIN SeasonalMatch sm ON m.matchid = sm.matchid
-                JOIN Season s ON sm.leagueid = s.leagueid 
-                    AND sm.seasonno = s.seasonno 
-                    AND sm.seasonyear = s.seasonyear
-                JOIN League l ON s.leagueid = l.leagueid
-                JOIN SeasonModeration smod ON s.leagueid = smod.leagueid 
-                    AND s.seasonno = smod.seasonno 
-                    AND s.seasonyear = smod.seasonyear
+                (SELECT page.*
+                FROM SeasonModeration smod
+                CROSS JOIN LATERAL (
+                    SELECT mc.matchid,
+                           mc.hometeamname,
+                           mc.awayteamname,
+                           mc.matchstartdatetime,
+                           mc.hometeamscore,
+                           mc.awayteamscore,
+                           mc.islocked,
+                           'league' as match_type,
+                           mc.leagueid,
+                           mc.competitionname as league_name,
+                           mc.seasonno,
+                           mc.seasonyear,
+                           NULL::INT as tournamentid,
+                           NULL::VARCHAR as tournament_name
+                    FROM MatchCatalog mc
+                    WHERE mc.leagueid = smod.leagueid
+                      AND mc.seasonno = smod.seasonno
+                      AND mc.seasonyear = smod.seasonyear
+                      AND mc.competitiontype = 'league'
+                      {keyset_sql}
+                    ORDER BY mc.matchstartdatetime DESC, mc.matchid DESC
+                    LIMIT %s
+                ) page
                 WHERE smod.adminid = %s
             """
-            params = [admin_id]
+            params = [*keyset_params, page_limit, admin_id]
 
             if season_year:
-                query += " AND EXTRACT(YEAR FROM s.seasonyear) = %s"
-                params.append(season_year)
+                # range on SeasonYear instead of EXTRACT(YEAR ...) so the index applies
+                query += " AND smod.seasonyear >= make_date(%s, 1, 1) AND smod.seasonyear < make_date(%s + 1, 1, 1)"
+                params.extend([int(season_year), int(season_year)])
 
             if league_id:
-                query += " AND l.leagueid = %s"
+                query += " AND smod.leagueid = %s"
                 params.append(int(league_id))
 
-            query += """
+            query += f"""
+                )
                 UNION ALL
-                
+
                 -- Tournament matches
-                SELECT DISTINCT
-                    m.matchid,
-                    m.hometeamname,
-                    m.awayteamname,
-                    m.matchstartdatetime,
-                    m.hometeamscore,
-                    m.awayteamscore,
-                    m.islocked,
-                    'tournament' as match_type,
-                    NULL::INT as leagueid,
-                    NULL::VARCHAR as league_name,
-                    NULL::INT as seasonno,
-                    NULL::DATE as seasonyear,
-                    t.tournamentid,
-                    t.name as tournament_name
-                FROM Match m
-                JOIN TournamentMatch tm ON m.matchid = tm.matchid
-                JOIN Round r ON r.t_matchid = tm.matchid
-                JOIN Tournament t ON r.tournamentid = t.tournamentid
-                JOIN TournamentModeration tmod ON t.tournamentid = tmod.t_id
+                (SELECT page.*
+                FROM TournamentModeration tmod
+                CROSS JOIN LATERAL (
+                    SELECT mc.matchid,
+                           mc.hometeamname,
+                           mc.awayteamname,
+                           mc.matchstartdatetime,
+                           mc.hometeamscore,
+                           mc.awayteamscore,
+                           mc.islocked,
+                           'tournament' as match_type,
+                           NULL::INT as leagueid,
+                           NULL::VARCHAR as league_name,
+                           NULL::INT as seasonno,
+                           NULL::DATE as seasonyear,
+                           mc.tournamentid,
+                           mc.competitionname as tournament_name
+                    FROM MatchCatalog mc
+                    WHERE mc.tournamentid = tmod.t_id
+                      AND mc.competitiontype = 'tournament'
+                      {keyset_sql}
+                    ORDER BY mc.matchstartdatetime DESC, mc.matchid DESC
+                    LIMIT %s
+                ) page
                 WHERE tmod.adminid = %s
             """
-            params.append(admin_id)
+            params.extend([*keyset_params, page_limit, admin_id])
 
             if tournament_id:
-                query += " AND t.tournamentid = %s"
+                query += " AND tmod.t_id = %s"
                 params.append(int(tournament_id))
 
-            query += " ORDER BY matchstartdatetime DESC;"
+            query += """
+                )
+                ORDER BY matchstartdatetime DESC, matchid DESC
+                LIMIT %s;
+            """
+            params.append(page_limit)
 
             cur.execute(query, params)
             return cur.fetchall()
@@ -3022,6 +3082,7 @@ def toggle_league_match_lock_by_admin(match_id, admin_id):
 def toggle_tournament_match_lock_by_admin(match_id, admin_id):
     """
     Toggle lock/unlock for a tournament match with admin permission check.
+    Locking advances the bracket in the same transaction (bracket.advance).
     Returns the number of rows affected (0 if no permission, 1 if successful).
     NOTE: Based on requirements, tournament matches should NOT be locked via this page.
     This method is provided for completeness but may not be used.
@@ -3044,25 +3105,203 @@ def toggle_tournament_match_lock_by_admin(match_id, admin_id):
                         WHERE TM.MatchID = %s
                         AND M1.MatchID = TM.MatchID
                         AND TMOD.AdminID = %s
-                    );
+                    )
+                    RETURNING M1.IsLocked;
                     """,
                     (match_id, admin_id),
                 )
-                rows_affected = cur.rowcount
-                return rows_affected
+                locked = [is_locked for (is_locked,) in cur.fetchall()]
+                if any(locked):
+                    bracket.advance(cur, [match_id])
+                return len(locked)
+    finally:
+        conn.close()
+
+
+def lock_match_by_referee(match_id, referee_id):
+    """
+    Lock a match the referee is assigned to. A tournament match advances its
+    bracket in the same transaction (bracket.advance).
+    Returns 'tournament' or 'season' for the locked match, None if the referee is
+    not assigned to it.
+    """
+    conn = get_connection()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    UPDATE Match M1
+                    SET IsLocked = TRUE
+                    WHERE M1.MatchID = %s
+                    AND EXISTS (
+                        SELECT 1
+                        FROM RefereeMatchAttendance RMa1
+                        WHERE RMa1.MatchID = M1.MatchID
+                        AND RMa1.RefereeID = %s
+                    )
+                    RETURNING EXISTS (
+                        SELECT 1 FROM TournamentMatch TM WHERE TM.MatchID = M1.MatchID
+                    );
+                    """,
+                    (match_id, referee_id),
+                )
+                row = cur.fetchone()
+                if row is None:
+                    return None
+                if row[0]:
+                    bracket.advance(cur, [match_id])
+                    return "tournament"
+                return "season"
+    finally:
+        conn.close()
+
+
+# an admin may lock a catalog row mc if they moderate its season or its tournament
+_ADMIN_MANAGES_MATCH = """(
+    EXISTS (
+        SELECT 1
+        FROM SeasonModeration smod
+        WHERE smod.adminid = %s
+          AND smod.leagueid = mc.leagueid
+          AND smod.seasonno = mc.seasonno
+          AND smod.seasonyear = mc.seasonyear
+    )
+    OR EXISTS (
+        SELECT 1
+        FROM TournamentModeration tmod
+        WHERE tmod.adminid = %s
+          AND tmod.t_id = mc.tournamentid
+    )
+)"""
+
+
+def _match_scope(league_id, season_no, season_year, tournament_id, date_from, date_to, match_ids):
+    """
+    WHERE conditions on MatchCatalog mc for a bulk match operation, their params,
+    and whether the request names matches (season, tournament or ids) rather than
+    only a kickoff range [date_from, date_to).
+    """
+    conditions, params = [], []
+    if league_id is not None or season_no is not None or season_year is not None:
+        if league_id is None or season_no is None or season_year is None:
+            raise ValueError("A season needs its league, season number and season year.")
+        conditions.append("mc.leagueid = %s AND mc.seasonno = %s AND mc.seasonyear = %s")
+        params.extend([int(league_id), int(season_no), season_year])
+    if tournament_id is not None:
+        conditions.append("mc.tournamentid = %s")
+        params.append(int(tournament_id))
+    if match_ids is not None:
+        conditions.append("mc.matchid = ANY(%s)")
+        params.append(match_ids)
+    names_matches = bool(conditions)
+    if date_from is not None:
+        conditions.append("mc.matchstartdatetime >= %s")
+        params.append(date_from)
+    if date_to is not None:
+        conditions.append("mc.matchstartdatetime < %s")
+        params.append(date_to)
+    if not conditions:
+        raise ValueError("Pick a season, a tournament, a date range or matches.")
+    return " AND ".join(conditions), params, names_matches
+
+
+def bulk_set_match_lock(
+    admin_id,
+    lock_state,
+    league_id=None,
+    season_no=None,
+    season_year=None,
+    tournament_id=None,
+    date_from=None,
+    date_to=None,
+    match_ids=None,
+):
+    """
+    Lock (lock_state=True) or unlock every match of a league season, a tournament,
+    a kickoff range [date_from, date_to) and/or an explicit list of match ids, in
+    one UPDATE. Filters combine with AND.
+
+    A season, tournament or id list must be managed by the admin in full, otherwise
+    PermissionError is raised and nothing changes; unknown ids raise ValueError. A
+    bare date range only covers the matches the admin manages. Matches already in
+    the requested state are left alone, and since only IsLocked changes the
+    match_update trigger does not recompute winners. Newly locked tournament matches
+    advance their brackets in the same transaction.
+
+    Returns {'matched': matches in scope, 'changed': rows updated, 'advanced': new
+    bracket matches}.
+    """
+    if match_ids is not None:
+        match_ids = sorted({int(match_id) for match_id in match_ids})
+        if not match_ids:
+            raise ValueError("No matches selected.")
+    if not isinstance(lock_state, bool):
+        raise TypeError("lock_state must be True or False.")
+    scope_sql, scope_params, names_matches = _match_scope(
+        league_id, season_no, season_year, tournament_id, date_from, date_to, match_ids
+    )
+
+    conn = get_connection()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    f"""
+                    SELECT COUNT(*),
+                           COUNT(*) FILTER (WHERE NOT manageable)
+                    FROM (
+                        SELECT {_ADMIN_MANAGES_MATCH} AS manageable
+                        FROM MatchCatalog mc
+                        WHERE {scope_sql}
+                    ) scope;
+                    """,
+                    [admin_id, admin_id, *scope_params],
+                )
+                total, forbidden = cur.fetchone()
+                if match_ids is not None and total < len(match_ids):
+                    raise ValueError("Some of the selected matches do not exist.")
+                if names_matches and forbidden:
+                    raise PermissionError("You do not manage all of the selected matches.")
+
+                cur.execute(
+                    f"""
+                    UPDATE Match m
+                    SET IsLocked = %s
+                    FROM MatchCatalog mc
+                    WHERE mc.matchid = m.matchid
+                      AND {scope_sql}
+                      AND {_ADMIN_MANAGES_MATCH}
+                      AND m.IsLocked IS DISTINCT FROM %s
+                    RETURNING m.MatchID, mc.competitiontype;
+                    """,
+                    [lock_state, *scope_params, admin_id, admin_id, lock_state],
+                )
+                changed = cur.fetchall()
+
+                advanced = []
+                if lock_state:
+                    advanced = bracket.advance(
+                        cur, [match_id for match_id, competition in changed if competition == "tournament"]
+                    )
+                return {
+                    "matched": total - forbidden,
+                    "changed": len(changed),
+                    "advanced": len(advanced),
+                }
     finally:
         conn.close()
 
 
 def fetch_player_stats_all(player_id):
-    """Fetch overall statistics for a player from PlayerStatsAll view."""
+    """Fetch overall statistics for a player from the materialized PlayerStatsAll rows."""
     conn = get_connection()
     try:
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
             cur.execute(
                 """
                 SELECT *
-                FROM PlayerStatsAll
+                FROM PlayerStatsAllCached
                 WHERE UsersID = %s;
                 """,
                 (player_id,),
@@ -3072,8 +3311,9 @@ def fetch_player_stats_all(player_id):
         conn.close()
 
 
+@singleflight.coalesce()
 def fetch_player_rankings(league_id=None, season_no=None, season_year=None):
-    """Fetch player rankings aggregated from PlayerSeasonStats view.
+    """Fetch player rankings aggregated from the materialized PlayerSeasonStats rows.
     If all parameters provided: rankings for specific league/season
     If only league_id: all seasons in that league aggregated
     If none: all players across all leagues/seasons aggregated
@@ -3097,7 +3337,7 @@ def fetch_player_rankings(league_id=None, season_no=None, season_year=None):
                     SUM(total_minutes) as total_minutes,
                     SUM(total_successfulpasses) as total_successfulpasses,
                     SUM(total_totalpasses) as total_totalpasses
-                FROM PlayerSeasonStats
+                FROM PlayerSeasonStatsCached
                 WHERE 1=1
             """
             params = []
@@ -3139,7 +3379,7 @@ def fetch_player_season_stats(player_id, league_id=None, season_no=None, season_
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
             query = """
                 SELECT *
-                FROM PlayerSeasonStats
+                FROM PlayerSeasonStatsCached
                 WHERE UsersID = %s
             """
             params = [player_id]
@@ -3165,14 +3405,14 @@ def fetch_player_season_stats(player_id, league_id=None, season_no=None, season_
 
 
 def fetch_player_tournament_stats(player_id):
-    """Fetch tournament statistics for a player from PlayerTournamentStats view."""
+    """Fetch tournament statistics for a player from the materialized PlayerTournamentStats rows."""
     conn = get_connection()
     try:
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
             cur.execute(
                 """
                 SELECT *
-                FROM PlayerTournamentStats
+                FROM PlayerTournamentStatsCached
                 WHERE UsersID = %s
                 ORDER BY TournamentID DESC;
                 """,
@@ -3195,7 +3435,7 @@ def fetch_player_available_seasons(player_id):
                     Name AS LeagueName,
                     SeasonNo,
                     SeasonYear
-                FROM PlayerSeasonStats
+                FROM PlayerSeasonStatsCached
                 WHERE UsersID = %s
                 ORDER BY SeasonYear DESC, SeasonNo DESC, Name;
                 """,
@@ -3216,7 +3456,7 @@ def fetch_player_available_leagues(player_id):
                 SELECT DISTINCT
                     LeagueID,
                     Name AS LeagueName
-                FROM PlayerSeasonStats
+                FROM PlayerSeasonStatsCached
                 WHERE UsersID = %s
                 ORDER BY Name;
                 """,
@@ -3227,6 +3467,50 @@ def fetch_player_available_leagues(player_id):
         conn.close()
 
 
+def refresh_player_stats(limit=None):
+    """Recomputes materialized stats for up to `limit` queued players. Returns how many."""
+    conn = get_connection()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT refresh_player_stats(%s);", (limit,))
+                return cur.fetchone()[0]
+    finally:
+        conn.close()
+
+
+def rebuild_player_stats():
+    """Recomputes every materialized player stats row and clears the refresh queue."""
+    conn = get_connection()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT rebuild_player_stats();")
+    finally:
+        conn.close()
+
+
+def fetch_player_stats_freshness():
+    """How far the materialized player stats lag behind Play: queued players and oldest queue time."""
+    conn = get_connection()
+    try:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(
+                """
+                SELECT
+                    COUNT(*) AS pending_players,
+                    MIN(QueuedAt) AS oldest_pending,
+                    (SELECT MAX(RefreshedAt) FROM PlayerStatsAllMat) AS last_refreshed
+                FROM PlayerStatsDirty;
+                """
+            )
+            row = cur.fetchone()
+            row["is_stale"] = row["pending_players"] > 0
+            return row
+    finally:
+        conn.close()
+
+
 def fetch_player_trainings(player_id):
     """
     Fetch all training sessions for a player, including attendance status.
@@ -3634,7 +3918,20 @@ def clear_player_injury_db(player_id):
         conn.close()
 
 
-def update_expired_injuries():
+def update_expired_injuries(full=False):
+    """
+    Marks players whose latest injury has healed as eligible again.
+    Only injuries that healed since the last sweep (or were logged after it), and
+    players queued in InjuryRecheck because an injury was edited or removed, are
+    looked at, unless full=True. Returns the number of players updated.
+    """
+    if full:
+        candidate_filter = "TRUE"
+    else:
+        candidate_filter = (
+            "(i.RecoveryDate > wm.LastSweptAt OR i.InjuryID > wm.LastRowID"
+            " OR i.PlayerID IN (SELECT PlayerID FROM rechecked))"
+        )
 
     conn = get_connection()
     try:
@@ -3642,20 +3939,63 @@ def update_expired_injuries():
             with conn.cursor() as cur:
                 cur.execute(
                     """
-                    UPDATE Player p
-                    SET IsEligible = 'Eligible'
-                    WHERE (p.IsEligible IS NULL OR LOWER(p.IsEligible) != 'eligible')
-                    AND EXISTS (
-                        SELECT 1 FROM Injury i
-                        WHERE i.PlayerID = p.UsersID
-                        -- En son girilen sakatlık kaydına bakıyoruz
-                        AND i.InjuryDate = (
-                            SELECT MAX(InjuryDate) FROM Injury sub_i WHERE sub_i.PlayerID = p.UsersID
+                    INSERT INTO SweepWatermark (JobName) VALUES ('expired_injuries')
+                    ON CONFLICT (JobName) DO NOTHING;
+                    """
+                )
+                cur.execute(
+                    f"""
+                    WITH wm AS (
+                        SELECT LastSweptAt, LastRowID
+                        FROM SweepWatermark
+                        WHERE JobName = 'expired_injuries'
+                        FOR UPDATE
+                    ),
+                    -- dequeued whatever happens below: a player whose injury has not
+                    -- healed yet is picked up by RecoveryDate once it has
+                    rechecked AS (
+                        DELETE FROM InjuryRecheck
+                        RETURNING PlayerID
+                    ),
+                    candidates AS (
+                        SELECT DISTINCT i.PlayerID
+                        FROM Injury i
+                        CROSS JOIN wm
+                        WHERE i.RecoveryDate <= CURRENT_DATE
+                          AND {candidate_filter}
+                    ),
+                    swept AS (
+                        UPDATE Player p
+                        SET IsEligible = 'Eligible'
+                        FROM candidates c
+                        WHERE p.UsersID = c.PlayerID
+                        AND (p.IsEligible IS NULL OR LOWER(p.IsEligible) != 'eligible')
+                        AND EXISTS (
+                            SELECT 1 FROM Injury i
+                            WHERE i.PlayerID = p.UsersID
+                            -- En son girilen sakatlık kaydına bakıyoruz
+                            AND i.InjuryDate = (
+                                SELECT MAX(InjuryDate) FROM Injury sub_i WHERE sub_i.PlayerID = p.UsersID
+                            )
+                            -- İyileşme tarihi bugün veya geçmiş mi?
+                            AND i.RecoveryDate <= CURRENT_DATE
                         )
-                        -- İyileşme tarihi bugün veya geçmiş mi?
-                        AND i.RecoveryDate <= CURRENT_DATE
-                    );
-                """
+                        RETURNING p.UsersID
+                    ),
+                    advanced AS (
+                        UPDATE SweepWatermark w
+                        SET LastSweptAt = CURRENT_DATE,
+                            LastRowID = GREATEST(
+                                wm.LastRowID,
+                                (SELECT COALESCE(MAX(InjuryID), 0) FROM Injury)
+                            ),
+                            SweptAt = NOW()
+                        FROM wm
+                        WHERE w.JobName = 'expired_injuries'
+                    )
+                    SELECT COUNT(*) FROM swept;
+                    """
                 )
+                return cur.fetchone()[0]
     finally:
         conn.close()
@@ -145,8 +145,7 @@ def match_hometeam_info(matchid):
         LEFT JOIN Play P1 USING (matchid) )
         LEFT JOIN Users U2 ON (P1.substitutionid = U2.usersid)
         WHERE M1.matchid = %s
-        AND (M1.matchstartdatetime BETWEEN
-        A1.startdate AND COALESCE(A1.enddate, NOW() + INTERVAL '1 year') )
+        AND A1.period @> M1.matchstartdatetime
         ORDER BY U1.firstname, U1.lastname;
         """,
         (matchid, )
@@ -203,8 +202,7 @@ def match_awayteam_info(matchid):
         LEFT JOIN Play P1 USING (matchid) )
         LEFT JOIN Users U2 ON (P1.substitutionid = U2.usersid)
         WHERE M1.matchid = %s
-        AND (M1.matchstartdatetime BETWEEN
-        A1.startdate AND COALESCE(A1.enddate, NOW() + INTERVAL '1 year') )
+        AND A1.period @> M1.matchstartdatetime
         ORDER BY U1.firstname, U1.lastname;
         """,
         (matchid, )
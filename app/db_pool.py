@@ -0,0 +1,235 @@
+# process-wide psycopg2 connection pool used behind db.get_connection
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import psycopg2
+import psycopg2.extensions
+
+
+class PoolExhausted(psycopg2.OperationalError):
+    pass
+
+
+class PooledConnection:
+    # thin proxy around a psycopg2 connection; close() hands it back to the pool
+    # instead of tearing down the socket, everything else is delegated
+
+    def __init__(self, pool, raw, created_at):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+        self._released = False
+
+    def __getattr__(self, name):
+        if self._released:
+            raise psycopg2.InterfaceError("connection already returned to the pool")
+        return getattr(self._raw, name)
+
+    def __enter__(self):
+        self._raw.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return self._raw.__exit__(exc_type, exc, tb)
+
+    @property
+    def closed(self):
+        return self._released or self._raw.closed
+
+    def close(self):
+        if self._released:
+            return
+        self._released = True
+        self._pool._release(self._raw, self._created_at)
+
+
+class ConnectionPool:
+    def __init__(self, dsn, minconn=1, maxconn=10, timeout=10.0,
+                 max_lifetime=1800.0, ping_idle=30.0, connection_factory=None):
+        if minconn < 0 or maxconn < 1 or minconn > maxconn:
+            raise ValueError("Invalid pool size: min=%s max=%s" % (minconn, maxconn))
+        self.dsn = dsn
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.ping_idle = ping_idle
+        self.connection_factory = connection_factory
+
+        self._cond = threading.Condition()
+        self._idle = []  # (raw, created_at, returned_at)
+        self._in_use = 0
+        self._pid = os.getpid()
+        self._closed = False
+
+        self.stats = {
+            "checkouts": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+            "waits": 0,
+            "exhausted": 0,
+            "created": 0,
+            "discarded": 0,
+            "failed_health_checks": 0,
+        }
+
+        for _ in range(minconn):
+            self._idle.append(self._open() + (time.monotonic(),))
+
+    # ------------------------------------------------------------------ internals
+
+    def _open(self):
+        raw = psycopg2.connect(self.dsn, connection_factory=self.connection_factory)
+        self.stats["created"] += 1
+        return raw, time.monotonic()
+
+    def _discard(self, raw):
+        self.stats["discarded"] += 1
+        try:
+            raw.close()
+        except psycopg2.Error:
+            pass
+
+    def _check_pid(self):
+        # after a fork the child must never reuse the parent's sockets
+        if self._pid != os.getpid():
+            self._idle = []
+            self._in_use = 0
+            self._pid = os.getpid()
+
+    def _expired(self, created_at, now):
+        return self.max_lifetime and now - created_at >= self.max_lifetime
+
+    def _healthy(self, raw, returned_at, now):
+        if raw.closed:
+            return False
+        if self.ping_idle is not None and now - returned_at < self.ping_idle:
+            return True
+        try:
+            with raw.cursor() as cur:
+                cur.execute("SELECT 1")
+            raw.rollback()
+            return True
+        except psycopg2.Error:
+            self.stats["failed_health_checks"] += 1
+            return False
+
+    def _release(self, raw, created_at):
+        with self._cond:
+            self._check_pid()
+            self._in_use = max(self._in_use - 1, 0)
+            keep = not self._closed and not raw.closed
+            if keep and raw.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    raw.rollback()
+                except psycopg2.Error:
+                    keep = False
+            if keep and raw.autocommit:
+                raw.autocommit = False
+            now = time.monotonic()
+            if keep and not self._expired(created_at, now):
+                self._idle.append((raw, created_at, now))
+            else:
+                self._discard(raw)
+            self._cond.notify()
+
+    # ------------------------------------------------------------------ public api
+
+    def getconn(self, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        waited = False
+
+        with self._cond:
+            if self._closed:
+                raise psycopg2.InterfaceError("connection pool is closed")
+            self._check_pid()
+            while True:
+                now = time.monotonic()
+                while self._idle:
+                    raw, created_at, returned_at = self._idle.pop()
+                    if self._expired(created_at, now) or not self._healthy(raw, returned_at, now):
+                        self._discard(raw)
+                        continue
+                    self._in_use += 1
+                    return self._checked_out(raw, created_at, started, waited)
+
+                if self._in_use < self.maxconn:
+                    # reserve the slot before connecting outside the lock
+                    self._in_use += 1
+                    break
+
+                remaining = deadline - now
+                if remaining <= 0:
+                    self.stats["exhausted"] += 1
+                    raise PoolExhausted(
+                        "connection pool exhausted (max=%d, waited %.2fs)" % (self.maxconn, now - started)
+                    )
+                waited = True
+                self._cond.wait(remaining)
+
+        try:
+            raw, created_at = self._open()
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            return self._checked_out(raw, created_at, started, waited)
+
+    def _checked_out(self, raw, created_at, started, waited):
+        wait = time.monotonic() - started
+        self.stats["checkouts"] += 1
+        if waited:
+            self.stats["waits"] += 1
+        self.stats["wait_time_total"] += wait
+        self.stats["wait_time_max"] = max(self.stats["wait_time_max"], wait)
+        return PooledConnection(self, raw, created_at)
+
+    @contextmanager
+    def connection(self, timeout=None):
+        # commits on success, rolls back on error, always returns the connection
+        conn = self.getconn(timeout)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def snapshot(self):
+        with self._cond:
+            data = dict(self.stats)
+            data["idle"] = len(self._idle)
+            data["in_use"] = self._in_use
+            data["min_size"] = self.minconn
+            data["max_size"] = self.maxconn
+        return data
+
+    def closeall(self):
+        with self._cond:
+            self._closed = True
+            for raw, _, _ in self._idle:
+                self._discard(raw)
+            self._idle = []
+            self._cond.notify_all()
+
+
+def _env_float(name, default):
+    value = os.environ.get(name)
+    return float(value) if value not in (None, "") else default
+
+
+def pool_from_env(dsn, connection_factory=None):
+    return ConnectionPool(
+        dsn,
+        minconn=int(_env_float("DB_POOL_MIN", 1)),
+        maxconn=int(_env_float("DB_POOL_MAX", 10)),
+        timeout=_env_float("DB_POOL_TIMEOUT", 10.0),
+        max_lifetime=_env_float("DB_POOL_MAX_LIFETIME", 1800.0),
+        ping_idle=_env_float("DB_POOL_PING_IDLE", 30.0),
+        connection_factory=connection_factory,
+    )
@@ -0,0 +1,182 @@
+# who the signed-in user is, for the banner and anything else every page needs
+#
+# Name, role and team are loaded with one query at login and kept in the signed
+# session cookie together with the time they were loaded, so the before_request
+# hook reads them without a database round trip. Code that changes a user's name
+# or team calls invalidate(user_id): that user's session reloads its copy on the
+# next request served by this process. Other processes, and changes made by
+# triggers (an accepted transfer offer moves Employee.TeamID), are told through
+# cache_bus; MAX_AGE only bounds staleness when the bus is off.
+#
+# The banner links only depend on the role and live in BANNER_ENDPOINTS.
+import threading
+import time
+from collections import OrderedDict
+
+from psycopg2.extras import RealDictCursor
+
+import cache_bus
+import db
+from db import get_connection
+
+SESSION_KEY = "identity"
+MAX_AGE = 15 * 60  # seconds
+STALE_SIZE = 4096
+
+# g.banner_<name>_endpoint for every role; names missing from a role are None
+BANNER_LINKS = (
+    "home",
+    "view",
+    "league",
+    "all_matches",
+    "create_league",
+    "owner",
+    "reports",
+    "statistics",
+    "team_rankings",
+    "player_rankings",
+    "trainings",
+    "offers",
+    "employ_coach",
+    "transfer_market",
+    "view_team_offers",
+    "assign_training",
+    "assigned_matches",
+    "create",
+)
+
+_ADMIN_ENDPOINTS = {
+    "view": "admin.view_tournaments",
+    "league": "admin.view_leagues",
+    "all_matches": "admin.view_all_matches_lock",
+    "reports": "admin.reports",
+    "team_rankings": "admin.team_rankings",
+    "player_rankings": "admin.player_rankings",
+}
+
+BANNER_ENDPOINTS = {
+    "superadmin": {
+        "view": "superadmin.view_tournaments",
+        "league": "superadmin.view_leagues",
+    },
+    "admin": _ADMIN_ENDPOINTS,
+    "tournament_admin": _ADMIN_ENDPOINTS,
+    "team_owner": {
+        "home": "home_team_owner",
+        "owner": "owner.view_teams",
+        "employ_coach": "owner.employ_coach",
+    },
+    "coach": {
+        "owner": "coach.view_team",
+        "transfer_market": "coach.view_transfer_market",
+        "view_team_offers": "coach.view_team_offers",
+        "assign_training": "coach.view_trainings",
+    },
+    "player": {
+        "home": "player.home",
+        "owner": "player.view_team",
+        "trainings": "player.view_trainings",
+        "offers": "player.view_offers",
+    },
+    "referee": {
+        "assigned_matches": "artunsPart.view_referee_dashboard",
+    },
+}
+
+_stale = OrderedDict()  # user id -> time of the last change, oldest first
+_all_stale_at = 0.0  # every identity loaded before this is stale
+_stale_lock = threading.Lock()
+
+
+def load(user_id):
+    """{'user_id', 'first_name', 'last_name', 'role', 'team_id', 'loaded_at'} or None."""
+    conn = get_connection()
+    try:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(
+                """
+                SELECT u.UsersID, u.FirstName, u.LastName, u.Role, e.TeamID
+                FROM Users u
+                LEFT JOIN Employee e ON e.UsersID = u.UsersID
+                WHERE u.UsersID = %s;
+                """,
+                (user_id,),
+            )
+            row = cur.fetchone()
+    finally:
+        conn.close()
+    if row is None:
+        return None
+    return {
+        "user_id": row["usersid"],
+        "first_name": row["firstname"],
+        "last_name": row["lastname"],
+        "role": row["role"],
+        "team_id": row["teamid"],
+        "loaded_at": time.time(),
+    }
+
+
+def remember(session, user_id):
+    """Load user_id's identity into session (at login). Returns it."""
+    identity = load(user_id)
+    if identity is None:
+        session.pop(SESSION_KEY, None)
+    else:
+        session[SESSION_KEY] = identity
+    return identity
+
+
+def current(session):
+    """
+    The signed-in user's identity from the session, reloaded only if it is missing
+    (sessions from before this cache), older than MAX_AGE or invalidated since it
+    was loaded. None when nobody is signed in or the user no longer exists.
+    """
+    user_id = session.get("user_id")
+    if user_id is None:
+        return None
+    identity = session.get(SESSION_KEY)
+    if identity is not None and identity.get("user_id") == user_id:
+        loaded_at = identity.get("loaded_at", 0)
+        with _stale_lock:
+            changed_at = max(_stale.get(user_id, 0), _all_stale_at)
+        if loaded_at >= changed_at and time.time() - loaded_at < MAX_AGE:
+            return identity
+    return remember(session, user_id)
+
+
+def invalidate(user_id):
+    """Make user_id's session reload its identity (after a name or team change)."""
+    if user_id is None:
+        return
+    # stamped after commit, so a reload cannot pick up the old row again
+    db.on_commit(lambda: _mark_stale(int(user_id)))
+
+
+def _mark_stale(user_id):
+    global _all_stale_at
+    with _stale_lock:
+        if user_id is None:
+            _all_stale_at = time.time()
+            _stale.clear()
+            return
+        _stale[user_id] = time.time()
+        _stale.move_to_end(user_id)
+        while len(_stale) > STALE_SIZE:
+            _stale.popitem(last=False)
+
+
+def _on_user_change(key):
+    _mark_stale(int(key) if key is not None else None)
+
+
+cache_bus.register_invalidator("users", _on_user_change)
+cache_bus.register_invalidator("employee", _on_user_change)
+
+
+def apply_banner(g, role):
+    endpoints = BANNER_ENDPOINTS.get(role, {})
+    for name in BANNER_LINKS:
+        setattr(g, f"banner_{name}_endpoint", endpoints.get(name))
+    g.banner_allow_create = False
@@ -0,0 +1,266 @@
+# Index advisor: replays the read helpers from db_helper.py against the current
+# database, captures every SELECT they issue, runs it under
+# EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) and reports sequential scans together
+# with the filter columns that have no index to serve them.
+#
+#   cd app && flask --app app index-advisor [--min-rows 100]
+#
+# Everything runs in one transaction that is rolled back at the end.
+import re
+from contextlib import contextmanager
+
+import db_helper
+from db import get_pool
+
+# filters like "(playerid = 5)" or "((nationality)::text ~~* '%x%'::text)" -> column names
+_FILTER_COLUMN = re.compile(r"\((?:\w+\.)?(\w+)\)?(?:::[\w ]+)?\)?\s*(?:=|<>|<=|>=|<|>|~~\*?)\s")
+
+
+class _RecordingCursor:
+    def __init__(self, recorder, cursor):
+        self._recorder = recorder
+        self._cursor = cursor
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._cursor.close()
+        return False
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def execute(self, query, params=None):
+        self._recorder.explain(self._cursor.mogrify(query, params).decode())
+        return self._cursor.execute(query, params)
+
+
+class _RecordingConnection:
+    # shared by every helper call; commit/close are swallowed so nothing is written
+    def __init__(self, recorder, conn):
+        self._recorder = recorder
+        self._conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def cursor(self, *args, **kwargs):
+        return _RecordingCursor(self._recorder, self._conn.cursor(*args, **kwargs))
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class IndexAdvisor:
+    def __init__(self, conn, min_rows=100):
+        self.conn = conn
+        self.min_rows = min_rows
+        self.current = None
+        self.results = {}  # helper name -> list of statement reports
+        self._indexed = self._leading_index_columns()
+
+    def _leading_index_columns(self):
+        # (table, first indexed column) for every index in the public schema
+        with self.conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT t.relname, a.attname
+                FROM pg_index i
+                JOIN pg_class t ON t.oid = i.indrelid
+                JOIN pg_namespace n ON n.oid = t.relnamespace
+                JOIN pg_attribute a ON a.attrelid = t.oid AND a.attnum = i.indkey[0]
+                WHERE n.nspname = 'public';
+                """
+            )
+            return {(table.lower(), column.lower()) for table, column in cur.fetchall()}
+
+    def explain(self, sql):
+        if self.current is None or not re.match(r"\s*(--[^\n]*\n\s*)*(SELECT|WITH)\b", sql, re.I):
+            return
+        with self.conn.cursor() as cur:
+            cur.execute("SAVEPOINT index_advisor;")
+            try:
+                cur.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + sql)
+                plan = cur.fetchone()[0][0]
+                cur.execute("RELEASE SAVEPOINT index_advisor;")
+            except Exception as e:
+                cur.execute("ROLLBACK TO SAVEPOINT index_advisor;")
+                self.results[self.current].append({"sql": sql, "error": str(e)})
+                return
+        self.results[self.current].append(self._summarize(sql, plan))
+
+    def _summarize(self, sql, plan):
+        seq_scans = []
+        self._walk(plan["Plan"], seq_scans)
+        top = plan["Plan"]
+        return {
+            "sql": " ".join(sql.split()),
+            "time_ms": plan.get("Execution Time", 0.0),
+            "shared_hit": top.get("Shared Hit Blocks", 0),
+            "shared_read": top.get("Shared Read Blocks", 0),
+            "seq_scans": seq_scans,
+        }
+
+    def _walk(self, node, seq_scans):
+        if node.get("Node Type") == "Seq Scan":
+            table = node.get("Relation Name", "").lower()
+            scanned = (node.get("Actual Rows", 0) + node.get("Rows Removed by Filter", 0)) * node.get("Actual Loops", 1)
+            filter_text = node.get("Filter", "")
+            missing = sorted(
+                {
+                    column
+                    for column in _FILTER_COLUMN.findall(filter_text)
+                    if (table, column.lower()) not in self._indexed
+                }
+            )
+            if scanned >= self.min_rows or missing:
+                seq_scans.append(
+                    {
+                        "table": table,
+                        "rows_scanned": scanned,
+                        "filter": filter_text,
+                        "missing_index_on": missing,
+                    }
+                )
+        for child in node.get("Plans", []):
+            self._walk(child, seq_scans)
+
+    @contextmanager
+    def helper(self, name):
+        self.current = name
+        self.results.setdefault(name, [])
+        try:
+            yield
+        except Exception as e:
+            # read-only replay: dropping the aborted transaction loses nothing
+            self.conn.rollback()
+            self.results[name].append({"sql": None, "error": f"helper failed: {e}"})
+        finally:
+            self.current = None
+
+
+def _sample_ids(cur):
+    cur.execute(
+        """
+        SELECT
+            (SELECT PlayerID FROM Play GROUP BY PlayerID ORDER BY COUNT(*) DESC LIMIT 1),
+            (SELECT TeamID FROM Team ORDER BY TeamID LIMIT 1),
+            (SELECT UsersID FROM Coach ORDER BY UsersID LIMIT 1),
+            (SELECT UsersID FROM Admin ORDER BY UsersID LIMIT 1),
+            (SELECT TournamentID FROM Tournament ORDER BY TournamentID LIMIT 1),
+            (SELECT SessionID FROM TrainingSession ORDER BY SessionID LIMIT 1);
+        """
+    )
+    player_id, team_id, coach_id, admin_id, tournament_id, session_id = cur.fetchone()
+    cur.execute(
+        """
+        SELECT LeagueID, SeasonNo, SeasonYear
+        FROM SeasonalMatch
+        GROUP BY LeagueID, SeasonNo, SeasonYear
+        ORDER BY COUNT(*) DESC
+        LIMIT 1;
+        """
+    )
+    season = cur.fetchone() or (None, None, None)
+    return {
+        "player_id": player_id,
+        "team_id": team_id,
+        "coach_id": coach_id,
+        "admin_id": admin_id,
+        "tournament_id": tournament_id,
+        "session_id": session_id,
+        "league_id": season[0],
+        "season_no": season[1],
+        "season_year": season[2],
+    }
+
+
+def _replay_plan(ids):
+    """(name, callable) pairs covering the read paths behind the dashboards."""
+    h = db_helper
+    return [
+        ("fetch_player_stats_all", lambda: h.fetch_player_stats_all(ids["player_id"])),
+        ("fetch_player_season_stats", lambda: h.fetch_player_season_stats(ids["player_id"])),
+        ("fetch_player_tournament_stats", lambda: h.fetch_player_tournament_stats(ids["player_id"])),
+        ("fetch_player_rankings", lambda: h.fetch_player_rankings()),
+        ("fetch_team_rankings", lambda: h.fetch_team_rankings()),
+        (
+            "report_league_standings",
+            lambda: h.report_league_standings(ids["league_id"], ids["season_no"], ids["season_year"]),
+        ),
+        ("fetch_player_trainings", lambda: h.fetch_player_trainings(ids["player_id"])),
+        ("fetch_player_offers", lambda: h.fetch_player_offers(ids["player_id"])),
+        ("get_player_injury_status", lambda: h.get_player_injury_status(ids["player_id"])),
+        ("fetch_team_by_player", lambda: h.fetch_team_by_player(ids["player_id"])),
+        ("fetch_team_players", lambda: h.fetch_team_players(ids["team_id"])),
+        ("fetch_team_coaches", lambda: h.fetch_team_coaches(ids["team_id"])),
+        ("fetch_transferable_players", lambda: h.fetch_transferable_players({}, ids["coach_id"])),
+        ("fetch_team_transfer_offers", lambda: h.fetch_team_transfer_offers(ids["coach_id"])),
+        ("fetch_coach_sessions", lambda: h.fetch_coach_sessions(ids["coach_id"])),
+        ("fetch_session_details", lambda: h.fetch_session_details(ids["session_id"])),
+        ("report_player_attendance", lambda: h.report_player_attendance(all_teams=True)),
+        ("fetch_league_matches", lambda: h.fetch_league_matches(ids["league_id"])),
+        ("fetch_matches_grouped", lambda: h.fetch_matches_grouped(ids["tournament_id"])),
+        ("fetch_admin_tournament_matches", lambda: h.fetch_admin_tournament_matches(ids["admin_id"])),
+        ("fetch_seasonal_matches_for_admin", lambda: h.fetch_seasonal_matches_for_admin(ids["admin_id"])),
+        ("fetch_all_matches_with_filters", lambda: h.fetch_all_matches_with_filters(ids["admin_id"])),
+    ]
+
+
+def run_advisor(min_rows=100):
+    raw = get_pool().getconn()
+    advisor = IndexAdvisor(raw, min_rows=min_rows)
+    original_get_connection = db_helper.get_connection
+    db_helper.get_connection = lambda: _RecordingConnection(advisor, raw)
+    try:
+        with raw.cursor() as cur:
+            ids = _sample_ids(cur)
+        for name, call in _replay_plan(ids):
+            with advisor.helper(name):
+                call()
+    finally:
+        db_helper.get_connection = original_get_connection
+        raw.rollback()
+        raw.close()
+    return advisor.results
+
+
+def format_report(results):
+    lines = []
+    suggestions = {}
+    for name, statements in results.items():
+        total = sum(s.get("time_ms", 0.0) for s in statements)
+        scans = [scan for s in statements for scan in s.get("seq_scans", [])]
+        lines.append(f"{name}: {len(statements)} statement(s), {total:.1f} ms, {len(scans)} seq scan(s)")
+        for s in statements:
+            if s.get("error"):
+                lines.append(f"    ! {s['error']}")
+        for scan in scans:
+            lines.append(
+                f"    seq scan on {scan['table']} ({scan['rows_scanned']} rows)"
+                + (f" filter {scan['filter']}" if scan["filter"] else "")
+            )
+            for column in scan["missing_index_on"]:
+                suggestions.setdefault((scan["table"], column), set()).add(name)
+
+    lines.append("")
+    if suggestions:
+        lines.append("Missing indexes (table.column <- helpers):")
+        for (table, column), helpers in sorted(suggestions.items()):
+            lines.append(f"  CREATE INDEX ON {table} ({column});  -- {', '.join(sorted(helpers))}")
+    else:
+        lines.append("No filter columns without an index were found.")
+    return "\n".join(lines)
@@ -0,0 +1,284 @@
+# in-process query / request metrics, exposed in Prometheus text format at /metrics
+#
+# Every cursor handed out by the pool is instrumented: each execute() records its
+# wall time and row count under the helper function that issued it (e.g.
+# db_helper.fetch_player_rankings) and a fingerprint of the SQL (literals and
+# parameters replaced by ?). Requests are timed per route. METRICS_ENABLED=0 turns
+# both off.
+import hashlib
+import os
+import re
+import sys
+import threading
+import time
+
+import psycopg2.extensions
+from flask import Response, g, request
+
+import db
+import refcache
+import singleflight
+
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ROW_BUCKETS = (0, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000)
+
+
+def enabled():
+    return os.environ.get("METRICS_ENABLED", "1") == "1"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class Histogram:
+    def __init__(self, name, help_text, labelnames, buckets):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [bucket counts..., count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def collect(self):
+        with self._lock:
+            return {labels: list(series) for labels, series in self._series.items()}
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self.collect().items()):
+            for bound, count in zip(self.buckets, series):
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, [('le', bound)])} {count}")
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, [('le', '+Inf')])} {series[-2]}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {series[-2]}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {series[-1]}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help_text, labelnames):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in values:
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+QUERY_DURATION = Histogram(
+    "db_query_duration_seconds", "Wall time of cursor.execute() calls.", ("helper", "query"), DURATION_BUCKETS
+)
+QUERY_ROWS = Histogram(
+    "db_query_rows", "Rows returned or affected per statement.", ("helper", "query"), ROW_BUCKETS
+)
+QUERY_ERRORS = Counter("db_query_errors_total", "Statements that raised a database error.", ("helper", "query"))
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Request latency per route.", ("method", "route", "status"), DURATION_BUCKETS
+)
+
+# fingerprint id -> normalized SQL, for the db_query_info series
+_statements = {}
+_fingerprints = {}  # query template -> fingerprint id (templates only, not execute_values batches)
+_FINGERPRINT_CACHE_SIZE = 4096
+
+_COMMENT = re.compile(r"--[^\n]*")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM = re.compile(r"%(?:\(\w+\))?s")
+_VALUE = r"(?:\?|NULL|DEFAULT|TRUE|FALSE)(?:::\w+)?"
+_TUPLE = re.compile(rf"\(\s*{_VALUE}(?:\s*,\s*{_VALUE})*\s*\)", re.I)
+_TUPLE_LIST = re.compile(r"\(\?\)(?:\s*,\s*\(\?\))+")
+_SPACE = re.compile(r"\s+")
+
+
+def normalize_sql(query):
+    """SQL with literals, parameters and value lists collapsed to ?, on one line."""
+    if isinstance(query, bytes):
+        query = query.decode("utf-8", "replace")
+    sql = _COMMENT.sub(" ", str(query))
+    sql = _STRING.sub("?", sql)
+    sql = _PARAM.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _TUPLE.sub("(?)", sql)
+    sql = _TUPLE_LIST.sub("(?), ...", sql)
+    return _SPACE.sub(" ", sql).strip().rstrip(";")
+
+
+def fingerprint(query):
+    cacheable = isinstance(query, str)
+    if cacheable:
+        found = _fingerprints.get(query)
+        if found:
+            return found
+    sql = normalize_sql(query)
+    digest = hashlib.sha1(sql.encode()).hexdigest()[:12]
+    _statements.setdefault(digest, sql)
+    if cacheable and len(_fingerprints) < _FINGERPRINT_CACHE_SIZE:
+        _fingerprints[query] = digest
+    return digest
+
+
+def _helper_name():
+    # first frame outside this module and psycopg2 (execute_values and friends)
+    frame = sys._getframe(2)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module != __name__ and not module.startswith("psycopg2"):
+            return f"{module}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return "unknown"
+
+
+def record_query(query, seconds, rows, failed=False):
+    labels = (_helper_name(), fingerprint(query))
+    QUERY_DURATION.observe(labels, seconds)
+    if failed:
+        QUERY_ERRORS.inc(labels)
+    else:
+        QUERY_ROWS.observe(labels, max(rows, 0))
+
+
+class _InstrumentedCursorMixin:
+    def execute(self, query, vars=None):
+        started = time.perf_counter()
+        try:
+            result = super().execute(query, vars)
+        except psycopg2.Error:
+            record_query(query, time.perf_counter() - started, 0, failed=True)
+            raise
+        record_query(query, time.perf_counter() - started, self.rowcount)
+        return result
+
+    def executemany(self, query, vars_list):
+        started = time.perf_counter()
+        try:
+            result = super().executemany(query, vars_list)
+        except psycopg2.Error:
+            record_query(query, time.perf_counter() - started, 0, failed=True)
+            raise
+        record_query(query, time.perf_counter() - started, self.rowcount)
+        return result
+
+
+_cursor_classes = {}
+
+
+def instrumented_cursor_class(factory):
+    cls = _cursor_classes.get(factory)
+    if cls is None:
+        cls = _cursor_classes[factory] = type(
+            "Instrumented" + factory.__name__, (_InstrumentedCursorMixin, factory), {}
+        )
+    return cls
+
+
+class InstrumentedConnection(psycopg2.extensions.connection):
+    # passed to psycopg2.connect() as connection_factory; wraps whatever cursor
+    # class the caller asks for (plain, RealDictCursor, ...)
+    def cursor(self, *args, **kwargs):
+        factory = kwargs.get("cursor_factory") or self.cursor_factory or psycopg2.extensions.cursor
+        kwargs["cursor_factory"] = instrumented_cursor_class(factory)
+        return super().cursor(*args, **kwargs)
+
+
+def _pool_lines():
+    stats = db.pool_stats()
+    lines = []
+    for key, value in sorted(stats.items()):
+        name = f"db_pool_{key}"
+        kind = "gauge" if key in ("idle", "in_use", "min_size", "max_size", "wait_time_max") else "counter"
+        lines.append(f"# TYPE {name} {kind}")
+        lines.append(f"{name} {value}")
+    return lines
+
+
+def _refcache_lines():
+    stats = refcache.stats()
+    lines = []
+    for key in ("hits", "misses", "evictions", "expired", "invalidations"):
+        lines.append(f"# TYPE refcache_{key}_total counter")
+        lines.append(f"refcache_{key}_total {stats[key]}")
+    lines.append("# TYPE refcache_entries gauge")
+    lines.append(f"refcache_entries {stats['size']}")
+    return lines
+
+
+def _singleflight_lines():
+    stats = singleflight.stats()
+    lines = []
+    for key in ("calls", "leaders", "shared", "fresh", "stale", "refresh_errors"):
+        lines.append(f"# TYPE singleflight_{key}_total counter")
+        lines.append(f"singleflight_{key}_total {stats[key]}")
+    lines.append("# TYPE singleflight_inflight gauge")
+    lines.append(f"singleflight_inflight {stats['inflight']}")
+    return lines
+
+
+def render():
+    lines = []
+    for metric in (QUERY_DURATION, QUERY_ROWS, QUERY_ERRORS, REQUEST_DURATION):
+        lines.extend(metric.render())
+    lines.append("# HELP db_query_info Normalized SQL for each query fingerprint.")
+    lines.append("# TYPE db_query_info gauge")
+    for digest, sql in sorted(_statements.items()):
+        lines.append(f"db_query_info{_labels(('query', 'sql'), (digest, sql[:500]))} 1")
+    lines.extend(_pool_lines())
+    lines.extend(_refcache_lines())
+    lines.extend(_singleflight_lines())
+    return "\n".join(lines) + "\n"
+
+
+def _start_timer():
+    g._metrics_started = time.perf_counter()
+
+
+def _observe_request(response):
+    started = g.pop("_metrics_started", None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+        REQUEST_DURATION.observe(
+            (request.method, route, str(response.status_code)), time.perf_counter() - started
+        )
+    return response
+
+
+def metrics_view():
+    return Response(render(), mimetype="text/plain; version=0.0.4")
+
+
+def init_app(app):
+    if not enabled():
+        return
+    db.set_connection_factory(InstrumentedConnection)
+    app.before_request(_start_timer)
+    app.after_request(_observe_request)
+    app.add_url_rule("/metrics", "metrics", metrics_view)
@@ -0,0 +1,56 @@
+# applies the versioned SQL files in migrations/ that the database has not seen yet
+import os
+
+from db import get_connection
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+
+
+def available_migrations():
+    """(version, path) for every migrations/NNNN_name.sql, in order."""
+    files = sorted(f for f in os.listdir(MIGRATIONS_DIR) if f.endswith(".sql"))
+    return [(f[:-4], os.path.join(MIGRATIONS_DIR, f)) for f in files]
+
+
+def applied_migrations(cur):
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS SchemaMigration (
+          Version VARCHAR(100),
+          AppliedAt TIMESTAMP NOT NULL DEFAULT NOW(),
+          PRIMARY KEY (Version)
+        );
+        """
+    )
+    cur.execute("SELECT Version FROM SchemaMigration;")
+    return {row[0] for row in cur.fetchall()}
+
+
+def pending_migrations():
+    conn = get_connection()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                applied = applied_migrations(cur)
+        return [(version, path) for version, path in available_migrations() if version not in applied]
+    finally:
+        conn.close()
+
+
+def apply_migrations(log=print):
+    """Applies each pending migration in its own transaction. Returns the versions applied."""
+    done = []
+    for version, path in pending_migrations():
+        with open(path) as f:
+            sql = f.read()
+        conn = get_connection()
+        try:
+            with conn:
+                with conn.cursor() as cur:
+                    cur.execute(sql)
+                    cur.execute("INSERT INTO SchemaMigration (Version) VALUES (%s);", (version,))
+        finally:
+            conn.close()
+        log(f"Applied {version}")
+        done.append(version)
+    return done
@@ -0,0 +1,738 @@
+-- schema added before migrations were versioned (sweep watermark, league
+-- standings, materialized player statistics and the statement-level Play
+-- triggers), for databases created from an older init.sql; later migrations build
+-- on these tables. A fresh init.sql already contains all of it.
+
+-- used by the expired-injury sweep
+CREATE INDEX IF NOT EXISTS idx_injury_recovery_date ON Injury (RecoveryDate);
+CREATE INDEX IF NOT EXISTS idx_injury_player_date ON Injury (PlayerID, InjuryDate);
+
+-- per-team league standings, kept up to date by the trg_standings_* triggers
+CREATE TABLE IF NOT EXISTS TeamSeasonStanding (
+  LeagueID INT,
+  SeasonNo INT,
+  SeasonYear DATE,
+  TeamID INT,
+  TeamName VARCHAR(100) NOT NULL,
+  Played INT NOT NULL DEFAULT 0,
+  Wins INT NOT NULL DEFAULT 0,
+  Draws INT NOT NULL DEFAULT 0,
+  Losses INT NOT NULL DEFAULT 0,
+  GoalsFor INT NOT NULL DEFAULT 0,
+  GoalsAgainst INT NOT NULL DEFAULT 0,
+  Points INT NOT NULL DEFAULT 0,
+  PRIMARY KEY (LeagueID, SeasonNo, SeasonYear, TeamID),
+  FOREIGN KEY (LeagueID, SeasonNo, SeasonYear) REFERENCES Season(LeagueID, SeasonNo, SeasonYear) ON DELETE CASCADE,
+  FOREIGN KEY (TeamID) REFERENCES Team(TeamID) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_team_season_standing_team ON TeamSeasonStanding (TeamID);
+
+-- materialized player statistics; same numbers as the PlayerStatsAll /
+-- PlayerSeasonStats / PlayerTournamentStats views, refreshed per player from
+-- PlayerStatsDirty by refresh_player_stats()
+CREATE TABLE IF NOT EXISTS PlayerStatsAllMat (
+  UsersID INT,
+  total_appearances BIGINT,
+  total_goals BIGINT,
+  total_penalties BIGINT,
+  total_minutes BIGINT,
+  total_yellowcards BIGINT,
+  total_redcards BIGINT,
+  total_saves BIGINT,
+  total_successfulpasses BIGINT,
+  total_totalpasses BIGINT,
+  total_assistsmade BIGINT,
+  RefreshedAt TIMESTAMP NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (UsersID),
+  FOREIGN KEY (UsersID) REFERENCES Users(UsersID) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS PlayerSeasonStatsMat (
+  UsersID INT,
+  LeagueID INT,
+  SeasonNo INT,
+  SeasonYear DATE,
+  total_appearances BIGINT,
+  total_goals BIGINT,
+  total_penalties BIGINT,
+  total_minutes BIGINT,
+  total_yellowcards BIGINT,
+  total_redcards BIGINT,
+  total_saves BIGINT,
+  total_successfulpasses BIGINT,
+  total_totalpasses BIGINT,
+  total_assistsmade BIGINT,
+  RefreshedAt TIMESTAMP NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (UsersID, LeagueID, SeasonNo, SeasonYear),
+  FOREIGN KEY (UsersID) REFERENCES Users(UsersID) ON DELETE CASCADE,
+  FOREIGN KEY (LeagueID, SeasonNo, SeasonYear) REFERENCES Season(LeagueID, SeasonNo, SeasonYear) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_player_season_stats_mat_season ON PlayerSeasonStatsMat (LeagueID, SeasonNo, SeasonYear);
+
+CREATE TABLE IF NOT EXISTS PlayerTournamentStatsMat (
+  UsersID INT,
+  TournamentID INT,
+  total_appearances BIGINT,
+  total_goals BIGINT,
+  total_penalties BIGINT,
+  total_minutes BIGINT,
+  total_yellowcards BIGINT,
+  total_redcards BIGINT,
+  total_saves BIGINT,
+  total_successfulpasses BIGINT,
+  total_totalpasses BIGINT,
+  total_assistsmade BIGINT,
+  RefreshedAt TIMESTAMP NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (UsersID, TournamentID),
+  FOREIGN KEY (UsersID) REFERENCES Users(UsersID) ON DELETE CASCADE,
+  FOREIGN KEY (TournamentID) REFERENCES Tournament(TournamentID) ON DELETE CASCADE
+);
+
+-- players whose materialized statistics are out of date
+CREATE TABLE IF NOT EXISTS PlayerStatsDirty (
+  PlayerID INT,
+  QueuedAt TIMESTAMP NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (PlayerID)
+);
+
+-- bookkeeping for background sweeps: how far each job has already looked
+CREATE TABLE IF NOT EXISTS SweepWatermark (
+  JobName VARCHAR(50),
+  LastSweptAt TIMESTAMP NOT NULL DEFAULT '-infinity',
+  LastRowID INT NOT NULL DEFAULT 0,
+  SweptAt TIMESTAMP,
+  PRIMARY KEY (JobName)
+);
+
+INSERT INTO SweepWatermark (JobName) VALUES ('expired_injuries') ON CONFLICT (JobName) DO NOTHING;
+
+-- readers of the materialized statistics: same columns as the PlayerStatsAll /
+-- PlayerSeasonStats / PlayerTournamentStats views plus
+-- RefreshedAt and IsStale (a refresh for the player is still queued)
+CREATE OR REPLACE VIEW PlayerStatsAllCached AS
+SELECT
+  U1.UsersID,
+  U1.FirstName,
+  U1.LastName,
+  S1.total_appearances,
+  S1.total_goals,
+  S1.total_penalties,
+  S1.total_minutes,
+  S1.total_yellowcards,
+  S1.total_redcards,
+  S1.total_saves,
+  S1.total_successfulpasses,
+  S1.total_totalpasses,
+  S1.total_assistsmade,
+  S1.RefreshedAt,
+  EXISTS (SELECT 1 FROM PlayerStatsDirty D1 WHERE D1.PlayerID = S1.UsersID) AS IsStale
+FROM PlayerStatsAllMat S1
+JOIN Users U1 ON U1.UsersID = S1.UsersID;
+
+CREATE OR REPLACE VIEW PlayerSeasonStatsCached AS
+SELECT
+  U1.UsersID,
+  U1.FirstName,
+  U1.LastName,
+  L1.Name,
+  S1.LeagueID,
+  S1.SeasonNo,
+  S1.SeasonYear,
+  S1.total_appearances,
+  S1.total_goals,
+  S1.total_penalties,
+  S1.total_minutes,
+  S1.total_yellowcards,
+  S1.total_redcards,
+  S1.total_saves,
+  S1.total_successfulpasses,
+  S1.total_totalpasses,
+  S1.total_assistsmade,
+  S1.RefreshedAt,
+  EXISTS (SELECT 1 FROM PlayerStatsDirty D1 WHERE D1.PlayerID = S1.UsersID) AS IsStale
+FROM PlayerSeasonStatsMat S1
+JOIN Users U1 ON U1.UsersID = S1.UsersID
+JOIN League L1 ON L1.LeagueID = S1.LeagueID;
+
+CREATE OR REPLACE VIEW PlayerTournamentStatsCached AS
+SELECT
+  U1.UsersID,
+  U1.FirstName,
+  U1.LastName,
+  T1.TournamentID,
+  T1.Name,
+  S1.total_appearances,
+  S1.total_goals,
+  S1.total_penalties,
+  S1.total_minutes,
+  S1.total_yellowcards,
+  S1.total_redcards,
+  S1.total_saves,
+  S1.total_successfulpasses,
+  S1.total_totalpasses,
+  S1.total_assistsmade,
+  S1.RefreshedAt,
+  EXISTS (SELECT 1 FROM PlayerStatsDirty D1 WHERE D1.PlayerID = S1.UsersID) AS IsStale
+FROM PlayerTournamentStatsMat S1
+JOIN Users U1 ON U1.UsersID = S1.UsersID
+JOIN Tournament T1 ON T1.TournamentID = S1.TournamentID;
+
+-- Statement-level versions of play_insert / play_update / play_change_recalc.
+-- They read the changed plays from transition tables and update every affected
+-- match exactly once per statement (score delta + winner recalculation through
+-- match_update), instead of once or twice per play row. These are the active set;
+-- the row-level triggers are kept but disabled (see benchmarks/play_triggers.py).
+
+-- Every affected match gets one UPDATE: started plays whose player belonged to one
+-- of the teams at kick-off add their goals (as the row-level triggers did), and the
+-- update itself fires match_update to recalculate the winner.
+CREATE OR REPLACE FUNCTION recalc_matches_after_play_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+    WITH deltas AS (
+        SELECT np.MatchID, np.PlayerID, COALESCE(np.GoalsScored, 0) AS Goals
+        FROM new_plays np
+        WHERE np.StartTime IS NOT NULL
+    ),
+    per_match AS (
+        SELECT
+            m.MatchID,
+            SUM(CASE WHEN team.TeamID = m.HomeTeamID THEN d.Goals ELSE 0 END) AS HomeDelta,
+            SUM(CASE WHEN team.TeamID = m.AwayTeamID THEN d.Goals ELSE 0 END) AS AwayDelta
+        FROM deltas d
+        JOIN Match m ON m.MatchID = d.MatchID
+        CROSS JOIN LATERAL (
+            SELECT ae.TeamID
+            FROM AllEmploymentInfo ae
+            WHERE ae.UsersID = d.PlayerID
+              AND m.MatchStartDatetime BETWEEN ae.StartDate AND ae.EndDate
+            LIMIT 1
+        ) team
+        GROUP BY m.MatchID
+    ),
+    affected AS (
+        SELECT DISTINCT MatchID FROM new_plays
+    )
+    UPDATE Match m
+    SET HomeTeamScore = CASE WHEN pm.MatchID IS NULL THEN m.HomeTeamScore
+                             ELSE COALESCE(m.HomeTeamScore, 0) + pm.HomeDelta END,
+        AwayTeamScore = CASE WHEN pm.MatchID IS NULL THEN m.AwayTeamScore
+                             ELSE COALESCE(m.AwayTeamScore, 0) + pm.AwayDelta END
+    FROM affected a
+    LEFT JOIN per_match pm ON pm.MatchID = a.MatchID
+    WHERE m.MatchID = a.MatchID;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION recalc_matches_after_play_update()
+RETURNS TRIGGER AS $$
+BEGIN
+    WITH deltas AS (
+        SELECT np.MatchID, np.PlayerID,
+               COALESCE(np.GoalsScored, 0) - COALESCE(op.GoalsScored, 0) AS Goals
+        FROM new_plays np
+        JOIN old_plays op ON op.PlayID = np.PlayID
+        WHERE np.StartTime IS NOT NULL
+          AND COALESCE(np.GoalsScored, 0) <> COALESCE(op.GoalsScored, 0)
+    ),
+    per_match AS (
+        SELECT
+            m.MatchID,
+            SUM(CASE WHEN team.TeamID = m.HomeTeamID THEN d.Goals ELSE 0 END) AS HomeDelta,
+            SUM(CASE WHEN team.TeamID = m.AwayTeamID THEN d.Goals ELSE 0 END) AS AwayDelta
+        FROM deltas d
+        JOIN Match m ON m.MatchID = d.MatchID
+        CROSS JOIN LATERAL (
+            SELECT ae.TeamID
+            FROM AllEmploymentInfo ae
+            WHERE ae.UsersID = d.PlayerID
+              AND m.MatchStartDatetime BETWEEN ae.StartDate AND ae.EndDate
+            LIMIT 1
+        ) team
+        GROUP BY m.MatchID
+    ),
+    affected AS (
+        SELECT MatchID FROM new_plays
+        UNION
+        SELECT MatchID FROM old_plays
+    )
+    UPDATE Match m
+    SET HomeTeamScore = CASE WHEN pm.MatchID IS NULL THEN m.HomeTeamScore
+                             ELSE COALESCE(m.HomeTeamScore, 0) + pm.HomeDelta END,
+        AwayTeamScore = CASE WHEN pm.MatchID IS NULL THEN m.AwayTeamScore
+                             ELSE COALESCE(m.AwayTeamScore, 0) + pm.AwayDelta END
+    FROM affected a
+    LEFT JOIN per_match pm ON pm.MatchID = a.MatchID
+    WHERE m.MatchID = a.MatchID;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- deleting plays never changed scores; only the winner is recalculated
+CREATE OR REPLACE FUNCTION recalc_matches_after_play_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE Match
+    SET MatchID = MatchID
+    WHERE MatchID IN (SELECT MatchID FROM old_plays);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS play_insert_stmt ON Play;
+CREATE TRIGGER play_insert_stmt
+AFTER INSERT ON Play
+REFERENCING NEW TABLE AS new_plays
+FOR EACH STATEMENT
+EXECUTE FUNCTION recalc_matches_after_play_insert();
+
+DROP TRIGGER IF EXISTS play_update_stmt ON Play;
+CREATE TRIGGER play_update_stmt
+AFTER UPDATE ON Play
+REFERENCING OLD TABLE AS old_plays NEW TABLE AS new_plays
+FOR EACH STATEMENT
+EXECUTE FUNCTION recalc_matches_after_play_update();
+
+DROP TRIGGER IF EXISTS play_delete_stmt ON Play;
+CREATE TRIGGER play_delete_stmt
+AFTER DELETE ON Play
+REFERENCING OLD TABLE AS old_plays
+FOR EACH STATEMENT
+EXECUTE FUNCTION recalc_matches_after_play_delete();
+
+ALTER TABLE Play DISABLE TRIGGER play_insert;
+ALTER TABLE Play DISABLE TRIGGER play_update;
+ALTER TABLE Play DISABLE TRIGGER play_change_recalc;
+
+-- standings maintenance ------------------------------------------------------
+-- Adds (p_sign = 1) or removes (p_sign = -1) one scored match result for one team.
+-- Unscored matches do not count towards the standings.
+CREATE OR REPLACE FUNCTION apply_standing_delta(
+    p_league_id INT,
+    p_season_no INT,
+    p_season_year DATE,
+    p_team_id INT,
+    p_team_name VARCHAR,
+    p_goals_for INT,
+    p_goals_against INT,
+    p_sign INT
+)
+RETURNS VOID AS $$
+DECLARE
+    v_win INT := CASE WHEN p_goals_for > p_goals_against THEN 1 ELSE 0 END;
+    v_draw INT := CASE WHEN p_goals_for = p_goals_against THEN 1 ELSE 0 END;
+    v_loss INT := CASE WHEN p_goals_for < p_goals_against THEN 1 ELSE 0 END;
+BEGIN
+    IF p_goals_for IS NULL OR p_goals_against IS NULL THEN
+        RETURN;
+    END IF;
+
+    IF p_sign > 0 THEN
+        INSERT INTO TeamSeasonStanding (
+            LeagueID, SeasonNo, SeasonYear, TeamID, TeamName,
+            Played, Wins, Draws, Losses, GoalsFor, GoalsAgainst, Points
+        )
+        VALUES (
+            p_league_id, p_season_no, p_season_year, p_team_id, p_team_name,
+            1, v_win, v_draw, v_loss, p_goals_for, p_goals_against, 3 * v_win + v_draw
+        )
+        ON CONFLICT (LeagueID, SeasonNo, SeasonYear, TeamID) DO UPDATE
+        SET TeamName = EXCLUDED.TeamName,
+            Played = TeamSeasonStanding.Played + 1,
+            Wins = TeamSeasonStanding.Wins + EXCLUDED.Wins,
+            Draws = TeamSeasonStanding.Draws + EXCLUDED.Draws,
+            Losses = TeamSeasonStanding.Losses + EXCLUDED.Losses,
+            GoalsFor = TeamSeasonStanding.GoalsFor + EXCLUDED.GoalsFor,
+            GoalsAgainst = TeamSeasonStanding.GoalsAgainst + EXCLUDED.GoalsAgainst,
+            Points = TeamSeasonStanding.Points + EXCLUDED.Points;
+    ELSE
+        -- the row may already be gone when a season is being deleted
+        UPDATE TeamSeasonStanding
+        SET Played = Played - 1,
+            Wins = Wins - v_win,
+            Draws = Draws - v_draw,
+            Losses = Losses - v_loss,
+            GoalsFor = GoalsFor - p_goals_for,
+            GoalsAgainst = GoalsAgainst - p_goals_against,
+            Points = Points - (3 * v_win + v_draw)
+        WHERE LeagueID = p_league_id
+          AND SeasonNo = p_season_no
+          AND SeasonYear = p_season_year
+          AND TeamID = p_team_id;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION apply_match_standing(
+    p_league_id INT,
+    p_season_no INT,
+    p_season_year DATE,
+    p_match Match,
+    p_sign INT
+)
+RETURNS VOID AS $$
+BEGIN
+    PERFORM apply_standing_delta(
+        p_league_id, p_season_no, p_season_year,
+        p_match.HomeTeamID, p_match.HomeTeamName,
+        p_match.HomeTeamScore, p_match.AwayTeamScore, p_sign
+    );
+    PERFORM apply_standing_delta(
+        p_league_id, p_season_no, p_season_year,
+        p_match.AwayTeamID, p_match.AwayTeamName,
+        p_match.AwayTeamScore, p_match.HomeTeamScore, p_sign
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+-- score or team change on a seasonal match: take the old result out, put the new one in
+CREATE OR REPLACE FUNCTION standings_on_match_update()
+RETURNS TRIGGER AS $$
+DECLARE
+    sm RECORD;
+BEGIN
+    SELECT LeagueID, SeasonNo, SeasonYear INTO sm
+    FROM SeasonalMatch
+    WHERE MatchID = NEW.MatchID;
+
+    IF NOT FOUND THEN
+        RETURN NULL;
+    END IF;
+
+    PERFORM apply_match_standing(sm.LeagueID, sm.SeasonNo, sm.SeasonYear, OLD, -1);
+    PERFORM apply_match_standing(sm.LeagueID, sm.SeasonNo, sm.SeasonYear, NEW, 1);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_standings_match_update ON Match;
+CREATE TRIGGER trg_standings_match_update
+AFTER UPDATE ON Match
+FOR EACH ROW
+WHEN (
+    OLD.HomeTeamScore IS DISTINCT FROM NEW.HomeTeamScore
+    OR OLD.AwayTeamScore IS DISTINCT FROM NEW.AwayTeamScore
+    OR OLD.HomeTeamID IS DISTINCT FROM NEW.HomeTeamID
+    OR OLD.AwayTeamID IS DISTINCT FROM NEW.AwayTeamID
+)
+EXECUTE FUNCTION standings_on_match_update();
+
+-- the SeasonalMatch row is removed by cascade after the Match row is gone, so the
+-- result has to be taken out while the match is still readable
+CREATE OR REPLACE FUNCTION standings_on_match_delete()
+RETURNS TRIGGER AS $$
+DECLARE
+    sm RECORD;
+BEGIN
+    SELECT LeagueID, SeasonNo, SeasonYear INTO sm
+    FROM SeasonalMatch
+    WHERE MatchID = OLD.MatchID;
+
+    IF FOUND THEN
+        PERFORM apply_match_standing(sm.LeagueID, sm.SeasonNo, sm.SeasonYear, OLD, -1);
+    END IF;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_standings_match_delete ON Match;
+CREATE TRIGGER trg_standings_match_delete
+BEFORE DELETE ON Match
+FOR EACH ROW
+EXECUTE FUNCTION standings_on_match_delete();
+
+-- a match joining, leaving or moving between seasons
+CREATE OR REPLACE FUNCTION standings_on_seasonal_match_change()
+RETURNS TRIGGER AS $$
+DECLARE
+    m Match%ROWTYPE;
+BEGIN
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        SELECT * INTO m FROM Match WHERE MatchID = OLD.MatchID;
+        -- not found: the match itself is being deleted, trg_standings_match_delete handled it
+        IF FOUND THEN
+            PERFORM apply_match_standing(OLD.LeagueID, OLD.SeasonNo, OLD.SeasonYear, m, -1);
+        END IF;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT * INTO m FROM Match WHERE MatchID = NEW.MatchID;
+        IF FOUND THEN
+            PERFORM apply_match_standing(NEW.LeagueID, NEW.SeasonNo, NEW.SeasonYear, m, 1);
+        END IF;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_standings_seasonal_match ON SeasonalMatch;
+CREATE TRIGGER trg_standings_seasonal_match
+AFTER INSERT OR UPDATE OR DELETE ON SeasonalMatch
+FOR EACH ROW
+EXECUTE FUNCTION standings_on_seasonal_match_change();
+
+-- recompute every standing from scratch (repair / backfill)
+CREATE OR REPLACE FUNCTION rebuild_team_season_standings()
+RETURNS INT AS $$
+DECLARE
+    v_rows INT;
+BEGIN
+    DELETE FROM TeamSeasonStanding;
+
+    INSERT INTO TeamSeasonStanding (
+        LeagueID, SeasonNo, SeasonYear, TeamID, TeamName,
+        Played, Wins, Draws, Losses, GoalsFor, GoalsAgainst, Points
+    )
+    SELECT
+        sm.LeagueID,
+        sm.SeasonNo,
+        sm.SeasonYear,
+        side.TeamID,
+        (ARRAY_AGG(side.TeamName ORDER BY m.MatchStartDatetime DESC))[1],
+        COUNT(*),
+        COUNT(*) FILTER (WHERE side.GoalsFor > side.GoalsAgainst),
+        COUNT(*) FILTER (WHERE side.GoalsFor = side.GoalsAgainst),
+        COUNT(*) FILTER (WHERE side.GoalsFor < side.GoalsAgainst),
+        SUM(side.GoalsFor),
+        SUM(side.GoalsAgainst),
+        3 * COUNT(*) FILTER (WHERE side.GoalsFor > side.GoalsAgainst)
+            + COUNT(*) FILTER (WHERE side.GoalsFor = side.GoalsAgainst)
+    FROM Match m
+    JOIN SeasonalMatch sm ON sm.MatchID = m.MatchID
+    CROSS JOIN LATERAL (
+        VALUES
+            (m.HomeTeamID, m.HomeTeamName, m.HomeTeamScore, m.AwayTeamScore),
+            (m.AwayTeamID, m.AwayTeamName, m.AwayTeamScore, m.HomeTeamScore)
+    ) AS side(TeamID, TeamName, GoalsFor, GoalsAgainst)
+    WHERE m.HomeTeamScore IS NOT NULL
+      AND m.AwayTeamScore IS NOT NULL
+    GROUP BY sm.LeagueID, sm.SeasonNo, sm.SeasonYear, side.TeamID;
+
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    RETURN v_rows;
+END;
+$$ LANGUAGE plpgsql;
+
+-- materialized player statistics -------------------------------------------
+-- Recomputes every statistics row of the given players (NULL = everyone).
+CREATE OR REPLACE FUNCTION refresh_player_stats_for(p_players INT[])
+RETURNS VOID AS $$
+BEGIN
+    DELETE FROM PlayerStatsAllMat WHERE p_players IS NULL OR UsersID = ANY(p_players);
+    DELETE FROM PlayerSeasonStatsMat WHERE p_players IS NULL OR UsersID = ANY(p_players);
+    DELETE FROM PlayerTournamentStatsMat WHERE p_players IS NULL OR UsersID = ANY(p_players);
+
+    INSERT INTO PlayerStatsAllMat (
+        UsersID,
+        total_appearances, total_goals, total_penalties, total_minutes,
+        total_yellowcards, total_redcards, total_saves,
+        total_successfulpasses, total_totalpasses, total_assistsmade
+    )
+    SELECT
+        P1.PlayerID,
+        COUNT(DISTINCT P1.MatchID),
+        SUM(P1.GoalsScored),
+        SUM(P1.PenaltiesScored),
+        SUM(COALESCE(P1.StopTime, 0) - COALESCE(P1.StartTime, 0)) / 60,
+        SUM(P1.YellowCards),
+        SUM(P1.RedCards),
+        SUM(P1.Saves),
+        SUM(P1.SuccessfulPasses),
+        SUM(P1.TotalPasses),
+        SUM(P1.AssistsMade)
+    FROM Play P1
+    JOIN Match M1 ON M1.MatchID = P1.MatchID
+    WHERE p_players IS NULL OR P1.PlayerID = ANY(p_players)
+    GROUP BY P1.PlayerID;
+
+    INSERT INTO PlayerSeasonStatsMat (
+        UsersID, LeagueID, SeasonNo, SeasonYear,
+        total_appearances, total_goals, total_penalties, total_minutes,
+        total_yellowcards, total_redcards, total_saves,
+        total_successfulpasses, total_totalpasses, total_assistsmade
+    )
+    SELECT
+        P1.PlayerID,
+        SMa1.LeagueID,
+        SMa1.SeasonNo,
+        SMa1.SeasonYear,
+        COUNT(DISTINCT P1.MatchID),
+        SUM(P1.GoalsScored),
+        SUM(P1.PenaltiesScored),
+        SUM(COALESCE(P1.StopTime, 0) - COALESCE(P1.StartTime, 0)) / 60,
+        SUM(P1.YellowCards),
+        SUM(P1.RedCards),
+        SUM(P1.Saves),
+        SUM(P1.SuccessfulPasses),
+        SUM(P1.TotalPasses),
+        SUM(P1.AssistsMade)
+    FROM SeasonalMatch SMa1
+    JOIN Play P1 ON P1.MatchID = SMa1.MatchID
+    WHERE p_players IS NULL OR P1.PlayerID = ANY(p_players)
+    GROUP BY P1.PlayerID, SMa1.LeagueID, SMa1.SeasonNo, SMa1.SeasonYear;
+
+    INSERT INTO PlayerTournamentStatsMat (
+        UsersID, TournamentID,
+        total_appearances, total_goals, total_penalties, total_minutes,
+        total_yellowcards, total_redcards, total_saves,
+        total_successfulpasses, total_totalpasses, total_assistsmade
+    )
+    SELECT
+        P1.PlayerID,
+        R1.TournamentID,
+        COUNT(DISTINCT P1.MatchID),
+        SUM(P1.GoalsScored),
+        SUM(P1.PenaltiesScored),
+        SUM(COALESCE(P1.StopTime, 0) - COALESCE(P1.StartTime, 0)) / 60,
+        SUM(P1.YellowCards),
+        SUM(P1.RedCards),
+        SUM(P1.Saves),
+        SUM(P1.SuccessfulPasses),
+        SUM(P1.TotalPasses),
+        SUM(P1.AssistsMade)
+    FROM TournamentMatch TM1
+    JOIN Round R1 ON R1.T_MatchID = TM1.MatchID
+    JOIN Play P1 ON P1.MatchID = TM1.MatchID
+    WHERE p_players IS NULL OR P1.PlayerID = ANY(p_players)
+    GROUP BY P1.PlayerID, R1.TournamentID;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Drains up to p_limit queued players (NULL = all). Returns how many were refreshed.
+CREATE OR REPLACE FUNCTION refresh_player_stats(p_limit INT DEFAULT NULL)
+RETURNS INT AS $$
+DECLARE
+    v_players INT[];
+BEGIN
+    WITH picked AS (
+        SELECT PlayerID
+        FROM PlayerStatsDirty
+        ORDER BY QueuedAt
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    ),
+    dequeued AS (
+        DELETE FROM PlayerStatsDirty d
+        USING picked
+        WHERE d.PlayerID = picked.PlayerID
+        RETURNING d.PlayerID
+    )
+    SELECT ARRAY_AGG(PlayerID) INTO v_players FROM dequeued;
+
+    IF v_players IS NULL THEN
+        RETURN 0;
+    END IF;
+
+    PERFORM refresh_player_stats_for(v_players);
+    RETURN CARDINALITY(v_players);
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION rebuild_player_stats()
+RETURNS VOID AS $$
+BEGIN
+    DELETE FROM PlayerStatsDirty;
+    PERFORM refresh_player_stats_for(NULL);
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION enqueue_player_stats(p_players INT[])
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO PlayerStatsDirty (PlayerID)
+    SELECT DISTINCT UNNEST(p_players)
+    ON CONFLICT (PlayerID) DO NOTHING;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION enqueue_player_stats_from_new_plays()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM enqueue_player_stats(ARRAY(SELECT PlayerID FROM new_plays));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION enqueue_player_stats_from_changed_plays()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM enqueue_player_stats(ARRAY(
+        SELECT PlayerID FROM new_plays UNION SELECT PlayerID FROM old_plays
+    ));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION enqueue_player_stats_from_old_plays()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM enqueue_player_stats(ARRAY(SELECT PlayerID FROM old_plays));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_player_stats_play_insert ON Play;
+CREATE TRIGGER trg_player_stats_play_insert
+AFTER INSERT ON Play
+REFERENCING NEW TABLE AS new_plays
+FOR EACH STATEMENT
+EXECUTE FUNCTION enqueue_player_stats_from_new_plays();
+
+DROP TRIGGER IF EXISTS trg_player_stats_play_update ON Play;
+CREATE TRIGGER trg_player_stats_play_update
+AFTER UPDATE ON Play
+REFERENCING OLD TABLE AS old_plays NEW TABLE AS new_plays
+FOR EACH STATEMENT
+EXECUTE FUNCTION enqueue_player_stats_from_changed_plays();
+
+DROP TRIGGER IF EXISTS trg_player_stats_play_delete ON Play;
+CREATE TRIGGER trg_player_stats_play_delete
+AFTER DELETE ON Play
+REFERENCING OLD TABLE AS old_plays
+FOR EACH STATEMENT
+EXECUTE FUNCTION enqueue_player_stats_from_old_plays();
+
+-- a match joining/leaving a season or a tournament round changes which rows its plays count towards
+CREATE OR REPLACE FUNCTION enqueue_player_stats_from_match_link()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_matches INT[];
+BEGIN
+    IF TG_TABLE_NAME = 'round' THEN
+        v_matches := ARRAY[
+            CASE WHEN TG_OP <> 'INSERT' THEN OLD.T_MatchID END,
+            CASE WHEN TG_OP <> 'DELETE' THEN NEW.T_MatchID END
+        ];
+    ELSE
+        v_matches := ARRAY[
+            CASE WHEN TG_OP <> 'INSERT' THEN OLD.MatchID END,
+            CASE WHEN TG_OP <> 'DELETE' THEN NEW.MatchID END
+        ];
+    END IF;
+
+    PERFORM enqueue_player_stats(ARRAY(
+        SELECT PlayerID FROM Play WHERE MatchID = ANY(v_matches)
+    ));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_player_stats_seasonal_match ON SeasonalMatch;
+CREATE TRIGGER trg_player_stats_seasonal_match
+AFTER INSERT OR UPDATE OR DELETE ON SeasonalMatch
+FOR EACH ROW
+EXECUTE FUNCTION enqueue_player_stats_from_match_link();
+
+DROP TRIGGER IF EXISTS trg_player_stats_round ON Round;
+CREATE TRIGGER trg_player_stats_round
+AFTER INSERT OR DELETE OR UPDATE OF T_MatchID, TournamentID ON Round
+FOR EACH ROW
+EXECUTE FUNCTION enqueue_player_stats_from_match_link();
+
+-- fill the new tables from the data already in the database
+SELECT rebuild_team_season_standings();
+SELECT rebuild_player_stats();
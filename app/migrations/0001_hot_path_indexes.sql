@@ -0,0 +1,13 @@
+-- secondary indexes for the filters and joins used on the hot request paths
+-- (Round.T_MatchID is UNIQUE and Injury(PlayerID, InjuryDate) already exists, so
+-- both are indexed already)
+CREATE INDEX IF NOT EXISTS idx_play_match ON Play (MatchID);
+CREATE INDEX IF NOT EXISTS idx_play_player ON Play (PlayerID);
+CREATE INDEX IF NOT EXISTS idx_employed_users ON Employed (UsersID);
+CREATE INDEX IF NOT EXISTS idx_employed_team ON Employed (TeamID);
+CREATE INDEX IF NOT EXISTS idx_employment_dates ON Employment (StartDate, EndDate);
+CREATE INDEX IF NOT EXISTS idx_seasonal_match_season ON SeasonalMatch (LeagueID, SeasonNo, SeasonYear);
+CREATE INDEX IF NOT EXISTS idx_referee_match_attendance_referee ON RefereeMatchAttendance (RefereeID);
+CREATE INDEX IF NOT EXISTS idx_injury_player_date ON Injury (PlayerID, InjuryDate);
+CREATE INDEX IF NOT EXISTS idx_offer_player_until ON Offer (RequestedPlayer, AvailableUntil);
+CREATE INDEX IF NOT EXISTS idx_training_attendance_player ON TrainingAttendance (PlayerID);
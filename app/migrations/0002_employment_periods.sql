@@ -0,0 +1,347 @@
+-- employment intervals as tsrange on Employed, for "team at time T" lookups
+-- (see the "Employment periods" section of init.sql). Fails if an employee already
+-- has overlapping contracts; end or fix those first:
+--   SELECT a.UsersID, a.EmploymentID, b.EmploymentID
+--   FROM AllEmploymentInfo a JOIN AllEmploymentInfo b
+--     ON a.UsersID = b.UsersID AND a.EmploymentID < b.EmploymentID
+--    AND a.StartDate < b.EndDate AND b.StartDate < a.EndDate;
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+
+-- ===== Employment periods =====
+-- Employed.Period mirrors [StartDate, EndDate) of its Employment row so that
+-- "which team was this player on at time T" is a GiST lookup (Period @> T), and
+-- overlapping contracts for the same employee are rejected by
+-- employed_no_overlapping_contracts. The bound is half-open so a contract ended at
+-- NOW() and one started at NOW() (transfers, coach moves) do not overlap.
+-- A contract ended before it started becomes an empty range.
+CREATE OR REPLACE FUNCTION employment_period(p_start TIMESTAMP, p_end TIMESTAMP)
+RETURNS TSRANGE AS $$
+    SELECT tsrange(p_start, GREATEST(p_start, p_end), '[)');
+$$ LANGUAGE sql IMMUTABLE;
+
+ALTER TABLE Employed ADD COLUMN Period TSRANGE;
+
+UPDATE Employed em
+SET Period = employment_period(e.StartDate, e.EndDate)
+FROM Employment e
+WHERE e.EmploymentID = em.EmploymentID;
+
+ALTER TABLE Employed ALTER COLUMN Period SET NOT NULL;
+ALTER TABLE Employed
+  ADD CONSTRAINT employed_no_overlapping_contracts EXCLUDE USING gist (UsersID WITH =, Period WITH &&);
+CREATE INDEX idx_employed_team_period ON Employed USING gist (TeamID, Period);
+
+CREATE OR REPLACE FUNCTION set_employed_period()
+RETURNS TRIGGER AS $$
+BEGIN
+    SELECT employment_period(e.StartDate, e.EndDate)
+    INTO NEW.Period
+    FROM Employment e
+    WHERE e.EmploymentID = NEW.EmploymentID;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_employed_period
+BEFORE INSERT OR UPDATE OF EmploymentID ON Employed
+FOR EACH ROW
+EXECUTE FUNCTION set_employed_period();
+
+CREATE OR REPLACE FUNCTION sync_employed_period()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE Employed
+    SET Period = employment_period(NEW.StartDate, NEW.EndDate)
+    WHERE EmploymentID = NEW.EmploymentID;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_employment_period_sync
+AFTER UPDATE OF StartDate, EndDate ON Employment
+FOR EACH ROW
+EXECUTE FUNCTION sync_employed_period();
+
+-- team of one employee at a point in time (NULL when not employed then)
+CREATE OR REPLACE FUNCTION team_at(p_user INT, p_at TIMESTAMP)
+RETURNS INT AS $$
+    SELECT TeamID
+    FROM Employed
+    WHERE UsersID = p_user
+      AND Period @> p_at;
+$$ LANGUAGE sql STABLE;
+
+-- bulk version: one row per (user, time) pair given as parallel arrays, in input order
+CREATE OR REPLACE FUNCTION teams_at(p_users INT[], p_times TIMESTAMP[])
+RETURNS TABLE (Ord BIGINT, UsersID INT, AtTime TIMESTAMP, TeamID INT) AS $$
+    SELECT q.Ord, q.UsersID, q.AtTime, em.TeamID
+    FROM unnest(p_users, p_times) WITH ORDINALITY AS q (UsersID, AtTime, Ord)
+    LEFT JOIN Employed em ON em.UsersID = q.UsersID
+                         AND em.Period @> q.AtTime
+    ORDER BY q.Ord;
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE VIEW AllEmploymentInfo AS
+SELECT
+  em.EmploymentID,
+  em.UsersID,
+  em.TeamID,
+  e.StartDate,
+  e.EndDate,
+  e.Salary,
+  t.TeamName,
+  t.OwnerID,
+  t.EstablishedDate,
+  t.HomeVenue,
+  em.Period
+FROM Employed em
+JOIN Employment e ON e.EmploymentID = em.EmploymentID
+JOIN Team t ON t.TeamID = em.TeamID
+JOIN Employee emp ON emp.UsersID = em.UsersID;
+
+-- contracts that have not ended yet (current or signed for later), latest first
+CREATE OR REPLACE VIEW CurrentEmployment AS (
+  SELECT DISTINCT ON (UsersID) 
+   *
+  FROM AllEmploymentInfo
+  WHERE Period && tsrange(LOCALTIMESTAMP, NULL)
+  ORDER BY UsersID, StartDate DESC
+);
+
+-- team-at-match-time lookups now go through Employed.Period
+
+CREATE OR REPLACE FUNCTION auto_create_plays_on_match_insert()
+RETURNS TRIGGER AS $$
+DECLARE
+    home_team_id INT;
+    away_team_id INT;
+    match_time TIMESTAMP;
+BEGIN
+    home_team_id := NEW.HomeTeamID;
+    away_team_id := NEW.AwayTeamID;
+    match_time := NEW.MatchStartDatetime;
+
+    -- Insert Play rows for all active players from both teams
+    WITH active_players AS (
+        SELECT em.UsersID AS player_id
+        FROM Employed em
+        JOIN Player p ON p.UsersID = em.UsersID
+        WHERE em.TeamID IN (home_team_id, away_team_id)
+          AND em.Period @> match_time
+          -- NOTE: Skipping IsEligible check for now (see TODO in create_tournament_with_bracket)
+    ),
+    to_insert AS (
+        SELECT NEW.MatchID AS match_id, ap.player_id
+        FROM active_players ap
+        WHERE NOT EXISTS (
+            SELECT 1 FROM Play pl
+            WHERE pl.MatchID = NEW.MatchID AND pl.PlayerID = ap.player_id
+        )
+    )
+    INSERT INTO Play (MatchID, PlayerID)
+    SELECT match_id, player_id FROM to_insert;
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION update_all_after_play_insertion()
+RETURNS TRIGGER AS $$
+DECLARE
+    player_team_id INT;
+    match_time TIMESTAMP;
+BEGIN
+    IF NEW.StartTime IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    SELECT MatchStartDatetime INTO match_time
+    FROM Match
+    WHERE MatchID = NEW.MatchID;
+
+    IF match_time IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    player_team_id := team_at(NEW.PlayerID, match_time);
+
+    IF player_team_id IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    UPDATE Match
+    SET HomeTeamScore = COALESCE(HomeTeamScore, 0) +
+                        CASE WHEN HomeTeamID = player_team_id THEN COALESCE(NEW.GoalsScored, 0) ELSE 0 END,
+        AwayTeamScore = COALESCE(AwayTeamScore, 0) +
+                        CASE WHEN AwayTeamID = player_team_id THEN COALESCE(NEW.GoalsScored, 0) ELSE 0 END
+    WHERE MatchID = NEW.MatchID;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION update_all_after_play_update()
+RETURNS TRIGGER AS $$
+DECLARE
+    player_team_id INT;
+    match_time TIMESTAMP;
+    goal_delta INT;
+BEGIN
+    IF NEW.StartTime IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    goal_delta := COALESCE(NEW.GoalsScored, 0) - COALESCE(OLD.GoalsScored, 0);
+    IF goal_delta = 0 THEN
+        RETURN NULL;
+    END IF;
+
+    SELECT MatchStartDatetime INTO match_time
+    FROM Match
+    WHERE MatchID = NEW.MatchID;
+
+    IF match_time IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    player_team_id := team_at(NEW.PlayerID, match_time);
+
+    IF player_team_id IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    UPDATE Match
+    SET HomeTeamScore = COALESCE(HomeTeamScore, 0) +
+                        CASE WHEN HomeTeamID = player_team_id THEN goal_delta ELSE 0 END,
+        AwayTeamScore = COALESCE(AwayTeamScore, 0) +
+                        CASE WHEN AwayTeamID = player_team_id THEN goal_delta ELSE 0 END
+    WHERE MatchID = NEW.MatchID;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION update_match_winner()
+RETURNS TRIGGER AS $$
+DECLARE
+    total_home_penalties INT := 0;
+    total_away_penalties INT := 0;
+BEGIN
+    IF NEW.HomeTeamScore IS NULL OR NEW.AwayTeamScore IS NULL THEN
+        NEW.WinnerTeam := NULL;
+        RETURN NEW;
+    END IF;
+
+    -- 2. Decide Winner based on main scores
+    IF NEW.HomeTeamScore > NEW.AwayTeamScore THEN
+        NEW.WinnerTeam := NEW.HomeTeamName;
+    ELSIF NEW.AwayTeamScore > NEW.HomeTeamScore THEN
+        NEW.WinnerTeam := NEW.AwayTeamName;
+    ELSE
+        -- 3. It's a TIE: Culmination of penalty scores logic
+        
+        -- Calculate total penalties for the Home Team
+        SELECT COALESCE(SUM(COALESCE(P.PenaltiesScored, 0)), 0)
+        INTO total_home_penalties
+        FROM Play P
+        JOIN Employed AE ON P.PlayerID = AE.UsersID
+        WHERE P.MatchID = NEW.MatchID 
+          AND AE.TeamID = NEW.HomeTeamID
+          AND AE.Period @> NEW.matchstartdatetime;
+
+        -- Calculate total penalties for the Away Team
+        SELECT COALESCE(SUM(COALESCE(P.PenaltiesScored, 0)), 0)
+        INTO total_away_penalties
+        FROM Play P
+        JOIN Employed AE ON P.PlayerID = AE.UsersID
+        WHERE P.MatchID = NEW.MatchID
+          AND AE.TeamID = NEW.AwayTeamID
+          AND AE.Period @> NEW.matchstartdatetime;
+
+        -- Decide winner based on penalties
+        IF COALESCE(total_home_penalties, 0) > COALESCE(total_away_penalties, 0) THEN
+            NEW.WinnerTeam := NEW.HomeTeamName;
+        ELSIF COALESCE(total_away_penalties, 0) > COALESCE(total_home_penalties, 0) THEN
+            NEW.WinnerTeam := NEW.AwayTeamName;
+        ELSE
+            -- Still a tie after penalties
+            NEW.WinnerTeam := NULL;
+        END IF;
+    END IF;
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION recalc_matches_after_play_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+    WITH deltas AS (
+        SELECT np.MatchID, np.PlayerID, COALESCE(np.GoalsScored, 0) AS Goals
+        FROM new_plays np
+        WHERE np.StartTime IS NOT NULL
+    ),
+    per_match AS (
+        SELECT
+            m.MatchID,
+            SUM(CASE WHEN team.TeamID = m.HomeTeamID THEN d.Goals ELSE 0 END) AS HomeDelta,
+            SUM(CASE WHEN team.TeamID = m.AwayTeamID THEN d.Goals ELSE 0 END) AS AwayDelta
+        FROM deltas d
+        JOIN Match m ON m.MatchID = d.MatchID
+        JOIN Employed team ON team.UsersID = d.PlayerID
+                          AND team.Period @> m.MatchStartDatetime
+        GROUP BY m.MatchID
+    ),
+    affected AS (
+        SELECT DISTINCT MatchID FROM new_plays
+    )
+    UPDATE Match m
+    SET HomeTeamScore = CASE WHEN pm.MatchID IS NULL THEN m.HomeTeamScore
+                             ELSE COALESCE(m.HomeTeamScore, 0) + pm.HomeDelta END,
+        AwayTeamScore = CASE WHEN pm.MatchID IS NULL THEN m.AwayTeamScore
+                             ELSE COALESCE(m.AwayTeamScore, 0) + pm.AwayDelta END
+    FROM affected a
+    LEFT JOIN per_match pm ON pm.MatchID = a.MatchID
+    WHERE m.MatchID = a.MatchID;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION recalc_matches_after_play_update()
+RETURNS TRIGGER AS $$
+BEGIN
+    WITH deltas AS (
+        SELECT np.MatchID, np.PlayerID,
+               COALESCE(np.GoalsScored, 0) - COALESCE(op.GoalsScored, 0) AS Goals
+        FROM new_plays np
+        JOIN old_plays op ON op.PlayID = np.PlayID
+        WHERE np.StartTime IS NOT NULL
+          AND COALESCE(np.GoalsScored, 0) <> COALESCE(op.GoalsScored, 0)
+    ),
+    per_match AS (
+        SELECT
+            m.MatchID,
+            SUM(CASE WHEN team.TeamID = m.HomeTeamID THEN d.Goals ELSE 0 END) AS HomeDelta,
+            SUM(CASE WHEN team.TeamID = m.AwayTeamID THEN d.Goals ELSE 0 END) AS AwayDelta
+        FROM deltas d
+        JOIN Match m ON m.MatchID = d.MatchID
+        JOIN Employed team ON team.UsersID = d.PlayerID
+                          AND team.Period @> m.MatchStartDatetime
+        GROUP BY m.MatchID
+    ),
+    affected AS (
+        SELECT MatchID FROM new_plays
+        UNION
+        SELECT MatchID FROM old_plays
+    )
+    UPDATE Match m
+    SET HomeTeamScore = CASE WHEN pm.MatchID IS NULL THEN m.HomeTeamScore
+                             ELSE COALESCE(m.HomeTeamScore, 0) + pm.HomeDelta END,
+        AwayTeamScore = CASE WHEN pm.MatchID IS NULL THEN m.AwayTeamScore
+                             ELSE COALESCE(m.AwayTeamScore, 0) + pm.AwayDelta END
+    FROM affected a
+    LEFT JOIN per_match pm ON pm.MatchID = a.MatchID
+    WHERE m.MatchID = a.MatchID;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
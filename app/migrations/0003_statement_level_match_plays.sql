@@ -0,0 +1,28 @@
+-- seed Play rows once per INSERT INTO Match statement instead of once per match row
+-- (bulk fixture generation inserts a whole season at once)
+DROP TRIGGER IF EXISTS trg_auto_create_plays_on_match_insert ON Match;
+
+CREATE OR REPLACE FUNCTION auto_create_plays_on_match_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO Play (MatchID, PlayerID)
+    SELECT nm.MatchID, em.UsersID
+    FROM new_matches nm
+    JOIN Employed em ON em.TeamID IN (nm.HomeTeamID, nm.AwayTeamID)
+                    AND em.Period @> nm.MatchStartDatetime
+    JOIN Player p ON p.UsersID = em.UsersID
+    -- NOTE: Skipping IsEligible check for now (see TODO in create_tournament_with_bracket)
+    WHERE NOT EXISTS (
+        SELECT 1 FROM Play pl
+        WHERE pl.MatchID = nm.MatchID AND pl.PlayerID = em.UsersID
+    );
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_auto_create_plays_on_match_insert
+AFTER INSERT ON Match
+REFERENCING NEW TABLE AS new_matches
+FOR EACH STATEMENT
+EXECUTE FUNCTION auto_create_plays_on_match_insert();
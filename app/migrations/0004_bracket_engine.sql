@@ -0,0 +1,62 @@
+-- bracket advancement moves from the fill_parent_match trigger to app/bracket.py,
+-- which also caches each bracket per process, keyed on Tournament.BracketVersion
+ALTER TABLE Tournament ADD COLUMN IF NOT EXISTS BracketVersion INT NOT NULL DEFAULT 0;
+
+DROP TRIGGER IF EXISTS trg_fill_parent_match ON Match;
+DROP FUNCTION IF EXISTS fill_parent_match();
+
+DROP TRIGGER IF EXISTS trg_bracket_version_match ON Match;
+DROP TRIGGER IF EXISTS trg_bracket_version_round_update ON Round;
+DROP TRIGGER IF EXISTS trg_bracket_version_round_delete ON Round;
+
+CREATE OR REPLACE FUNCTION bump_bracket_version_from_match()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE Tournament t
+    SET BracketVersion = t.BracketVersion + 1
+    FROM (
+        SELECT DISTINCT r.TournamentID
+        FROM new_matches nm
+        JOIN old_matches om ON om.MatchID = nm.MatchID
+        JOIN Round r ON r.T_MatchID = nm.MatchID
+        WHERE (nm.HomeTeamName, nm.AwayTeamName, nm.HomeTeamScore, nm.AwayTeamScore,
+               nm.WinnerTeam, nm.IsLocked, nm.MatchStartDatetime)
+              IS DISTINCT FROM
+              (om.HomeTeamName, om.AwayTeamName, om.HomeTeamScore, om.AwayTeamScore,
+               om.WinnerTeam, om.IsLocked, om.MatchStartDatetime)
+    ) changed
+    WHERE t.TournamentID = changed.TournamentID;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_bracket_version_match
+AFTER UPDATE ON Match
+REFERENCING OLD TABLE AS old_matches NEW TABLE AS new_matches
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_bracket_version_from_match();
+
+-- Round rows only change when a match is attached (build, advancement) or removed
+CREATE OR REPLACE FUNCTION bump_bracket_version_from_round()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE Tournament t
+    SET BracketVersion = t.BracketVersion + 1
+    WHERE t.TournamentID IN (SELECT TournamentID FROM changed_rounds);
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_bracket_version_round_update
+AFTER UPDATE ON Round
+REFERENCING NEW TABLE AS changed_rounds
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_bracket_version_from_round();
+
+CREATE TRIGGER trg_bracket_version_round_delete
+AFTER DELETE ON Round
+REFERENCING OLD TABLE AS changed_rounds
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_bracket_version_from_round();
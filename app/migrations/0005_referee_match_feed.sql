@@ -0,0 +1,54 @@
+-- RefereeMatchView becomes a UNION ALL with CompetitionType/CompetitionID columns
+-- (the column list changes, so it has to be dropped first) and the referee feed pages
+-- on (MatchStartDatetime, MatchID)
+DROP VIEW IF EXISTS RefereeMatchView;
+
+-- one row per (match, assigned referee). CompetitionType/CompetitionID let callers
+-- filter with = ANY(...) on ids; no ORDER BY here, callers page on
+-- (MatchStartDatetime, MatchID). The branches never overlap, hence UNION ALL.
+CREATE OR REPLACE VIEW RefereeMatchView AS
+SELECT
+  m.MatchID,
+  m.HomeTeamID,
+  m.AwayTeamID,
+  m.HomeTeamName,
+  m.AwayTeamName,
+  m.hometeamscore,
+  m.awayteamscore,
+  m.winnerteam,
+  m.MatchStartDatetime,
+  l.Name AS CompetitionName,
+  rma.RefereeID,
+  TRUE AS IsLeague,
+  m.IsLocked,
+  'league'::VARCHAR(10) AS CompetitionType,
+  sm.LeagueID AS CompetitionID
+FROM RefereeMatchAttendance rma
+JOIN Match m ON m.MatchID = rma.MatchID
+JOIN SeasonalMatch sm ON sm.MatchID = m.MatchID
+JOIN League l ON l.LeagueID = sm.LeagueID
+
+UNION ALL
+
+SELECT
+  m.MatchID,
+  m.HomeTeamID,
+  m.AwayTeamID,
+  m.HomeTeamName,
+  m.AwayTeamName,
+  m.hometeamscore,
+  m.awayteamscore,
+  m.winnerteam,
+  m.MatchStartDatetime,
+  t.Name AS CompetitionName,
+  rma.RefereeID,
+  FALSE AS IsLeague,
+  m.IsLocked,
+  'tournament'::VARCHAR(10) AS CompetitionType,
+  r.TournamentID AS CompetitionID
+FROM RefereeMatchAttendance rma
+JOIN Match m ON m.MatchID = rma.MatchID
+JOIN Round r ON r.T_MatchID = m.MatchID
+JOIN Tournament t ON t.TournamentID = r.TournamentID;
+
+CREATE INDEX IF NOT EXISTS idx_match_start ON Match (MatchStartDatetime, MatchID);
@@ -0,0 +1,202 @@
+-- one row per match with its competition resolved, for the admin match lists; kept
+-- in sync with Match / SeasonalMatch / TournamentMatch / Round / League / Tournament
+-- by the trg_match_catalog_* triggers (see sync_match_catalog)
+CREATE TABLE MatchCatalog (
+  MatchID INT,
+  CompetitionType VARCHAR(10) NOT NULL,  -- 'league', 'tournament' or 'unknown'
+  CompetitionID INT,
+  CompetitionName VARCHAR(255),
+  LeagueID INT,
+  SeasonNo INT,
+  SeasonYear DATE,
+  TournamentID INT,
+  RoundNo INT,
+  HomeTeamID INT NOT NULL,
+  AwayTeamID INT NOT NULL,
+  HomeTeamName VARCHAR(100) NOT NULL,
+  AwayTeamName VARCHAR(100) NOT NULL,
+  HomeTeamScore INT,
+  AwayTeamScore INT,
+  WinnerTeam VARCHAR(100),
+  IsLocked BOOLEAN NOT NULL,
+  MatchStartDatetime TIMESTAMP NOT NULL,
+  MatchEndDatetime TIMESTAMP,
+  PRIMARY KEY (MatchID),
+  FOREIGN KEY (MatchID) REFERENCES Match(MatchID) ON DELETE CASCADE
+);
+
+-- one covering index per admin filter (season, league, tournament), newest first
+CREATE INDEX idx_match_catalog_season ON MatchCatalog (LeagueID, SeasonNo, SeasonYear, MatchStartDatetime DESC, MatchID DESC)
+  INCLUDE (HomeTeamName, AwayTeamName, HomeTeamScore, AwayTeamScore, IsLocked, CompetitionName);
+CREATE INDEX idx_match_catalog_tournament ON MatchCatalog (TournamentID, MatchStartDatetime DESC, MatchID DESC)
+  INCLUDE (HomeTeamName, AwayTeamName, HomeTeamScore, AwayTeamScore, IsLocked, CompetitionName);
+CREATE INDEX idx_match_catalog_start ON MatchCatalog (MatchStartDatetime DESC, MatchID DESC);
+
+
+-- ===== Match catalog =====
+-- MatchCatalog mirrors each Match with its league season or tournament round already
+-- joined in. sync_match_catalog() rebuilds the rows of the given matches from the base
+-- tables; the triggers below call it whenever a match or one of its links changes.
+CREATE OR REPLACE FUNCTION sync_match_catalog(p_match_ids INT[])
+RETURNS VOID AS $$
+BEGIN
+    DELETE FROM MatchCatalog mc
+    WHERE mc.MatchID = ANY(p_match_ids)
+      AND NOT EXISTS (SELECT 1 FROM Match m WHERE m.MatchID = mc.MatchID);
+
+    INSERT INTO MatchCatalog (
+        MatchID, CompetitionType, CompetitionID, CompetitionName,
+        LeagueID, SeasonNo, SeasonYear, TournamentID, RoundNo,
+        HomeTeamID, AwayTeamID, HomeTeamName, AwayTeamName,
+        HomeTeamScore, AwayTeamScore, WinnerTeam, IsLocked,
+        MatchStartDatetime, MatchEndDatetime
+    )
+    SELECT m.MatchID,
+           CASE
+               WHEN tm.MatchID IS NOT NULL THEN 'tournament'
+               WHEN sm.MatchID IS NOT NULL THEN 'league'
+               ELSE 'unknown'
+           END,
+           CASE WHEN tm.MatchID IS NOT NULL THEN r.TournamentID ELSE sm.LeagueID END,
+           CASE WHEN tm.MatchID IS NOT NULL THEN t.Name ELSE l.Name END,
+           sm.LeagueID, sm.SeasonNo, sm.SeasonYear, r.TournamentID, r.RoundNo,
+           m.HomeTeamID, m.AwayTeamID, m.HomeTeamName, m.AwayTeamName,
+           m.HomeTeamScore, m.AwayTeamScore, m.WinnerTeam, m.IsLocked,
+           m.MatchStartDatetime, m.MatchEndDatetime
+    FROM Match m
+    LEFT JOIN SeasonalMatch sm ON sm.MatchID = m.MatchID
+    LEFT JOIN League l ON l.LeagueID = sm.LeagueID
+    LEFT JOIN TournamentMatch tm ON tm.MatchID = m.MatchID
+    LEFT JOIN Round r ON r.T_MatchID = m.MatchID
+    LEFT JOIN Tournament t ON t.TournamentID = r.TournamentID
+    WHERE m.MatchID = ANY(p_match_ids)
+    ON CONFLICT (MatchID) DO UPDATE
+    SET CompetitionType = EXCLUDED.CompetitionType,
+        CompetitionID = EXCLUDED.CompetitionID,
+        CompetitionName = EXCLUDED.CompetitionName,
+        LeagueID = EXCLUDED.LeagueID,
+        SeasonNo = EXCLUDED.SeasonNo,
+        SeasonYear = EXCLUDED.SeasonYear,
+        TournamentID = EXCLUDED.TournamentID,
+        RoundNo = EXCLUDED.RoundNo,
+        HomeTeamID = EXCLUDED.HomeTeamID,
+        AwayTeamID = EXCLUDED.AwayTeamID,
+        HomeTeamName = EXCLUDED.HomeTeamName,
+        AwayTeamName = EXCLUDED.AwayTeamName,
+        HomeTeamScore = EXCLUDED.HomeTeamScore,
+        AwayTeamScore = EXCLUDED.AwayTeamScore,
+        WinnerTeam = EXCLUDED.WinnerTeam,
+        IsLocked = EXCLUDED.IsLocked,
+        MatchStartDatetime = EXCLUDED.MatchStartDatetime,
+        MatchEndDatetime = EXCLUDED.MatchEndDatetime;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION match_catalog_from_new_matches()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM sync_match_catalog(ARRAY(SELECT MatchID FROM new_matches));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- score, lock and schedule changes only touch Match's own columns, so no re-join
+CREATE OR REPLACE FUNCTION match_catalog_from_updated_matches()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE MatchCatalog mc
+    SET HomeTeamID = nm.HomeTeamID,
+        AwayTeamID = nm.AwayTeamID,
+        HomeTeamName = nm.HomeTeamName,
+        AwayTeamName = nm.AwayTeamName,
+        HomeTeamScore = nm.HomeTeamScore,
+        AwayTeamScore = nm.AwayTeamScore,
+        WinnerTeam = nm.WinnerTeam,
+        IsLocked = nm.IsLocked,
+        MatchStartDatetime = nm.MatchStartDatetime,
+        MatchEndDatetime = nm.MatchEndDatetime
+    FROM new_matches nm
+    WHERE mc.MatchID = nm.MatchID
+      AND (mc.HomeTeamID, mc.AwayTeamID, mc.HomeTeamName, mc.AwayTeamName, mc.HomeTeamScore,
+           mc.AwayTeamScore, mc.WinnerTeam, mc.IsLocked, mc.MatchStartDatetime, mc.MatchEndDatetime)
+          IS DISTINCT FROM
+          (nm.HomeTeamID, nm.AwayTeamID, nm.HomeTeamName, nm.AwayTeamName, nm.HomeTeamScore,
+           nm.AwayTeamScore, nm.WinnerTeam, nm.IsLocked, nm.MatchStartDatetime, nm.MatchEndDatetime);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_match_catalog_match_insert
+AFTER INSERT ON Match
+REFERENCING NEW TABLE AS new_matches
+FOR EACH STATEMENT
+EXECUTE FUNCTION match_catalog_from_new_matches();
+
+CREATE TRIGGER trg_match_catalog_match_update
+AFTER UPDATE ON Match
+REFERENCING NEW TABLE AS new_matches
+FOR EACH STATEMENT
+EXECUTE FUNCTION match_catalog_from_updated_matches();
+
+-- a match joining/leaving a season, a tournament or a round changes its competition
+CREATE OR REPLACE FUNCTION match_catalog_from_match_link()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'round' THEN
+        PERFORM sync_match_catalog(ARRAY[
+            CASE WHEN TG_OP <> 'INSERT' THEN OLD.T_MatchID END,
+            CASE WHEN TG_OP <> 'DELETE' THEN NEW.T_MatchID END
+        ]);
+    ELSE
+        PERFORM sync_match_catalog(ARRAY[
+            CASE WHEN TG_OP <> 'INSERT' THEN OLD.MatchID END,
+            CASE WHEN TG_OP <> 'DELETE' THEN NEW.MatchID END
+        ]);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_match_catalog_seasonal_match
+AFTER INSERT OR UPDATE OR DELETE ON SeasonalMatch
+FOR EACH ROW
+EXECUTE FUNCTION match_catalog_from_match_link();
+
+CREATE TRIGGER trg_match_catalog_tournament_match
+AFTER INSERT OR DELETE ON TournamentMatch
+FOR EACH ROW
+EXECUTE FUNCTION match_catalog_from_match_link();
+
+CREATE TRIGGER trg_match_catalog_round
+AFTER INSERT OR DELETE OR UPDATE OF T_MatchID, TournamentID ON Round
+FOR EACH ROW
+EXECUTE FUNCTION match_catalog_from_match_link();
+
+CREATE OR REPLACE FUNCTION match_catalog_from_competition_name()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'league' THEN
+        UPDATE MatchCatalog
+        SET CompetitionName = NEW.Name
+        WHERE CompetitionType = 'league' AND LeagueID = NEW.LeagueID;
+    ELSE
+        UPDATE MatchCatalog
+        SET CompetitionName = NEW.Name
+        WHERE CompetitionType = 'tournament' AND TournamentID = NEW.TournamentID;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_match_catalog_league_name
+AFTER UPDATE OF Name ON League
+FOR EACH ROW
+EXECUTE FUNCTION match_catalog_from_competition_name();
+
+CREATE TRIGGER trg_match_catalog_tournament_name
+AFTER UPDATE OF Name ON Tournament
+FOR EACH ROW
+EXECUTE FUNCTION match_catalog_from_competition_name();
+
+-- existing matches
+SELECT sync_match_catalog(ARRAY(SELECT MatchID FROM Match));
@@ -0,0 +1,4 @@
+-- the admin match lists page newest first on (MatchStartDatetime, MatchID); a
+-- league's list spans all of its seasons, so it needs its own index for that order
+CREATE INDEX IF NOT EXISTS idx_match_catalog_league ON MatchCatalog (LeagueID, MatchStartDatetime DESC, MatchID DESC)
+  INCLUDE (HomeTeamName, AwayTeamName, IsLocked, WinnerTeam, SeasonNo, SeasonYear);
@@ -0,0 +1,19 @@
+-- a statement that only flips Match.IsLocked (bulk lock/unlock) no longer runs
+-- update_match_winner per row; any other update still does
+DROP TRIGGER IF EXISTS match_update ON Match;
+
+CREATE TRIGGER match_update
+BEFORE UPDATE ON Match
+FOR EACH ROW
+WHEN (
+    OLD.IsLocked IS NOT DISTINCT FROM NEW.IsLocked
+    OR OLD.HomeTeamScore IS DISTINCT FROM NEW.HomeTeamScore
+    OR OLD.AwayTeamScore IS DISTINCT FROM NEW.AwayTeamScore
+    OR OLD.HomeTeamID IS DISTINCT FROM NEW.HomeTeamID
+    OR OLD.AwayTeamID IS DISTINCT FROM NEW.AwayTeamID
+    OR OLD.HomeTeamName IS DISTINCT FROM NEW.HomeTeamName
+    OR OLD.AwayTeamName IS DISTINCT FROM NEW.AwayTeamName
+    OR OLD.WinnerTeam IS DISTINCT FROM NEW.WinnerTeam
+    OR OLD.MatchStartDatetime IS DISTINCT FROM NEW.MatchStartDatetime
+)
+EXECUTE FUNCTION update_match_winner();
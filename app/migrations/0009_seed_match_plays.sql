@@ -0,0 +1,36 @@
+-- seed_match_plays(match_ids[]): the Play seeding of auto_create_plays_on_match_insert
+-- as a function over any set of matches, so a season, a date range or a bracket
+-- level can be (re)seeded in one statement; the insert trigger now calls it too
+CREATE OR REPLACE FUNCTION seed_match_plays(p_match_ids INT[], p_eligible_only BOOLEAN DEFAULT FALSE)
+RETURNS TABLE (match_id INT, inserted INT) AS $$
+BEGIN
+    RETURN QUERY
+    WITH new_plays AS (
+        INSERT INTO Play (MatchID, PlayerID)
+        SELECT m.MatchID, em.UsersID
+        FROM Match m
+        JOIN Employed em ON em.TeamID IN (m.HomeTeamID, m.AwayTeamID)
+                        AND em.Period @> m.MatchStartDatetime
+        JOIN Player p ON p.UsersID = em.UsersID
+        WHERE m.MatchID = ANY(p_match_ids)
+          AND (NOT p_eligible_only OR COALESCE(LOWER(p.IsEligible), '') = 'eligible')
+          AND NOT EXISTS (
+              SELECT 1 FROM Play pl
+              WHERE pl.MatchID = m.MatchID AND pl.PlayerID = em.UsersID
+          )
+        RETURNING Play.MatchID
+    )
+    SELECT np.MatchID, COUNT(*)::INT
+    FROM new_plays np
+    GROUP BY np.MatchID;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION auto_create_plays_on_match_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- NOTE: Skipping IsEligible check for now (see TODO in create_tournament_with_bracket)
+    PERFORM seed_match_plays(ARRAY(SELECT MatchID FROM new_matches));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,5 @@
+-- trigram name search and keyset ordering for app/player_search.py
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_users_name_trgm ON Users USING gin ((FirstName || ' ' || LastName) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_users_name ON Users (LastName, FirstName, UsersID);
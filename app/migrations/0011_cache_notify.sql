@@ -0,0 +1,65 @@
+-- change notifications for the in-process caches (app/cache_bus.py): every write to
+-- a cached table, including writes made by other triggers, sends 'table:key' on
+-- the cache_invalidation channel when its transaction commits
+CREATE OR REPLACE FUNCTION notify_cache_change()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_row JSONB;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        v_row := to_jsonb(OLD);
+    ELSE
+        v_row := to_jsonb(NEW);
+    END IF;
+    -- identical payloads are sent once per transaction, so bulk writes stay cheap
+    PERFORM pg_notify(
+        'cache_invalidation',
+        lower(TG_TABLE_NAME) || ':' || COALESCE(v_row ->> lower(TG_ARGV[0]), '')
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_cache_notify_league ON League;
+CREATE TRIGGER trg_cache_notify_league
+AFTER INSERT OR UPDATE OR DELETE ON League
+FOR EACH ROW
+EXECUTE FUNCTION notify_cache_change('LeagueID');
+
+DROP TRIGGER IF EXISTS trg_cache_notify_season ON Season;
+CREATE TRIGGER trg_cache_notify_season
+AFTER INSERT OR UPDATE OR DELETE ON Season
+FOR EACH ROW
+EXECUTE FUNCTION notify_cache_change('LeagueID');
+
+-- also fires on BracketVersion bumps, which is what bracket.py caches on
+DROP TRIGGER IF EXISTS trg_cache_notify_tournament ON Tournament;
+CREATE TRIGGER trg_cache_notify_tournament
+AFTER INSERT OR UPDATE OR DELETE ON Tournament
+FOR EACH ROW
+EXECUTE FUNCTION notify_cache_change('TournamentID');
+
+DROP TRIGGER IF EXISTS trg_cache_notify_team ON Team;
+CREATE TRIGGER trg_cache_notify_team
+AFTER INSERT OR UPDATE OR DELETE ON Team
+FOR EACH ROW
+EXECUTE FUNCTION notify_cache_change('TeamID');
+
+DROP TRIGGER IF EXISTS trg_cache_notify_users ON Users;
+CREATE TRIGGER trg_cache_notify_users
+AFTER INSERT OR DELETE OR UPDATE OF FirstName, LastName, Nationality, Role ON Users
+FOR EACH ROW
+EXECUTE FUNCTION notify_cache_change('UsersID');
+
+DROP TRIGGER IF EXISTS trg_cache_notify_player ON Player;
+CREATE TRIGGER trg_cache_notify_player
+AFTER INSERT OR DELETE OR UPDATE OF Position ON Player
+FOR EACH ROW
+EXECUTE FUNCTION notify_cache_change('UsersID');
+
+-- Employee.TeamID is moved by handle_accepted_transfer_offer as well as by the app
+DROP TRIGGER IF EXISTS trg_cache_notify_employee ON Employee;
+CREATE TRIGGER trg_cache_notify_employee
+AFTER INSERT OR DELETE OR UPDATE OF TeamID ON Employee
+FOR EACH ROW
+EXECUTE FUNCTION notify_cache_change('UsersID');
@@ -0,0 +1,169 @@
+-- per-league and per-tournament data revisions for conditional GETs (app/revision.py)
+CREATE SEQUENCE IF NOT EXISTS data_revision_seq;
+
+-- rows are never deleted, so MAX(Revision) of a scope only ever grows
+CREATE TABLE IF NOT EXISTS DataRevision (
+  Scope VARCHAR(20),
+  ScopeID INT,
+  Revision BIGINT NOT NULL,
+  PRIMARY KEY (Scope, ScopeID)
+);
+
+CREATE INDEX IF NOT EXISTS idx_data_revision_scope ON DataRevision (Scope, Revision);
+
+CREATE OR REPLACE FUNCTION bump_data_revision(p_scope TEXT, p_ids INT[])
+RETURNS VOID AS $$
+    -- ids in order, so concurrent bumps lock the rows in the same order
+    INSERT INTO DataRevision (Scope, ScopeID, Revision)
+    SELECT p_scope, ids.id, nextval('data_revision_seq')
+    FROM (SELECT DISTINCT unnest(p_ids) AS id) ids
+    WHERE ids.id IS NOT NULL
+    ORDER BY ids.id
+    ON CONFLICT (Scope, ScopeID) DO UPDATE SET Revision = EXCLUDED.Revision;
+$$ LANGUAGE sql;
+
+-- Match updates; every Play statement updates its matches, so Play changes count too
+CREATE OR REPLACE FUNCTION bump_data_revision_from_matches()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM bump_data_revision('league', ARRAY(
+        SELECT sm.LeagueID
+        FROM SeasonalMatch sm
+        WHERE sm.MatchID IN (SELECT MatchID FROM changed_rows)
+    ));
+    PERFORM bump_data_revision('tournament', ARRAY(
+        SELECT r.TournamentID
+        FROM Round r
+        WHERE r.T_MatchID IN (SELECT MatchID FROM changed_rows)
+    ));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- any table with a LeagueID column (SeasonalMatch, PlayerSeasonStatsMat)
+CREATE OR REPLACE FUNCTION bump_data_revision_from_leagues()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM bump_data_revision('league', ARRAY(SELECT LeagueID FROM changed_rows));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- any table with a TournamentID column (Round, PlayerTournamentStatsMat)
+CREATE OR REPLACE FUNCTION bump_data_revision_from_tournaments()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM bump_data_revision('tournament', ARRAY(SELECT TournamentID FROM changed_rows));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- single rows of League, Season, Tournament and TournamentModeration:
+-- TG_ARGV[0] is the scope, TG_ARGV[1] the column holding its id
+CREATE OR REPLACE FUNCTION bump_data_revision_row()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_row JSONB;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        v_row := to_jsonb(OLD);
+    ELSE
+        v_row := to_jsonb(NEW);
+    END IF;
+    PERFORM bump_data_revision(TG_ARGV[0], ARRAY[(v_row ->> lower(TG_ARGV[1]))::INT]);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_data_revision_match ON Match;
+CREATE TRIGGER trg_data_revision_match
+AFTER UPDATE ON Match
+REFERENCING NEW TABLE AS changed_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_data_revision_from_matches();
+
+DROP TRIGGER IF EXISTS trg_data_revision_seasonal_match_insert ON SeasonalMatch;
+CREATE TRIGGER trg_data_revision_seasonal_match_insert
+AFTER INSERT ON SeasonalMatch
+REFERENCING NEW TABLE AS changed_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_data_revision_from_leagues();
+
+DROP TRIGGER IF EXISTS trg_data_revision_seasonal_match_delete ON SeasonalMatch;
+CREATE TRIGGER trg_data_revision_seasonal_match_delete
+AFTER DELETE ON SeasonalMatch
+REFERENCING OLD TABLE AS changed_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_data_revision_from_leagues();
+
+DROP TRIGGER IF EXISTS trg_data_revision_round_update ON Round;
+CREATE TRIGGER trg_data_revision_round_update
+AFTER UPDATE ON Round
+REFERENCING NEW TABLE AS changed_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_data_revision_from_tournaments();
+
+DROP TRIGGER IF EXISTS trg_data_revision_round_delete ON Round;
+CREATE TRIGGER trg_data_revision_round_delete
+AFTER DELETE ON Round
+REFERENCING OLD TABLE AS changed_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_data_revision_from_tournaments();
+
+-- refresh_player_stats() replaces a player's rows with a DELETE and an INSERT
+DROP TRIGGER IF EXISTS trg_data_revision_season_stats_insert ON PlayerSeasonStatsMat;
+CREATE TRIGGER trg_data_revision_season_stats_insert
+AFTER INSERT ON PlayerSeasonStatsMat
+REFERENCING NEW TABLE AS changed_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_data_revision_from_leagues();
+
+DROP TRIGGER IF EXISTS trg_data_revision_season_stats_delete ON PlayerSeasonStatsMat;
+CREATE TRIGGER trg_data_revision_season_stats_delete
+AFTER DELETE ON PlayerSeasonStatsMat
+REFERENCING OLD TABLE AS changed_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_data_revision_from_leagues();
+
+DROP TRIGGER IF EXISTS trg_data_revision_tournament_stats_insert ON PlayerTournamentStatsMat;
+CREATE TRIGGER trg_data_revision_tournament_stats_insert
+AFTER INSERT ON PlayerTournamentStatsMat
+REFERENCING NEW TABLE AS changed_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_data_revision_from_tournaments();
+
+DROP TRIGGER IF EXISTS trg_data_revision_tournament_stats_delete ON PlayerTournamentStatsMat;
+CREATE TRIGGER trg_data_revision_tournament_stats_delete
+AFTER DELETE ON PlayerTournamentStatsMat
+REFERENCING OLD TABLE AS changed_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_data_revision_from_tournaments();
+
+DROP TRIGGER IF EXISTS trg_data_revision_league ON League;
+CREATE TRIGGER trg_data_revision_league
+AFTER INSERT OR DELETE OR UPDATE OF Name ON League
+FOR EACH ROW
+EXECUTE FUNCTION bump_data_revision_row('league', 'LeagueID');
+
+DROP TRIGGER IF EXISTS trg_data_revision_season ON Season;
+CREATE TRIGGER trg_data_revision_season
+AFTER INSERT OR UPDATE OR DELETE ON Season
+FOR EACH ROW
+EXECUTE FUNCTION bump_data_revision_row('league', 'LeagueID');
+
+DROP TRIGGER IF EXISTS trg_data_revision_tournament ON Tournament;
+CREATE TRIGGER trg_data_revision_tournament
+AFTER INSERT OR DELETE OR UPDATE OF Name, Size ON Tournament
+FOR EACH ROW
+EXECUTE FUNCTION bump_data_revision_row('tournament', 'TournamentID');
+
+-- an admin's tournament list depends on who moderates what
+DROP TRIGGER IF EXISTS trg_data_revision_tournament_moderation ON TournamentModeration;
+CREATE TRIGGER trg_data_revision_tournament_moderation
+AFTER INSERT OR UPDATE OR DELETE ON TournamentModeration
+FOR EACH ROW
+EXECUTE FUNCTION bump_data_revision_row('tournament', 'T_ID');
+
+-- start every existing league and tournament at a revision
+SELECT bump_data_revision('league', ARRAY(SELECT LeagueID FROM League));
+SELECT bump_data_revision('tournament', ARRAY(SELECT TournamentID FROM Tournament));
@@ -0,0 +1,34 @@
+-- BracketVersion moves on every score, winner, lock or kickoff change of a bracket
+-- match, so trg_cache_notify_tournament only fires on the columns the dropdown
+-- caches read; BracketVersion bumps are sent as 'bracket:<id>', which only
+-- bracket.py listens to
+CREATE OR REPLACE FUNCTION notify_cache_change()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_row JSONB;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        v_row := to_jsonb(OLD);
+    ELSE
+        v_row := to_jsonb(NEW);
+    END IF;
+    -- identical payloads are sent once per transaction, so bulk writes stay cheap
+    PERFORM pg_notify(
+        'cache_invalidation',
+        COALESCE(TG_ARGV[1], lower(TG_TABLE_NAME)) || ':' || COALESCE(v_row ->> lower(TG_ARGV[0]), '')
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_cache_notify_tournament ON Tournament;
+CREATE TRIGGER trg_cache_notify_tournament
+AFTER INSERT OR DELETE OR UPDATE OF Name, Size ON Tournament
+FOR EACH ROW
+EXECUTE FUNCTION notify_cache_change('TournamentID');
+
+DROP TRIGGER IF EXISTS trg_cache_notify_bracket ON Tournament;
+CREATE TRIGGER trg_cache_notify_bracket
+AFTER UPDATE OF BracketVersion ON Tournament
+FOR EACH ROW
+EXECUTE FUNCTION notify_cache_change('TournamentID', 'bracket');
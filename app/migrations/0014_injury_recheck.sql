@@ -0,0 +1,27 @@
+-- injuries edited or removed after a sweep (e.g. a RecoveryDate moved back to a day
+-- that was already swept) are queued here, so the next expired-injury sweep checks
+-- those players again instead of waiting for a full sweep
+CREATE TABLE IF NOT EXISTS InjuryRecheck (
+  PlayerID INT,
+  QueuedAt TIMESTAMP NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (PlayerID)
+);
+
+CREATE OR REPLACE FUNCTION enqueue_injury_recheck()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO InjuryRecheck (PlayerID) VALUES (OLD.PlayerID)
+    ON CONFLICT (PlayerID) DO NOTHING;
+    IF TG_OP = 'UPDATE' AND NEW.PlayerID IS DISTINCT FROM OLD.PlayerID THEN
+        INSERT INTO InjuryRecheck (PlayerID) VALUES (NEW.PlayerID)
+        ON CONFLICT (PlayerID) DO NOTHING;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_injury_recheck ON Injury;
+CREATE TRIGGER trg_injury_recheck
+AFTER DELETE OR UPDATE OF PlayerID, InjuryDate, RecoveryDate ON Injury
+FOR EACH ROW
+EXECUTE FUNCTION enqueue_injury_recheck();
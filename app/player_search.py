@@ -0,0 +1,243 @@
+# player search for the transfer market and the player filters
+#
+# Names are matched on FirstName || ' ' || LastName through a pg_trgm GIN index
+# (idx_users_name_trgm), so both substring (ILIKE) and fuzzy (word similarity)
+# matches are index scans instead of a pass over every user. Results are ranked
+# by word similarity and paged with a keyset cursor on (rank, last name, first
+# name, id), never OFFSET. A player's current contract comes from one lookup on
+# Employed's (UsersID, Period) GiST index per candidate instead of the
+# CurrentEmployment view, which sorts all employment on every use.
+#
+# Facet counts (nationality, position, team, age band) for the whole result are
+# computed in a single GROUPING SETS pass on the first page.
+import base64
+import json
+import re
+from datetime import date
+from decimal import Decimal
+
+from psycopg2.extras import RealDictCursor
+
+from db import get_connection
+
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# (label, youngest, oldest) in whole years; None is open-ended
+AGE_BANDS = (
+    ("Under 21", None, 20),
+    ("21-25", 21, 25),
+    ("26-29", 26, 29),
+    ("30+", 30, None),
+)
+
+NAME_SQL = "(u.FirstName || ' ' || u.LastName)"
+AGE_SQL = "date_part('year', age(LOCALTIMESTAMP, u.BirthDate))"
+
+
+def _years_ago(years):
+    today = date.today()
+    try:
+        return today.replace(year=today.year - years)
+    except ValueError:  # 29 February
+        return today.replace(year=today.year - years, day=28)
+
+
+def _like_pattern(text):
+    return "%" + re.sub(r"([\\%_])", r"\\\1", text) + "%"
+
+
+def encode_cursor(row):
+    return base64.urlsafe_b64encode(
+        json.dumps([str(row["rank"]), row["lastname"], row["firstname"], row["usersid"]]).encode()
+    ).decode()
+
+
+def decode_cursor(raw):
+    """The (rank, lastname, firstname, usersid) a page ended on; None if raw is empty. Raises ValueError."""
+    if not raw:
+        return None
+    try:
+        rank, last_name, first_name, users_id = json.loads(base64.urlsafe_b64decode(raw.encode()))
+        return Decimal(rank), str(last_name), str(first_name), int(users_id)
+    except (TypeError, ValueError, ArithmeticError) as exc:
+        raise ValueError("Invalid search cursor.") from exc
+
+
+def _age_band_sql():
+    cases = []
+    for label, youngest, oldest in AGE_BANDS:
+        bounds = []
+        if youngest is not None:
+            bounds.append(f"{AGE_SQL} >= {int(youngest)}")
+        if oldest is not None:
+            bounds.append(f"{AGE_SQL} <= {int(oldest)}")
+        cases.append(f"WHEN {' AND '.join(bounds)} THEN '{label}'")
+    return "CASE " + " ".join(cases) + " END"
+
+
+def _candidates(filters, coach_id):
+    """
+    The candidate query (one row per matching player, with its rank) and its params.
+
+    filters: name, nationality, position, team (team id), min_age, max_age,
+    contract_expires_before (players without a contract always pass).
+    coach_id: leave out players under contract with this coach's team.
+    """
+    name = (filters.get("name") or "").strip()
+    conditions, params = [], []
+    rank_sql = "0::numeric"
+    rank_params = []
+    if name:
+        rank_sql = f"round(word_similarity(%s, {NAME_SQL})::numeric, 4)"
+        rank_params = [name]
+        # both operators are served by the trigram index
+        conditions.append(f"({NAME_SQL} ILIKE %s OR %s <%% {NAME_SQL})")
+        params.extend([_like_pattern(name), name])
+    if filters.get("nationality"):
+        conditions.append("u.Nationality = %s")
+        params.append(filters["nationality"])
+    if filters.get("position"):
+        conditions.append("p.Position = %s")
+        params.append(filters["position"])
+    if filters.get("min_age"):
+        conditions.append("u.BirthDate <= %s")
+        params.append(_years_ago(int(filters["min_age"])))
+    if filters.get("max_age"):
+        # inclusive, like the age bands: max_age 20 keeps players who are 20 today
+        conditions.append("u.BirthDate > %s")
+        params.append(_years_ago(int(filters["max_age"]) + 1))
+    if filters.get("team"):
+        conditions.append("cur.TeamID = %s")
+        params.append(int(filters["team"]))
+    if filters.get("contract_expires_before"):
+        conditions.append("(cur.EndDate IS NULL OR cur.EndDate < %s)")
+        params.append(filters["contract_expires_before"])
+    if coach_id is not None:
+        conditions.append(
+            "(cur.TeamID IS NULL OR cur.TeamID IS DISTINCT FROM (SELECT TeamID FROM Employee WHERE UsersID = %s))"
+        )
+        params.append(coach_id)
+
+    query = f"""
+        SELECT p.UsersID,
+               u.FirstName,
+               u.LastName,
+               u.Nationality,
+               u.Email,
+               u.BirthDate,
+               p.Position,
+               p.Height,
+               p.Weight,
+               p.Overall,
+               p.IsEligible,
+               cur.TeamID,
+               cur.TeamName,
+               cur.Salary,
+               cur.EndDate,
+               {_age_band_sql()} AS age_band,
+               {rank_sql} AS rank
+        FROM Player p
+        JOIN Users u ON u.UsersID = p.UsersID
+        LEFT JOIN LATERAL (
+            -- same contract CurrentEmployment picks: the latest one not over yet
+            SELECT em.TeamID, t.TeamName, emp.Salary, emp.EndDate
+            FROM Employed em
+            JOIN Employment emp ON emp.EmploymentID = em.EmploymentID
+            JOIN Team t ON t.TeamID = em.TeamID
+            WHERE em.UsersID = p.UsersID
+              AND em.Period && tsrange(LOCALTIMESTAMP, NULL)
+            ORDER BY lower(em.Period) DESC
+            LIMIT 1
+        ) cur ON TRUE
+        WHERE {" AND ".join(conditions) if conditions else "TRUE"}
+    """
+    return query, rank_params + params, bool(name)
+
+
+def _facets(cur, candidates_sql, params):
+    cur.execute(
+        f"""
+        SELECT CASE
+                   WHEN GROUPING(c.nationality) = 0 THEN 'nationality'
+                   WHEN GROUPING(c.position) = 0 THEN 'position'
+                   WHEN GROUPING(c.teamid) = 0 THEN 'team'
+                   WHEN GROUPING(c.age_band) = 0 THEN 'age_band'
+               END AS facet,
+               c.nationality,
+               c.position,
+               c.teamid,
+               c.teamname,
+               c.age_band,
+               COUNT(*) AS players
+        FROM ({candidates_sql}) c
+        GROUP BY GROUPING SETS ((c.nationality), (c.position), (c.teamid, c.teamname), (c.age_band), ())
+        ORDER BY facet, players DESC;
+        """,
+        params,
+    )
+    facets = {"nationality": [], "position": [], "team": [], "age_band": []}
+    total = 0
+    for row in cur.fetchall():
+        facet = row["facet"]
+        if facet is None:
+            total = row["players"]
+        elif facet == "team":
+            facets["team"].append({"value": row["teamid"], "label": row["teamname"] or "No team", "count": row["players"]})
+        else:
+            value = row[facet]
+            facets[facet].append({"value": value, "label": value or "Unknown", "count": row["players"]})
+    order = {label: i for i, (label, _, _) in enumerate(AGE_BANDS)}
+    facets["age_band"].sort(key=lambda f: order.get(f["value"], len(order)))
+    return facets, total
+
+
+def search_players(filters, coach_id=None, after=None, limit=PAGE_SIZE, with_facets=True):
+    """
+    One page of players matching filters (see _candidates), best name match first,
+    then by last name, first name and id.
+
+    after: decoded cursor of the previous page (decode_cursor); limit=None returns
+    every match. Facets are only computed for the first page.
+
+    Returns {'players': [...], 'next_cursor': str or None, 'facets': {facet:
+    [{'value', 'label', 'count'}]} or None, 'total': int or None}.
+    """
+    candidates_sql, params, ranked = _candidates(filters, coach_id)
+    order_sql = "c.rank DESC, c.lastname, c.firstname, c.usersid" if ranked else "c.lastname, c.firstname, c.usersid"
+    keyset_sql, keyset_params = "", []
+    if after is not None:
+        rank, last_name, first_name, users_id = after
+        if ranked:
+            keyset_sql = "WHERE (c.rank < %s OR (c.rank = %s AND (c.lastname, c.firstname, c.usersid) > (%s, %s, %s)))"
+            keyset_params = [rank, rank, last_name, first_name, users_id]
+        else:
+            keyset_sql = "WHERE (c.lastname, c.firstname, c.usersid) > (%s, %s, %s)"
+            keyset_params = [last_name, first_name, users_id]
+
+    conn = get_connection()
+    try:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(
+                f"""
+                SELECT c.*
+                FROM ({candidates_sql}) c
+                {keyset_sql}
+                ORDER BY {order_sql}
+                LIMIT %s;
+                """,
+                [*params, *keyset_params, None if limit is None else limit + 1],
+            )
+            rows = cur.fetchall()
+
+            facets, total = None, None
+            if with_facets and after is None:
+                facets, total = _facets(cur, candidates_sql, params)
+    finally:
+        conn.close()
+
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1])
+    return {"players": rows, "next_cursor": next_cursor, "facets": facets, "total": total}
@@ -0,0 +1,114 @@
+# in-process cache for small, rarely changing reference data (dropdown and filter
+# options)
+#
+# A cached helper declares the entities it reads, e.g. @cached("league"). Every
+# entity has a version counter; an entry remembers the versions it was loaded at
+# and is only served while they still match. Code that writes an entity calls
+# bump(entity), which moves the counter once the write is committed (db.on_commit),
+# so a reader can never cache the old rows under the new version.
+#
+# Writes made by other workers or by database triggers arrive through cache_bus,
+# which bumps the entities in TABLE_ENTITIES. Entries also expire after MAX_AGE, in
+# case the bus is off or missed something. Entries are kept in one LRU of
+# CACHE_SIZE; stats() reports hits, misses, evictions and invalidations.
+import functools
+import threading
+import time
+from collections import OrderedDict
+
+import cache_bus
+import db
+
+CACHE_SIZE = 256
+MAX_AGE = 5 * 60  # seconds
+
+# cache_bus table -> entities its changes invalidate
+TABLE_ENTITIES = {
+    "league": ("league",),
+    "season": ("season",),
+    "tournament": ("tournament",),
+    "team": ("team",),
+    "users": ("user",),
+    "player": ("player",),
+}
+
+_versions = {}  # entity -> version
+_entries = OrderedDict()  # (helper, args) -> (versions, loaded_at, value), least recently used first
+_stats = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0, "invalidations": 0}
+_lock = threading.Lock()
+
+
+def _snapshot(entities):
+    return tuple(_versions.get(entity, 0) for entity in entities)
+
+
+def cached(*entities, max_age=MAX_AGE):
+    """Cache a helper's result per call arguments until one of entities is bumped."""
+
+    def decorate(fn):
+        name = f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = (name, args, tuple(sorted(kwargs.items())))
+            with _lock:
+                versions = _snapshot(entities)
+                entry = _entries.get(key)
+                if entry is not None:
+                    if entry[0] == versions and time.monotonic() - entry[1] < max_age:
+                        _entries.move_to_end(key)
+                        _stats["hits"] += 1
+                        return _copy(entry[2])
+                    _stats["expired" if entry[0] == versions else "invalidations"] += 1
+                _stats["misses"] += 1
+
+            # versions were read before loading, so a bump committed meanwhile makes
+            # this entry miss next time instead of hiding the change
+            value = fn(*args, **kwargs)
+            with _lock:
+                _entries[key] = (versions, time.monotonic(), value)
+                _entries.move_to_end(key)
+                while len(_entries) > CACHE_SIZE:
+                    _entries.popitem(last=False)
+                    _stats["evictions"] += 1
+            return _copy(value)
+
+        wrapper.entities = entities
+        return wrapper
+
+    return decorate
+
+
+def _copy(value):
+    # callers get their own list; the rows themselves are shared and read-only
+    return list(value) if isinstance(value, list) else value
+
+
+def bump(*entities):
+    """Invalidate everything cached from entities, once the current write commits."""
+    db.on_commit(lambda: _bump(entities))
+
+
+def _bump(entities):
+    with _lock:
+        for entity in entities:
+            _versions[entity] = _versions.get(entity, 0) + 1
+
+
+def _on_table_change(entities, key):
+    # already committed, and any key may show up in any cached list
+    _bump(entities)
+
+
+for _table, _entities in TABLE_ENTITIES.items():
+    cache_bus.register_invalidator(_table, functools.partial(_on_table_change, _entities))
+
+
+def clear():
+    with _lock:
+        _entries.clear()
+
+
+def stats():
+    with _lock:
+        return dict(_stats, size=len(_entries), versions=dict(_versions))
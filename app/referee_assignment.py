@@ -0,0 +1,252 @@
+# bulk referee assignment for a whole league season or tournament
+#
+# plan_assignments() is pure: given the open matches of a competition, the referee
+# pool and every referee's existing assignments around those dates, it hands each
+# match the least loaded referees that are free for the whole match window. Matches
+# are taken in kickoff order and referees come off a (load, id) heap, so a 1000+ match
+# season plans in milliseconds. auto_assign() loads the inputs with three queries,
+# plans, and (unless dry_run) writes every new RefereeMatchAttendance row in one
+# INSERT. See `python -m benchmarks.referee_assignment` for timings.
+import heapq
+import time
+from bisect import bisect_right
+from datetime import timedelta
+
+from psycopg2.extras import RealDictCursor
+
+from db import get_connection
+
+REFEREES_PER_MATCH = 1
+# matches without a MatchEndDatetime are assumed to last this long
+MATCH_LENGTH = timedelta(hours=2)
+
+
+class _Calendar:
+    # one referee's busy windows as disjoint [start, end) intervals sorted by start
+
+    def __init__(self, windows=()):
+        self.starts = []
+        self.ends = []
+        for start, end in sorted(windows):
+            if self.ends and start < self.ends[-1]:
+                self.ends[-1] = max(self.ends[-1], end)
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    def is_free(self, start, end):
+        pos = bisect_right(self.starts, start)
+        if pos and self.ends[pos - 1] > start:
+            return False
+        return pos == len(self.starts) or self.starts[pos] >= end
+
+    def book(self, start, end):
+        # only called after is_free(), so the list stays disjoint
+        pos = bisect_right(self.starts, start)
+        self.starts.insert(pos, start)
+        self.ends.insert(pos, end)
+
+
+def match_window(start, end):
+    if end is None or end <= start:
+        end = start + MATCH_LENGTH
+    return start, end
+
+
+def plan_assignments(matches, referee_ids, busy, loads=None, per_match=REFEREES_PER_MATCH):
+    """
+    matches: iterable of (match_id, start, end, already_assigned)
+    referee_ids: the referee pool
+    busy: {referee_id: [(start, end), ...]} existing assignments (any competition)
+    loads: {referee_id: assignments already counted towards balancing}
+
+    Returns (assignments, unfilled): assignments is a list of (match_id, referee_id)
+    and unfilled maps match_id -> referees still missing because nobody was free.
+    """
+    loads = dict(loads or {})
+    calendars = {ref: _Calendar(busy.get(ref, ())) for ref in referee_ids}
+    heap = [(loads.get(ref, 0), ref) for ref in referee_ids]
+    heapq.heapify(heap)
+
+    assignments = []
+    unfilled = {}
+    for match_id, start, end, already_assigned in sorted(matches, key=lambda m: (m[1], m[0])):
+        need = per_match - already_assigned
+        if need <= 0:
+            continue
+        start, end = match_window(start, end)
+        chosen, skipped = [], []
+        while heap and len(chosen) < need:
+            load, ref = heapq.heappop(heap)
+            (chosen if calendars[ref].is_free(start, end) else skipped).append((load, ref))
+        for load, ref in chosen:
+            calendars[ref].book(start, end)
+            assignments.append((match_id, ref))
+            heapq.heappush(heap, (load + 1, ref))
+        for item in skipped:
+            heapq.heappush(heap, item)
+        if len(chosen) < need:
+            unfilled[match_id] = need - len(chosen)
+    return assignments, unfilled
+
+
+def _scope_filter(league_id, season_no, season_year, tournament_id):
+    if tournament_id is not None:
+        return (
+            "JOIN Round r ON r.T_MatchID = m.MatchID WHERE r.TournamentID = %s",
+            (tournament_id,),
+        )
+    if league_id is None or season_no is None or season_year is None:
+        raise ValueError("Pick a league season or a tournament.")
+    return (
+        """JOIN SeasonalMatch sm ON sm.MatchID = m.MatchID
+        WHERE sm.LeagueID = %s AND sm.SeasonNo = %s AND sm.SeasonYear = %s""",
+        (league_id, season_no, season_year),
+    )
+
+
+def _load(cur, scope_sql, scope_params):
+    cur.execute(
+        f"""
+        SELECT m.MatchID,
+               m.HomeTeamName,
+               m.AwayTeamName,
+               m.MatchStartDatetime,
+               m.MatchEndDatetime,
+               (SELECT COUNT(*) FROM RefereeMatchAttendance rma WHERE rma.MatchID = m.MatchID) AS assigned
+        FROM Match m
+        {scope_sql}
+          AND NOT m.IsLocked
+          AND m.MatchStartDatetime IS NOT NULL
+        ORDER BY m.MatchStartDatetime, m.MatchID;
+        """,
+        scope_params,
+    )
+    matches = cur.fetchall()
+
+    cur.execute(
+        """
+        SELECT r.UsersID, u.FirstName, u.LastName
+        FROM Referee r
+        JOIN Users u ON u.UsersID = r.UsersID
+        ORDER BY r.UsersID;
+        """
+    )
+    referees = cur.fetchall()
+
+    busy = {}
+    if matches:
+        window_start = matches[0]["matchstartdatetime"]
+        window_end = max(match_window(m["matchstartdatetime"], m["matchenddatetime"])[1] for m in matches)
+        cur.execute(
+            """
+            SELECT rma.RefereeID, m.MatchStartDatetime, m.MatchEndDatetime
+            FROM RefereeMatchAttendance rma
+            JOIN Match m ON m.MatchID = rma.MatchID
+            WHERE m.MatchStartDatetime < %s
+              AND CASE WHEN m.MatchEndDatetime > m.MatchStartDatetime THEN m.MatchEndDatetime
+                       ELSE m.MatchStartDatetime + %s END > %s;
+            """,
+            (window_end, MATCH_LENGTH, window_start),
+        )
+        for row in cur.fetchall():
+            start, end = match_window(row["matchstartdatetime"], row["matchenddatetime"])
+            busy.setdefault(row["refereeid"], []).append((start, end))
+    return matches, referees, busy
+
+
+def auto_assign(
+    league_id=None,
+    season_no=None,
+    season_year=None,
+    tournament_id=None,
+    per_match=REFEREES_PER_MATCH,
+    dry_run=True,
+):
+    """
+    Assign referees to every unlocked match of a league season (league_id, season_no,
+    season_year) or of a tournament (tournament_id) that has fewer than per_match.
+
+    No referee gets two matches whose windows overlap, counting the assignments they
+    already have in other competitions, and new matches go to whoever has the fewest
+    assignments in the season's date range. With dry_run=True nothing is written.
+
+    Returns a report dict: assignments (rows with match and referee names), unfilled
+    matches, per-referee loads before/after, the number of open matches considered,
+    the solve time in ms and the number of rows written.
+    """
+    per_match = int(per_match)
+    if per_match < 1:
+        raise ValueError("Each match needs at least one referee.")
+    scope_sql, scope_params = _scope_filter(league_id, season_no, season_year, tournament_id)
+
+    conn = get_connection()
+    try:
+        with conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                matches, referees, busy = _load(cur, scope_sql, scope_params)
+                if not referees:
+                    raise ValueError("There are no referees to assign.")
+
+                loads = {ref: len(windows) for ref, windows in busy.items()}
+                started = time.perf_counter()
+                assignments, unfilled = plan_assignments(
+                    [
+                        (m["matchid"], m["matchstartdatetime"], m["matchenddatetime"], m["assigned"])
+                        for m in matches
+                    ],
+                    [r["usersid"] for r in referees],
+                    busy,
+                    loads,
+                    per_match,
+                )
+                solve_ms = (time.perf_counter() - started) * 1000
+
+                written = 0
+                if assignments and not dry_run:
+                    cur.execute(
+                        """
+                        INSERT INTO RefereeMatchAttendance (MatchID, RefereeID)
+                        SELECT *
+                        FROM unnest(%s::int[], %s::int[])
+                        ON CONFLICT DO NOTHING;
+                        """,
+                        ([m for m, _ in assignments], [r for _, r in assignments]),
+                    )
+                    written = cur.rowcount
+    finally:
+        conn.close()
+
+    match_by_id = {m["matchid"]: m for m in matches}
+    referee_by_id = {r["usersid"]: r for r in referees}
+    after = dict(loads)
+    for _, ref in assignments:
+        after[ref] = after.get(ref, 0) + 1
+
+    return {
+        "assignments": [
+            {
+                "matchid": match_id,
+                "hometeamname": match_by_id[match_id]["hometeamname"],
+                "awayteamname": match_by_id[match_id]["awayteamname"],
+                "matchstartdatetime": match_by_id[match_id]["matchstartdatetime"],
+                "refereeid": ref,
+                "referee_name": f"{referee_by_id[ref]['firstname']} {referee_by_id[ref]['lastname']}",
+            }
+            for match_id, ref in assignments
+        ],
+        "unfilled": [dict(match_by_id[match_id], missing=missing) for match_id, missing in unfilled.items()],
+        "loads": [
+            {
+                "refereeid": r["usersid"],
+                "referee_name": f"{r['firstname']} {r['lastname']}",
+                "before": loads.get(r["usersid"], 0),
+                "after": after.get(r["usersid"], 0),
+            }
+            for r in referees
+        ],
+        "open_matches": len(matches),
+        "solve_ms": solve_ms,
+        "written": written,
+        "dry_run": dry_run,
+    }
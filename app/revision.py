@@ -0,0 +1,84 @@
+# data revisions and conditional GETs for rankings, standings, brackets and /stats
+#
+# DataRevision keeps one revision per league and per tournament, drawn from a single
+# sequence. Triggers (migration 0012_data_revisions) bump it whenever something
+# those pages show changes: match scores, winners and locks (every Play statement
+# updates its matches, so Play changes count), season and bracket membership,
+# refreshed materialized player stats, and the league/tournament rows themselves.
+# Rows are never deleted, so the highest revision of a whole scope also moves when a
+# league or tournament is removed.
+#
+# A handler calls check() with the revisions it depends on and everything else that
+# shapes its response (filters, the viewer for HTML pages). That costs one indexed
+# query; a matching If-None-Match gets a 304 before any stats query runs. Otherwise
+# the handler renders as before and passes the response through tagged().
+import hashlib
+
+from flask import g, make_response, request, session
+
+from db import get_connection
+
+SCOPES = ("league", "tournament")
+
+
+def revisions(*scopes):
+    """
+    Current revisions for (scope, id) pairs in one query; id None means the highest
+    revision across the whole scope. Unknown ids are 0.
+    """
+    if not scopes:
+        return ()
+    selects, params = [], []
+    for scope, scope_id in scopes:
+        if scope not in SCOPES:
+            raise ValueError(f"Unknown revision scope: {scope}")
+        if scope_id is None:
+            selects.append("(SELECT COALESCE(MAX(Revision), 0) FROM DataRevision WHERE Scope = %s)")
+            params.append(scope)
+        else:
+            selects.append(
+                "(SELECT COALESCE(MAX(Revision), 0) FROM DataRevision WHERE Scope = %s AND ScopeID = %s)"
+            )
+            params.extend([scope, int(scope_id)])
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"SELECT {', '.join(selects)};", params)
+            return tuple(cur.fetchone())
+    finally:
+        conn.close()
+
+
+def viewer():
+    # what the banner shows, for ETags of full HTML pages
+    return (
+        session.get("user_id"),
+        session.get("role"),
+        g.get("user_first_name"),
+        g.get("user_last_name"),
+    )
+
+
+def make_etag(revs, *parts):
+    digest = hashlib.sha1(repr((revs, parts)).encode()).hexdigest()
+    return digest[:32]
+
+
+def check(scopes, *parts):
+    """
+    (etag, response): response is a ready 304 when the client already has this
+    version, else None and the handler should build the page and call tagged().
+    The request path and query string are always part of the tag.
+    """
+    etag = make_etag(revisions(*scopes), request.full_path, *parts)
+    if request.if_none_match.contains(etag):
+        return etag, tagged(make_response("", 304), etag)
+    return etag, None
+
+
+def tagged(response, etag):
+    response = make_response(response)
+    response.set_etag(etag)
+    # always revalidate; the 304 is what makes it cheap
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
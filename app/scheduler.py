@@ -0,0 +1,80 @@
+# small in-process scheduler for periodic maintenance jobs (sweeps, cache refreshes)
+import os
+import threading
+import time
+
+from db_helper import refresh_player_stats, update_expired_injuries
+
+
+class Scheduler:
+    def __init__(self):
+        self._jobs = []  # [name, interval, func, next_run]
+        self._stop = threading.Event()
+        self._thread = None
+
+    def add_job(self, name, interval, func):
+        if interval <= 0:
+            raise ValueError(f"Interval for job '{name}' must be positive.")
+        self._jobs.append([name, interval, func, 0.0])
+
+    def run_pending(self):
+        now = time.monotonic()
+        for job in self._jobs:
+            name, interval, func, next_run = job
+            if now < next_run:
+                continue
+            job[3] = now + interval
+            try:
+                result = func()
+                if result:
+                    print(f"[scheduler] {name}: {result}")
+            except Exception as e:
+                # a failing job must not take the loop (or the other jobs) down
+                print(f"[scheduler] {name} failed: {e}")
+
+    def run_forever(self):
+        while not self._stop.is_set():
+            self.run_pending()
+            if not self._jobs:
+                self._stop.wait(1.0)
+                continue
+            wait = min(job[3] for job in self._jobs) - time.monotonic()
+            self._stop.wait(max(wait, 0.5))
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run_forever, name="scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+def build_scheduler():
+    scheduler = Scheduler()
+    scheduler.add_job(
+        "expired_injuries",
+        float(os.environ.get("INJURY_SWEEP_INTERVAL", 300)),
+        update_expired_injuries,
+    )
+    scheduler.add_job(
+        "player_stats",
+        float(os.environ.get("PLAYER_STATS_REFRESH_INTERVAL", 30)),
+        refresh_player_stats,
+    )
+    return scheduler
+
+
+def init_app(app):
+    # SCHEDULER_ENABLED=0 when a separate worker.py process runs the jobs instead
+    if os.environ.get("SCHEDULER_ENABLED", "1") != "1":
+        return None
+    # with the debug reloader only the serving child process runs jobs
+    if app.debug and os.environ.get("WERKZEUG_RUN_MAIN") != "true":
+        return None
+    scheduler = build_scheduler()
+    scheduler.start()
+    app.extensions["scheduler"] = scheduler
+    return scheduler
@@ -0,0 +1,137 @@
+# request coalescing for expensive aggregates (rankings, top scorers)
+#
+# @coalesce() on a helper makes concurrent calls with the same (function, arguments)
+# share one computation: the first caller runs it, everyone who arrives while it is
+# running waits for that result (or that exception) instead of issuing the same
+# query again. Arguments are normalized against the signature, so f(1) and
+# f(league_id=1) are the same call.
+#
+# Optionally a finished result is kept: for max_age seconds it is served as is, and
+# for stale_for seconds after that it is still served straight away while one
+# background call refreshes it (stale-while-revalidate). Both default to 0, i.e.
+# pure coalescing. A kept result must not outlive the data behind an ETag (see
+# revision.py): either key the call on the revision or leave both at 0.
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+
+RESULTS_SIZE = 256
+
+_inflight = {}  # key -> _Call
+_results = OrderedDict()  # key -> (finished_at, value), least recently used first
+_stats = {"calls": 0, "leaders": 0, "shared": 0, "fresh": 0, "stale": 0, "refresh_errors": 0}
+_lock = threading.Lock()
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(_freeze(v) for v in value)
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+def _key(name, signature, args, kwargs):
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    return (name, _freeze(bound.arguments))
+
+
+def _copy(value):
+    # callers get their own list; the rows themselves are shared and read-only
+    return list(value) if isinstance(value, list) else value
+
+
+def _run(key, call, fn, args, kwargs, keep):
+    try:
+        call.value = fn(*args, **kwargs)
+    except BaseException as e:
+        call.error = e
+    finally:
+        with _lock:
+            _inflight.pop(key, None)
+            # None is what the swallow-and-log helpers return on errors; never keep it
+            if keep and call.error is None and call.value is not None:
+                _results[key] = (time.monotonic(), call.value)
+                _results.move_to_end(key)
+                while len(_results) > RESULTS_SIZE:
+                    _results.popitem(last=False)
+        call.done.set()
+
+
+def _refresh(key, call, fn, args, kwargs, keep):
+    _run(key, call, fn, args, kwargs, keep)
+    if call.error is not None:
+        with _lock:
+            _stats["refresh_errors"] += 1
+        print(f"[singleflight] background refresh of {key[0]} failed: {call.error}")
+
+
+def coalesce(max_age=0, stale_for=0):
+    """Share one in-flight computation between identical concurrent calls (see above)."""
+
+    def decorate(fn):
+        name = f"{fn.__module__}.{fn.__qualname__}"
+        signature = inspect.signature(fn)
+        keep = max_age + stale_for
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = _key(name, signature, args, kwargs)
+            with _lock:
+                _stats["calls"] += 1
+                cached = _results.get(key) if keep else None
+                if cached is not None:
+                    age = time.monotonic() - cached[0]
+                    if age < max_age:
+                        _stats["fresh"] += 1
+                        _results.move_to_end(key)
+                        return _copy(cached[1])
+                    if age < keep:
+                        _stats["stale"] += 1
+                        if key not in _inflight:
+                            call = _inflight[key] = _Call()
+                            threading.Thread(
+                                target=_refresh,
+                                args=(key, call, fn, args, kwargs, keep),
+                                name="singleflight-refresh",
+                                daemon=True,
+                            ).start()
+                        return _copy(cached[1])
+                call = _inflight.get(key)
+                leader = call is None
+                if leader:
+                    call = _inflight[key] = _Call()
+                    _stats["leaders"] += 1
+                else:
+                    _stats["shared"] += 1
+
+            if leader:
+                _run(key, call, fn, args, kwargs, keep)
+            else:
+                call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return _copy(call.value)
+
+        return wrapper
+
+    return decorate
+
+
+def stats():
+    with _lock:
+        return dict(_stats, inflight=len(_inflight), kept=len(_results))
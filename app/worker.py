@@ -0,0 +1,30 @@
+# standalone entry point for the maintenance jobs, for deployments that run the web
+# app with SCHEDULER_ENABLED=0:
+#   python worker.py            run the jobs on their intervals until stopped
+#   python worker.py --once     run every job once and exit
+#   python worker.py --full     one full (non-incremental) injury sweep and exit
+import sys
+
+from db_helper import update_expired_injuries
+from scheduler import build_scheduler
+
+
+def main(argv):
+    if "--full" in argv:
+        print(f"Marked {update_expired_injuries(full=True)} player(s) eligible.")
+        return 0
+
+    scheduler = build_scheduler()
+    if "--once" in argv:
+        scheduler.run_pending()
+        return 0
+
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
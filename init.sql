@@ -1,3 +1,8 @@
+-- GiST support for plain scalar columns, used by the Employed exclusion constraint
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+-- trigram indexes for the player name search (app/player_search.py)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 CREATE TABLE Users (
   UsersID SERIAL,
   FirstName VARCHAR(30) NOT NULL,
@@ -142,6 +147,10 @@ CREATE TABLE Injury (
     NULL
 );
 
+-- used by the expired-injury sweep
+CREATE INDEX idx_injury_recovery_date ON Injury (RecoveryDate);
+CREATE INDEX idx_injury_player_date ON Injury (PlayerID, InjuryDate);
+
 CREATE TABLE Ban (
   BanID SERIAL,
   PlayerID INT NOT NULL,
@@ -236,6 +245,7 @@ CREATE TABLE Tournament (
   TournamentID SERIAL,
   Name VARCHAR(255) UNIQUE,
   Size INT,
+  BracketVersion INT NOT NULL DEFAULT 0,
   PRIMARY KEY (TournamentID)
 );
 
@@ -275,7 +285,10 @@ CREATE TABLE Employed (
   EmploymentID INT,
   UsersID INT,
   TeamID INT,
+  -- [StartDate, EndDate) of the Employment row, kept in sync by triggers
+  Period TSRANGE NOT NULL,
   PRIMARY KEY (EmploymentID, UsersID, TeamID),
+  CONSTRAINT employed_no_overlapping_contracts EXCLUDE USING gist (UsersID WITH =, Period WITH &&),
   FOREIGN KEY (EmploymentID) REFERENCES Employment(EmploymentID) ON DELETE CASCADE,
   FOREIGN KEY (UsersID) REFERENCES Employee(UsersID) ON DELETE CASCADE,
   FOREIGN KEY (TeamID) REFERENCES Team(TeamID) ON DELETE CASCADE
@@ -324,6 +337,197 @@ CREATE TABLE RefereeMatchAttendance (
   FOREIGN KEY (RefereeID) REFERENCES Referee(UsersID) ON DELETE CASCADE
 );
 
+-- per-team league standings, kept up to date by the trg_standings_* triggers
+CREATE TABLE TeamSeasonStanding (
+  LeagueID INT,
+  SeasonNo INT,
+  SeasonYear DATE,
+  TeamID INT,
+  TeamName VARCHAR(100) NOT NULL,
+  Played INT NOT NULL DEFAULT 0,
+  Wins INT NOT NULL DEFAULT 0,
+  Draws INT NOT NULL DEFAULT 0,
+  Losses INT NOT NULL DEFAULT 0,
+  GoalsFor INT NOT NULL DEFAULT 0,
+  GoalsAgainst INT NOT NULL DEFAULT 0,
+  Points INT NOT NULL DEFAULT 0,
+  PRIMARY KEY (LeagueID, SeasonNo, SeasonYear, TeamID),
+  FOREIGN KEY (LeagueID, SeasonNo, SeasonYear) REFERENCES Season(LeagueID, SeasonNo, SeasonYear) ON DELETE CASCADE,
+  FOREIGN KEY (TeamID) REFERENCES Team(TeamID) ON DELETE CASCADE
+);
+
+CREATE INDEX idx_team_season_standing_team ON TeamSeasonStanding (TeamID);
+
+-- one row per match with its competition resolved, for the admin match lists; kept
+-- in sync with Match / SeasonalMatch / TournamentMatch / Round / League / Tournament
+-- by the trg_match_catalog_* triggers (see sync_match_catalog)
+CREATE TABLE MatchCatalog (
+  MatchID INT,
+  CompetitionType VARCHAR(10) NOT NULL,  -- 'league', 'tournament' or 'unknown'
+  CompetitionID INT,
+  CompetitionName VARCHAR(255),
+  LeagueID INT,
+  SeasonNo INT,
+  SeasonYear DATE,
+  TournamentID INT,
+  RoundNo INT,
+  HomeTeamID INT NOT NULL,
+  AwayTeamID INT NOT NULL,
+  HomeTeamName VARCHAR(100) NOT NULL,
+  AwayTeamName VARCHAR(100) NOT NULL,
+  HomeTeamScore INT,
+  AwayTeamScore INT,
+  WinnerTeam VARCHAR(100),
+  IsLocked BOOLEAN NOT NULL,
+  MatchStartDatetime TIMESTAMP NOT NULL,
+  MatchEndDatetime TIMESTAMP,
+  PRIMARY KEY (MatchID),
+  FOREIGN KEY (MatchID) REFERENCES Match(MatchID) ON DELETE CASCADE
+);
+
+-- one covering index per admin filter (season, league, tournament), newest first
+CREATE INDEX idx_match_catalog_season ON MatchCatalog (LeagueID, SeasonNo, SeasonYear, MatchStartDatetime DESC, MatchID DESC)
+  INCLUDE (HomeTeamName, AwayTeamName, HomeTeamScore, AwayTeamScore, IsLocked, CompetitionName);
+CREATE INDEX idx_match_catalog_tournament ON MatchCatalog (TournamentID, MatchStartDatetime DESC, MatchID DESC)
+  INCLUDE (HomeTeamName, AwayTeamName, HomeTeamScore, AwayTeamScore, IsLocked, CompetitionName);
+CREATE INDEX idx_match_catalog_start ON MatchCatalog (MatchStartDatetime DESC, MatchID DESC);
+-- a league's matches across all its seasons, paged by (MatchStartDatetime, MatchID)
+CREATE INDEX idx_match_catalog_league ON MatchCatalog (LeagueID, MatchStartDatetime DESC, MatchID DESC)
+  INCLUDE (HomeTeamName, AwayTeamName, IsLocked, WinnerTeam, SeasonNo, SeasonYear);
+
+-- materialized player statistics; same numbers as the PlayerStatsAll /
+-- PlayerSeasonStats / PlayerTournamentStats views, refreshed per player from
+-- PlayerStatsDirty by refresh_player_stats()
+CREATE TABLE PlayerStatsAllMat (
+  UsersID INT,
+  total_appearances BIGINT,
+  total_goals BIGINT,
+  total_penalties BIGINT,
+  total_minutes BIGINT,
+  total_yellowcards BIGINT,
+  total_redcards BIGINT,
+  total_saves BIGINT,
+  total_successfulpasses BIGINT,
+  total_totalpasses BIGINT,
+  total_assistsmade BIGINT,
+  RefreshedAt TIMESTAMP NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (UsersID),
+  FOREIGN KEY (UsersID) REFERENCES Users(UsersID) ON DELETE CASCADE
+);
+
+CREATE TABLE PlayerSeasonStatsMat (
+  UsersID INT,
+  LeagueID INT,
+  SeasonNo INT,
+  SeasonYear DATE,
+  total_appearances BIGINT,
+  total_goals BIGINT,
+  total_penalties BIGINT,
+  total_minutes BIGINT,
+  total_yellowcards BIGINT,
+  total_redcards BIGINT,
+  total_saves BIGINT,
+  total_successfulpasses BIGINT,
+  total_totalpasses BIGINT,
+  total_assistsmade BIGINT,
+  RefreshedAt TIMESTAMP NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (UsersID, LeagueID, SeasonNo, SeasonYear),
+  FOREIGN KEY (UsersID) REFERENCES Users(UsersID) ON DELETE CASCADE,
+  FOREIGN KEY (LeagueID, SeasonNo, SeasonYear) REFERENCES Season(LeagueID, SeasonNo, SeasonYear) ON DELETE CASCADE
+);
+
+CREATE INDEX idx_player_season_stats_mat_season ON PlayerSeasonStatsMat (LeagueID, SeasonNo, SeasonYear);
+
+CREATE TABLE PlayerTournamentStatsMat (
+  UsersID INT,
+  TournamentID INT,
+  total_appearances BIGINT,
+  total_goals BIGINT,
+  total_penalties BIGINT,
+  total_minutes BIGINT,
+  total_yellowcards BIGINT,
+  total_redcards BIGINT,
+  total_saves BIGINT,
+  total_successfulpasses BIGINT,
+  total_totalpasses BIGINT,
+  total_assistsmade BIGINT,
+  RefreshedAt TIMESTAMP NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (UsersID, TournamentID),
+  FOREIGN KEY (UsersID) REFERENCES Users(UsersID) ON DELETE CASCADE,
+  FOREIGN KEY (TournamentID) REFERENCES Tournament(TournamentID) ON DELETE CASCADE
+);
+
+-- players whose materialized statistics are out of date
+CREATE TABLE PlayerStatsDirty (
+  PlayerID INT,
+  QueuedAt TIMESTAMP NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (PlayerID)
+);
+
+-- bookkeeping for background sweeps: how far each job has already looked
+CREATE TABLE SweepWatermark (
+  JobName VARCHAR(50),
+  LastSweptAt TIMESTAMP NOT NULL DEFAULT '-infinity',
+  LastRowID INT NOT NULL DEFAULT 0,
+  SweptAt TIMESTAMP,
+  PRIMARY KEY (JobName)
+);
+
+INSERT INTO SweepWatermark (JobName) VALUES ('expired_injuries');
+
+-- players whose injuries were edited or removed since the last sweep; the next
+-- expired-injury sweep checks them again whatever the watermark says
+CREATE TABLE InjuryRecheck (
+  PlayerID INT,
+  QueuedAt TIMESTAMP NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (PlayerID)
+);
+
+-- per-league and per-tournament data revisions for conditional GETs (app/revision.py)
+CREATE SEQUENCE data_revision_seq;
+
+-- rows are never deleted, so MAX(Revision) of a scope only ever grows
+CREATE TABLE DataRevision (
+  Scope VARCHAR(20),
+  ScopeID INT,
+  Revision BIGINT NOT NULL,
+  PRIMARY KEY (Scope, ScopeID)
+);
+
+CREATE INDEX idx_data_revision_scope ON DataRevision (Scope, Revision);
+
+-- schema versioning: migrations in app/migrations/ that are already part of this file
+CREATE TABLE SchemaMigration (
+  Version VARCHAR(100),
+  AppliedAt TIMESTAMP NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (Version)
+);
+
+-- indexes (kept in sync with app/migrations/)
+CREATE INDEX idx_play_match ON Play (MatchID);
+CREATE INDEX idx_play_player ON Play (PlayerID);
+CREATE INDEX idx_employed_users ON Employed (UsersID);
+CREATE INDEX idx_employed_team ON Employed (TeamID);
+CREATE INDEX idx_employment_dates ON Employment (StartDate, EndDate);
+CREATE INDEX idx_employed_team_period ON Employed USING gist (TeamID, Period);
+CREATE INDEX idx_seasonal_match_season ON SeasonalMatch (LeagueID, SeasonNo, SeasonYear);
+CREATE INDEX idx_referee_match_attendance_referee ON RefereeMatchAttendance (RefereeID);
+CREATE INDEX idx_match_start ON Match (MatchStartDatetime, MatchID);
+CREATE INDEX idx_offer_player_until ON Offer (RequestedPlayer, AvailableUntil);
+CREATE INDEX idx_training_attendance_player ON TrainingAttendance (PlayerID);
+-- player search: ILIKE and word-similarity matches on the full name, and the
+-- default (last name, first name) order for keyset pages
+CREATE INDEX idx_users_name_trgm ON Users USING gin ((FirstName || ' ' || LastName) gin_trgm_ops);
+CREATE INDEX idx_users_name ON Users (LastName, FirstName, UsersID);
+
+INSERT INTO SchemaMigration (Version) VALUES ('0000_baseline_catchup'),
+  ('0001_hot_path_indexes'), ('0002_employment_periods'),
+  ('0003_statement_level_match_plays'), ('0004_bracket_engine'),
+  ('0005_referee_match_feed'), ('0006_match_catalog'), ('0007_match_list_paging'),
+  ('0008_bulk_match_lock'), ('0009_seed_match_plays'), ('0010_player_search'),
+  ('0011_cache_notify'), ('0012_data_revisions'), ('0013_cache_notify_tournament_columns'),
+  ('0014_injury_recheck');
+
 -- --views -----------------------------------------------------------------------------
 -- view for all matches with seasonal and tournament info 
 CREATE OR REPLACE VIEW AllMatchInfo AS
@@ -367,55 +571,53 @@ JOIN Round R1 ON R1.T_MatchID = TM1.MatchID
 JOIN Tournament T1 USING (TournamentID)
 ORDER BY M1.MatchStartDatetime;
 
+-- one row per (match, assigned referee). CompetitionType/CompetitionID let callers
+-- filter with = ANY(...) on ids; no ORDER BY here, callers page on
+-- (MatchStartDatetime, MatchID). The branches never overlap, hence UNION ALL.
 CREATE OR REPLACE VIEW RefereeMatchView AS
-SELECT *
-FROM (
-  SELECT
-    m.MatchID,
-    m.HomeTeamID,
-    m.AwayTeamID,
-    home.TeamName AS HomeTeamName,
-    away.TeamName AS AwayTeamName,
-    m.hometeamscore,
-    m.awayteamscore,
-    m.winnerteam,
-    m.MatchStartDatetime,
-    l.Name AS CompetitionName,
-    rma.RefereeID,
-    TRUE AS IsLeague,
-    m.IsLocked
-  FROM Match m
-  JOIN Team home ON m.HomeTeamID = home.TeamID
-  JOIN Team away ON m.AwayTeamID = away.TeamID
-  JOIN RefereeMatchAttendance rma ON m.MatchID = rma.MatchID
-  JOIN SeasonalMatch sm ON m.MatchID = sm.MatchID
-  JOIN League l USING (LeagueID)
-
-  UNION
+SELECT
+  m.MatchID,
+  m.HomeTeamID,
+  m.AwayTeamID,
+  m.HomeTeamName,
+  m.AwayTeamName,
+  m.hometeamscore,
+  m.awayteamscore,
+  m.winnerteam,
+  m.MatchStartDatetime,
+  l.Name AS CompetitionName,
+  rma.RefereeID,
+  TRUE AS IsLeague,
+  m.IsLocked,
+  'league'::VARCHAR(10) AS CompetitionType,
+  sm.LeagueID AS CompetitionID
+FROM RefereeMatchAttendance rma
+JOIN Match m ON m.MatchID = rma.MatchID
+JOIN SeasonalMatch sm ON sm.MatchID = m.MatchID
+JOIN League l ON l.LeagueID = sm.LeagueID
+
+UNION ALL
 
-  SELECT
-    m.MatchID,
-    m.HomeTeamID,
-    m.AwayTeamID,
-    home.TeamName AS HomeTeamName,
-    away.TeamName AS AwayTeamName,
-    m.hometeamscore,
-    m.awayteamscore,
-    m.winnerteam,
-    m.MatchStartDatetime,
-    t.Name AS CompetitionName,
-    rma.RefereeID,
-    FALSE AS IsLeague,
-    m.IsLocked
-  FROM Match m
-  JOIN Team home ON m.HomeTeamID = home.TeamID
-  JOIN Team away ON m.AwayTeamID = away.TeamID
-  JOIN RefereeMatchAttendance rma ON m.MatchID = rma.MatchID
-  JOIN TournamentMatch tm ON m.MatchID = tm.MatchID
-  JOIN Round r ON r.T_MatchID = tm.MatchID
-  JOIN Tournament t USING (TournamentID)
-) AS combined
-ORDER BY MatchStartDatetime;
+SELECT
+  m.MatchID,
+  m.HomeTeamID,
+  m.AwayTeamID,
+  m.HomeTeamName,
+  m.AwayTeamName,
+  m.hometeamscore,
+  m.awayteamscore,
+  m.winnerteam,
+  m.MatchStartDatetime,
+  t.Name AS CompetitionName,
+  rma.RefereeID,
+  FALSE AS IsLeague,
+  m.IsLocked,
+  'tournament'::VARCHAR(10) AS CompetitionType,
+  r.TournamentID AS CompetitionID
+FROM RefereeMatchAttendance rma
+JOIN Match m ON m.MatchID = rma.MatchID
+JOIN Round r ON r.T_MatchID = m.MatchID
+JOIN Tournament t ON t.TournamentID = r.TournamentID;
 
 CREATE OR REPLACE VIEW AllEmploymentInfo AS
 SELECT
@@ -428,7 +630,8 @@ SELECT
   t.TeamName,
   t.OwnerID,
   t.EstablishedDate,
-  t.HomeVenue
+  t.HomeVenue,
+  em.Period
 FROM Employed em
 JOIN Employment e ON e.EmploymentID = em.EmploymentID
 JOIN Team t ON t.TeamID = em.TeamID
@@ -511,11 +714,82 @@ JOIN Round R1 ON R1.T_MatchID = TM1.MatchID
 JOIN Tournament T1 USING (TournamentID)
 GROUP BY U1.UsersID, U1.FirstName, U1.LastName, T1.TournamentID, T1.Name;
 
+-- readers of the materialized statistics: same columns as the views above plus
+-- RefreshedAt and IsStale (a refresh for the player is still queued)
+CREATE OR REPLACE VIEW PlayerStatsAllCached AS
+SELECT
+  U1.UsersID,
+  U1.FirstName,
+  U1.LastName,
+  S1.total_appearances,
+  S1.total_goals,
+  S1.total_penalties,
+  S1.total_minutes,
+  S1.total_yellowcards,
+  S1.total_redcards,
+  S1.total_saves,
+  S1.total_successfulpasses,
+  S1.total_totalpasses,
+  S1.total_assistsmade,
+  S1.RefreshedAt,
+  EXISTS (SELECT 1 FROM PlayerStatsDirty D1 WHERE D1.PlayerID = S1.UsersID) AS IsStale
+FROM PlayerStatsAllMat S1
+JOIN Users U1 ON U1.UsersID = S1.UsersID;
+
+CREATE OR REPLACE VIEW PlayerSeasonStatsCached AS
+SELECT
+  U1.UsersID,
+  U1.FirstName,
+  U1.LastName,
+  L1.Name,
+  S1.LeagueID,
+  S1.SeasonNo,
+  S1.SeasonYear,
+  S1.total_appearances,
+  S1.total_goals,
+  S1.total_penalties,
+  S1.total_minutes,
+  S1.total_yellowcards,
+  S1.total_redcards,
+  S1.total_saves,
+  S1.total_successfulpasses,
+  S1.total_totalpasses,
+  S1.total_assistsmade,
+  S1.RefreshedAt,
+  EXISTS (SELECT 1 FROM PlayerStatsDirty D1 WHERE D1.PlayerID = S1.UsersID) AS IsStale
+FROM PlayerSeasonStatsMat S1
+JOIN Users U1 ON U1.UsersID = S1.UsersID
+JOIN League L1 ON L1.LeagueID = S1.LeagueID;
+
+CREATE OR REPLACE VIEW PlayerTournamentStatsCached AS
+SELECT
+  U1.UsersID,
+  U1.FirstName,
+  U1.LastName,
+  T1.TournamentID,
+  T1.Name,
+  S1.total_appearances,
+  S1.total_goals,
+  S1.total_penalties,
+  S1.total_minutes,
+  S1.total_yellowcards,
+  S1.total_redcards,
+  S1.total_saves,
+  S1.total_successfulpasses,
+  S1.total_totalpasses,
+  S1.total_assistsmade,
+  S1.RefreshedAt,
+  EXISTS (SELECT 1 FROM PlayerStatsDirty D1 WHERE D1.PlayerID = S1.UsersID) AS IsStale
+FROM PlayerTournamentStatsMat S1
+JOIN Users U1 ON U1.UsersID = S1.UsersID
+JOIN Tournament T1 ON T1.TournamentID = S1.TournamentID;
+
+-- contracts that have not ended yet (current or signed for later), latest first
 CREATE OR REPLACE VIEW CurrentEmployment AS (
   SELECT DISTINCT ON (UsersID) 
    *
   FROM AllEmploymentInfo
-  WHERE EndDate > NOW()
+  WHERE Period && tsrange(LOCALTIMESTAMP, NULL)
   ORDER BY UsersID, StartDate DESC
 );
 
@@ -538,202 +812,117 @@ WHERE e.TeamID IS NOT NULL;
 -- functions 
 
 -- triggers
--- trigger to fill parent match when both child matches have winners -  WORKS
-CREATE OR REPLACE FUNCTION fill_parent_match()
+-- ===== Bracket versions =====
+-- Tournament.BracketVersion moves whenever something the bracket page shows changes,
+-- so app/bracket.py can keep one parsed bracket per tournament and only re-read it
+-- when the version it cached is out of date. Advancing winners into the next round is
+-- done by bracket.advance() (it replaced the fill_parent_match trigger).
+CREATE OR REPLACE FUNCTION bump_bracket_version_from_match()
 RETURNS TRIGGER AS $$
-DECLARE
-    child_round INT;
-    tournament_id INT;
-
-    parent_round INT;
-    child1_round INT;
-    child2_round INT;
-
-    child1_match INT;
-    child2_match INT;
-
-    child1_winner VARCHAR(100);
-    child2_winner VARCHAR(100);
-
-    new_parent_match_id INT;
 BEGIN
-    ----------------------------------------------------------------
-    -- 0. Ignore matches that are NOT part of tournaments
-    ----------------------------------------------------------------
-    IF NOT EXISTS (SELECT 1 FROM TournamentMatch WHERE MatchID = NEW.MatchID) THEN
-        RETURN NULL;
-    END IF;
-
-    ----------------------------------------------------------------
-    -- 1. Identify the round for the updated tournament match
-    ----------------------------------------------------------------
-    SELECT RoundNo, TournamentID
-    INTO child_round, tournament_id
-    FROM Round
-    WHERE T_MatchID = NEW.MatchID;
-
-    IF child_round IS NULL THEN
-        -- Match not assigned to any round
-        RETURN NULL;
-    END IF;
-
-    ----------------------------------------------------------------
-    -- 2. Find parent round
-    ----------------------------------------------------------------
-    SELECT ParentRoundNo
-    INTO parent_round
-    FROM Round
-    WHERE TournamentID = tournament_id
-      AND RoundNo = child_round;
-
-    IF parent_round IS NULL THEN
-        -- This is the FINAL round (root). No parent to fill.
-        RETURN NULL;
-    END IF;
-
-    ----------------------------------------------------------------
-    -- 3. Check if parent round already has a match
-    ----------------------------------------------------------------
-    SELECT T_MatchID
-    INTO new_parent_match_id
-    FROM Round
-    WHERE TournamentID = tournament_id
-      AND RoundNo = parent_round;
-
-    IF new_parent_match_id IS NOT NULL THEN
-        RETURN NULL;  -- Parent already created
-    END IF;
-
-    ----------------------------------------------------------------
-    -- 4. Get the two child rounds of the parent
-    ----------------------------------------------------------------
-    SELECT Child1RoundNo, Child2RoundNo
-    INTO child1_round, child2_round
-    FROM Round
-    WHERE TournamentID = tournament_id
-      AND RoundNo = parent_round;
-
-    IF child1_round IS NULL OR child2_round IS NULL THEN
-        RETURN NULL;
-    END IF;
-
-    ----------------------------------------------------------------
-    -- 5. Get match IDs of the two child rounds
-    ----------------------------------------------------------------
-    SELECT T_MatchID INTO child1_match
-    FROM Round WHERE TournamentID = tournament_id AND RoundNo = child1_round;
+    UPDATE Tournament t
+    SET BracketVersion = t.BracketVersion + 1
+    FROM (
+        SELECT DISTINCT r.TournamentID
+        FROM new_matches nm
+        JOIN old_matches om ON om.MatchID = nm.MatchID
+        JOIN Round r ON r.T_MatchID = nm.MatchID
+        WHERE (nm.HomeTeamName, nm.AwayTeamName, nm.HomeTeamScore, nm.AwayTeamScore,
+               nm.WinnerTeam, nm.IsLocked, nm.MatchStartDatetime)
+              IS DISTINCT FROM
+              (om.HomeTeamName, om.AwayTeamName, om.HomeTeamScore, om.AwayTeamScore,
+               om.WinnerTeam, om.IsLocked, om.MatchStartDatetime)
+    ) changed
+    WHERE t.TournamentID = changed.TournamentID;
 
-    SELECT T_MatchID INTO child2_match
-    FROM Round WHERE TournamentID = tournament_id AND RoundNo = child2_round;
-
-    IF child1_match IS NULL OR child2_match IS NULL THEN
-        RETURN NULL;
-    END IF;
-
-    ----------------------------------------------------------------
-    -- 6. Check if both children have winners AND are locked
-    ----------------------------------------------------------------
-    SELECT WinnerTeam INTO child1_winner
-    FROM Match WHERE MatchID = child1_match AND IsLocked = TRUE;
-
-    SELECT WinnerTeam INTO child2_winner
-    FROM Match WHERE MatchID = child2_match AND IsLocked = TRUE;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
 
-    IF child1_winner IS NULL OR child2_winner IS NULL THEN
-        RETURN NULL;
-    END IF;
+CREATE TRIGGER trg_bracket_version_match
+AFTER UPDATE ON Match
+REFERENCING OLD TABLE AS old_matches NEW TABLE AS new_matches
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_bracket_version_from_match();
 
-    ----------------------------------------------------------------
-    -- 7. Create parent match
-    ----------------------------------------------------------------
-    INSERT INTO Match (
-        HomeTeamID, AwayTeamID, MatchStartDatetime,
-        HomeTeamName, AwayTeamName,
-        HomeTeamScore, AwayTeamScore, WinnerTeam, IsLocked
-    )
-    VALUES (
-        (SELECT TeamID FROM Team WHERE TeamName = child1_winner),
-        (SELECT TeamID FROM Team WHERE TeamName = child2_winner),
-        NOW() + INTERVAL '1 week',
-        child1_winner, child2_winner,
-        NULL, NULL, NULL, FALSE
-    )
-    RETURNING MatchID INTO new_parent_match_id;
-
-    ----------------------------------------------------------------
-    -- 8. Insert into TournamentMatch first to satisfy FK
-    ----------------------------------------------------------------
-    INSERT INTO TournamentMatch (MatchID)
-    VALUES (new_parent_match_id);
-
-    ----------------------------------------------------------------
-    -- 9. Attach match to parent round
-    ----------------------------------------------------------------
-    UPDATE Round
-    SET T_MatchID = new_parent_match_id
-    WHERE TournamentID = tournament_id
-      AND RoundNo = parent_round;
+-- Round rows only change when a match is attached (build, advancement) or removed
+CREATE OR REPLACE FUNCTION bump_bracket_version_from_round()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE Tournament t
+    SET BracketVersion = t.BracketVersion + 1
+    WHERE t.TournamentID IN (SELECT TournamentID FROM changed_rounds);
 
     RETURN NULL;
 END;
 $$ LANGUAGE plpgsql;
 
+CREATE TRIGGER trg_bracket_version_round_update
+AFTER UPDATE ON Round
+REFERENCING NEW TABLE AS changed_rounds
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_bracket_version_from_round();
 
-CREATE TRIGGER trg_fill_parent_match
-AFTER UPDATE OF winnerteam, islocked ON Match
-FOR EACH ROW
-EXECUTE FUNCTION fill_parent_match();
+CREATE TRIGGER trg_bracket_version_round_delete
+AFTER DELETE ON Round
+REFERENCING OLD TABLE AS changed_rounds
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_bracket_version_from_round();
 
 
 -- ===== TRIGGER: Auto-create Play rows when a Match is inserted =====
--- Purpose: Whenever a Match is created (league or tournament), automatically 
+-- Purpose: Whenever Matches are created (league or tournament), automatically 
 --          populate Play rows for all current active players on both teams.
 -- Logic:
---   1. Get the HomeTeamID and AwayTeamID from the new Match
---   2. Find all players actively employed by both teams at the match time
---   3. Insert Play rows for each player (without eligibility check for now)
+--   1. Read every inserted Match from the new_matches transition table
+--   2. Find all players actively employed by either team at each match time
+--   3. Insert the Play rows for all of them in one statement (without eligibility check for now)
 -- Note: This runs for BOTH seasonal matches and tournament matches
 -- Note: IsEligible filtering is currently bypassed
-CREATE OR REPLACE FUNCTION auto_create_plays_on_match_insert()
-RETURNS TRIGGER AS $$
-DECLARE
-    home_team_id INT;
-    away_team_id INT;
-    match_time TIMESTAMP;
+-- Note: Statement-level, so a bulk fixture insert seeds all its plays at once
+
+-- seed the missing Play rows of a set of matches: one join resolves every match's
+-- players through Employed.Period at kickoff, one INSERT adds the missing rows.
+-- Returns the rows inserted per match (matches that needed nothing are left out).
+-- p_eligible_only keeps only players whose IsEligible is 'eligible'.
+CREATE OR REPLACE FUNCTION seed_match_plays(p_match_ids INT[], p_eligible_only BOOLEAN DEFAULT FALSE)
+RETURNS TABLE (match_id INT, inserted INT) AS $$
 BEGIN
-    home_team_id := NEW.HomeTeamID;
-    away_team_id := NEW.AwayTeamID;
-    match_time := NEW.MatchStartDatetime;
-
-    -- Insert Play rows for all active players from both teams
-    WITH active_players AS (
-        SELECT em.UsersID AS player_id
-        FROM Employed em
-        JOIN Employment e ON e.EmploymentID = em.EmploymentID
+    RETURN QUERY
+    WITH new_plays AS (
+        INSERT INTO Play (MatchID, PlayerID)
+        SELECT m.MatchID, em.UsersID
+        FROM Match m
+        JOIN Employed em ON em.TeamID IN (m.HomeTeamID, m.AwayTeamID)
+                        AND em.Period @> m.MatchStartDatetime
         JOIN Player p ON p.UsersID = em.UsersID
-        WHERE em.TeamID IN (home_team_id, away_team_id)
-          AND e.StartDate <= match_time
-          AND e.EndDate >= match_time
-          -- NOTE: Skipping IsEligible check for now (see TODO in create_tournament_with_bracket)
-    ),
-    to_insert AS (
-        SELECT NEW.MatchID AS match_id, ap.player_id
-        FROM active_players ap
-        WHERE NOT EXISTS (
-            SELECT 1 FROM Play pl
-            WHERE pl.MatchID = NEW.MatchID AND pl.PlayerID = ap.player_id
-        )
+        WHERE m.MatchID = ANY(p_match_ids)
+          AND (NOT p_eligible_only OR COALESCE(LOWER(p.IsEligible), '') = 'eligible')
+          AND NOT EXISTS (
+              SELECT 1 FROM Play pl
+              WHERE pl.MatchID = m.MatchID AND pl.PlayerID = em.UsersID
+          )
+        RETURNING Play.MatchID
     )
-    INSERT INTO Play (MatchID, PlayerID)
-    SELECT match_id, player_id FROM to_insert;
+    SELECT np.MatchID, COUNT(*)::INT
+    FROM new_plays np
+    GROUP BY np.MatchID;
+END;
+$$ LANGUAGE plpgsql;
 
-    RETURN NEW;
+CREATE OR REPLACE FUNCTION auto_create_plays_on_match_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- NOTE: Skipping IsEligible check for now (see TODO in create_tournament_with_bracket)
+    PERFORM seed_match_plays(ARRAY(SELECT MatchID FROM new_matches));
+    RETURN NULL;
 END;
 $$ LANGUAGE plpgsql;
 
 CREATE TRIGGER trg_auto_create_plays_on_match_insert
 AFTER INSERT ON Match
-FOR EACH ROW
+REFERENCING NEW TABLE AS new_matches
+FOR EACH STATEMENT
 EXECUTE FUNCTION auto_create_plays_on_match_insert();
 
 
@@ -825,11 +1014,7 @@ BEGIN
         RETURN NULL;
     END IF;
 
-    SELECT TeamID INTO player_team_id
-    FROM AllEmploymentInfo
-    WHERE UsersID = NEW.PlayerID
-      AND match_time BETWEEN StartDate AND EndDate
-    LIMIT 1;
+    player_team_id := team_at(NEW.PlayerID, match_time);
 
     IF player_team_id IS NULL THEN
         RETURN NULL;
@@ -876,11 +1061,7 @@ BEGIN
         RETURN NULL;
     END IF;
 
-    SELECT TeamID INTO player_team_id
-    FROM AllEmploymentInfo
-    WHERE UsersID = NEW.PlayerID
-      AND match_time BETWEEN StartDate AND EndDate
-    LIMIT 1;
+    player_team_id := team_at(NEW.PlayerID, match_time);
 
     IF player_team_id IS NULL THEN
         RETURN NULL;
@@ -927,21 +1108,19 @@ BEGIN
         SELECT COALESCE(SUM(COALESCE(P.PenaltiesScored, 0)), 0)
         INTO total_home_penalties
         FROM Play P
-        JOIN AllEmploymentInfo AE ON P.PlayerID = AE.UsersID
+        JOIN Employed AE ON P.PlayerID = AE.UsersID
         WHERE P.MatchID = NEW.MatchID 
           AND AE.TeamID = NEW.HomeTeamID
-          AND NEW.matchstartdatetime >= AE.StartDate
-          AND (NEW.matchstartdatetime <= AE.EndDate OR AE.EndDate IS NULL);
+          AND AE.Period @> NEW.matchstartdatetime;
 
         -- Calculate total penalties for the Away Team
         SELECT COALESCE(SUM(COALESCE(P.PenaltiesScored, 0)), 0)
         INTO total_away_penalties
         FROM Play P
-        JOIN AllEmploymentInfo AE ON P.PlayerID = AE.UsersID
+        JOIN Employed AE ON P.PlayerID = AE.UsersID
         WHERE P.MatchID = NEW.MatchID
           AND AE.TeamID = NEW.AwayTeamID
-          AND NEW.matchstartdatetime >= AE.StartDate
-          AND (NEW.matchstartdatetime <= AE.EndDate OR AE.EndDate IS NULL);
+          AND AE.Period @> NEW.matchstartdatetime;
 
         -- Decide winner based on penalties
         IF COALESCE(total_home_penalties, 0) > COALESCE(total_away_penalties, 0) THEN
@@ -958,9 +1137,23 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
+-- skipped when a statement only flips IsLocked (bulk lock/unlock); the winner only
+-- depends on the columns below and on Play, and Play changes reach it through an
+-- UPDATE that leaves IsLocked alone
 CREATE TRIGGER match_update
 BEFORE UPDATE ON Match
 FOR EACH ROW
+WHEN (
+    OLD.IsLocked IS NOT DISTINCT FROM NEW.IsLocked
+    OR OLD.HomeTeamScore IS DISTINCT FROM NEW.HomeTeamScore
+    OR OLD.AwayTeamScore IS DISTINCT FROM NEW.AwayTeamScore
+    OR OLD.HomeTeamID IS DISTINCT FROM NEW.HomeTeamID
+    OR OLD.AwayTeamID IS DISTINCT FROM NEW.AwayTeamID
+    OR OLD.HomeTeamName IS DISTINCT FROM NEW.HomeTeamName
+    OR OLD.AwayTeamName IS DISTINCT FROM NEW.AwayTeamName
+    OR OLD.WinnerTeam IS DISTINCT FROM NEW.WinnerTeam
+    OR OLD.MatchStartDatetime IS DISTINCT FROM NEW.MatchStartDatetime
+)
 EXECUTE FUNCTION update_match_winner();
 
 -- Trigger to trigger match winner update trigger when a play is updated
@@ -979,6 +1172,724 @@ AFTER INSERT OR UPDATE OR DELETE ON Play
 FOR EACH ROW
 EXECUTE FUNCTION trigger_match_recalc_from_play();
 
+-- Statement-level versions of play_insert / play_update / play_change_recalc.
+-- They read the changed plays from transition tables and update every affected
+-- match exactly once per statement (score delta + winner recalculation through
+-- match_update), instead of once or twice per play row. These are the active set;
+-- the row-level triggers above are kept but disabled (see benchmarks/play_triggers.py).
+
+-- Every affected match gets one UPDATE: started plays whose player belonged to one
+-- of the teams at kick-off add their goals (as the row-level triggers did), and the
+-- update itself fires match_update to recalculate the winner.
+CREATE OR REPLACE FUNCTION recalc_matches_after_play_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+    WITH deltas AS (
+        SELECT np.MatchID, np.PlayerID, COALESCE(np.GoalsScored, 0) AS Goals
+        FROM new_plays np
+        WHERE np.StartTime IS NOT NULL
+    ),
+    per_match AS (
+        SELECT
+            m.MatchID,
+            SUM(CASE WHEN team.TeamID = m.HomeTeamID THEN d.Goals ELSE 0 END) AS HomeDelta,
+            SUM(CASE WHEN team.TeamID = m.AwayTeamID THEN d.Goals ELSE 0 END) AS AwayDelta
+        FROM deltas d
+        JOIN Match m ON m.MatchID = d.MatchID
+        JOIN Employed team ON team.UsersID = d.PlayerID
+                          AND team.Period @> m.MatchStartDatetime
+        GROUP BY m.MatchID
+    ),
+    affected AS (
+        SELECT DISTINCT MatchID FROM new_plays
+    )
+    UPDATE Match m
+    SET HomeTeamScore = CASE WHEN pm.MatchID IS NULL THEN m.HomeTeamScore
+                             ELSE COALESCE(m.HomeTeamScore, 0) + pm.HomeDelta END,
+        AwayTeamScore = CASE WHEN pm.MatchID IS NULL THEN m.AwayTeamScore
+                             ELSE COALESCE(m.AwayTeamScore, 0) + pm.AwayDelta END
+    FROM affected a
+    LEFT JOIN per_match pm ON pm.MatchID = a.MatchID
+    WHERE m.MatchID = a.MatchID;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION recalc_matches_after_play_update()
+RETURNS TRIGGER AS $$
+BEGIN
+    WITH deltas AS (
+        SELECT np.MatchID, np.PlayerID,
+               COALESCE(np.GoalsScored, 0) - COALESCE(op.GoalsScored, 0) AS Goals
+        FROM new_plays np
+        JOIN old_plays op ON op.PlayID = np.PlayID
+        WHERE np.StartTime IS NOT NULL
+          AND COALESCE(np.GoalsScored, 0) <> COALESCE(op.GoalsScored, 0)
+    ),
+    per_match AS (
+        SELECT
+            m.MatchID,
+            SUM(CASE WHEN team.TeamID = m.HomeTeamID THEN d.Goals ELSE 0 END) AS HomeDelta,
+            SUM(CASE WHEN team.TeamID = m.AwayTeamID THEN d.Goals ELSE 0 END) AS AwayDelta
+        FROM deltas d
+        JOIN Match m ON m.MatchID = d.MatchID
+        JOIN Employed team ON team.UsersID = d.PlayerID
+                          AND team.Period @> m.MatchStartDatetime
+        GROUP BY m.MatchID
+    ),
+    affected AS (
+        SELECT MatchID FROM new_plays
+        UNION
+        SELECT MatchID FROM old_plays
+    )
+    UPDATE Match m
+    SET HomeTeamScore = CASE WHEN pm.MatchID IS NULL THEN m.HomeTeamScore
+                             ELSE COALESCE(m.HomeTeamScore, 0) + pm.HomeDelta END,
+        AwayTeamScore = CASE WHEN pm.MatchID IS NULL THEN m.AwayTeamScore
+                             ELSE COALESCE(m.AwayTeamScore, 0) + pm.AwayDelta END
+    FROM affected a
+    LEFT JOIN per_match pm ON pm.MatchID = a.MatchID
+    WHERE m.MatchID = a.MatchID;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- deleting plays never changed scores; only the winner is recalculated
+CREATE OR REPLACE FUNCTION recalc_matches_after_play_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE Match
+    SET MatchID = MatchID
+    WHERE MatchID IN (SELECT MatchID FROM old_plays);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER play_insert_stmt
+AFTER INSERT ON Play
+REFERENCING NEW TABLE AS new_plays
+FOR EACH STATEMENT
+EXECUTE FUNCTION recalc_matches_after_play_insert();
+
+CREATE TRIGGER play_update_stmt
+AFTER UPDATE ON Play
+REFERENCING OLD TABLE AS old_plays NEW TABLE AS new_plays
+FOR EACH STATEMENT
+EXECUTE FUNCTION recalc_matches_after_play_update();
+
+CREATE TRIGGER play_delete_stmt
+AFTER DELETE ON Play
+REFERENCING OLD TABLE AS old_plays
+FOR EACH STATEMENT
+EXECUTE FUNCTION recalc_matches_after_play_delete();
+
+ALTER TABLE Play DISABLE TRIGGER play_insert;
+ALTER TABLE Play DISABLE TRIGGER play_update;
+ALTER TABLE Play DISABLE TRIGGER play_change_recalc;
+
+-- standings maintenance ------------------------------------------------------
+-- Adds (p_sign = 1) or removes (p_sign = -1) one scored match result for one team.
+-- Unscored matches do not count towards the standings.
+CREATE OR REPLACE FUNCTION apply_standing_delta(
+    p_league_id INT,
+    p_season_no INT,
+    p_season_year DATE,
+    p_team_id INT,
+    p_team_name VARCHAR,
+    p_goals_for INT,
+    p_goals_against INT,
+    p_sign INT
+)
+RETURNS VOID AS $$
+DECLARE
+    v_win INT := CASE WHEN p_goals_for > p_goals_against THEN 1 ELSE 0 END;
+    v_draw INT := CASE WHEN p_goals_for = p_goals_against THEN 1 ELSE 0 END;
+    v_loss INT := CASE WHEN p_goals_for < p_goals_against THEN 1 ELSE 0 END;
+BEGIN
+    IF p_goals_for IS NULL OR p_goals_against IS NULL THEN
+        RETURN;
+    END IF;
+
+    IF p_sign > 0 THEN
+        INSERT INTO TeamSeasonStanding (
+            LeagueID, SeasonNo, SeasonYear, TeamID, TeamName,
+            Played, Wins, Draws, Losses, GoalsFor, GoalsAgainst, Points
+        )
+        VALUES (
+            p_league_id, p_season_no, p_season_year, p_team_id, p_team_name,
+            1, v_win, v_draw, v_loss, p_goals_for, p_goals_against, 3 * v_win + v_draw
+        )
+        ON CONFLICT (LeagueID, SeasonNo, SeasonYear, TeamID) DO UPDATE
+        SET TeamName = EXCLUDED.TeamName,
+            Played = TeamSeasonStanding.Played + 1,
+            Wins = TeamSeasonStanding.Wins + EXCLUDED.Wins,
+            Draws = TeamSeasonStanding.Draws + EXCLUDED.Draws,
+            Losses = TeamSeasonStanding.Losses + EXCLUDED.Losses,
+            GoalsFor = TeamSeasonStanding.GoalsFor + EXCLUDED.GoalsFor,
+            GoalsAgainst = TeamSeasonStanding.GoalsAgainst + EXCLUDED.GoalsAgainst,
+            Points = TeamSeasonStanding.Points + EXCLUDED.Points;
+    ELSE
+        -- the row may already be gone when a season is being deleted
+        UPDATE TeamSeasonStanding
+        SET Played = Played - 1,
+            Wins = Wins - v_win,
+            Draws = Draws - v_draw,
+            Losses = Losses - v_loss,
+            GoalsFor = GoalsFor - p_goals_for,
+            GoalsAgainst = GoalsAgainst - p_goals_against,
+            Points = Points - (3 * v_win + v_draw)
+        WHERE LeagueID = p_league_id
+          AND SeasonNo = p_season_no
+          AND SeasonYear = p_season_year
+          AND TeamID = p_team_id;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION apply_match_standing(
+    p_league_id INT,
+    p_season_no INT,
+    p_season_year DATE,
+    p_match Match,
+    p_sign INT
+)
+RETURNS VOID AS $$
+BEGIN
+    PERFORM apply_standing_delta(
+        p_league_id, p_season_no, p_season_year,
+        p_match.HomeTeamID, p_match.HomeTeamName,
+        p_match.HomeTeamScore, p_match.AwayTeamScore, p_sign
+    );
+    PERFORM apply_standing_delta(
+        p_league_id, p_season_no, p_season_year,
+        p_match.AwayTeamID, p_match.AwayTeamName,
+        p_match.AwayTeamScore, p_match.HomeTeamScore, p_sign
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+-- score or team change on a seasonal match: take the old result out, put the new one in
+CREATE OR REPLACE FUNCTION standings_on_match_update()
+RETURNS TRIGGER AS $$
+DECLARE
+    sm RECORD;
+BEGIN
+    SELECT LeagueID, SeasonNo, SeasonYear INTO sm
+    FROM SeasonalMatch
+    WHERE MatchID = NEW.MatchID;
+
+    IF NOT FOUND THEN
+        RETURN NULL;
+    END IF;
+
+    PERFORM apply_match_standing(sm.LeagueID, sm.SeasonNo, sm.SeasonYear, OLD, -1);
+    PERFORM apply_match_standing(sm.LeagueID, sm.SeasonNo, sm.SeasonYear, NEW, 1);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_standings_match_update
+AFTER UPDATE ON Match
+FOR EACH ROW
+WHEN (
+    OLD.HomeTeamScore IS DISTINCT FROM NEW.HomeTeamScore
+    OR OLD.AwayTeamScore IS DISTINCT FROM NEW.AwayTeamScore
+    OR OLD.HomeTeamID IS DISTINCT FROM NEW.HomeTeamID
+    OR OLD.AwayTeamID IS DISTINCT FROM NEW.AwayTeamID
+)
+EXECUTE FUNCTION standings_on_match_update();
+
+-- the SeasonalMatch row is removed by cascade after the Match row is gone, so the
+-- result has to be taken out while the match is still readable
+CREATE OR REPLACE FUNCTION standings_on_match_delete()
+RETURNS TRIGGER AS $$
+DECLARE
+    sm RECORD;
+BEGIN
+    SELECT LeagueID, SeasonNo, SeasonYear INTO sm
+    FROM SeasonalMatch
+    WHERE MatchID = OLD.MatchID;
+
+    IF FOUND THEN
+        PERFORM apply_match_standing(sm.LeagueID, sm.SeasonNo, sm.SeasonYear, OLD, -1);
+    END IF;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_standings_match_delete
+BEFORE DELETE ON Match
+FOR EACH ROW
+EXECUTE FUNCTION standings_on_match_delete();
+
+-- a match joining, leaving or moving between seasons
+CREATE OR REPLACE FUNCTION standings_on_seasonal_match_change()
+RETURNS TRIGGER AS $$
+DECLARE
+    m Match%ROWTYPE;
+BEGIN
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        SELECT * INTO m FROM Match WHERE MatchID = OLD.MatchID;
+        -- not found: the match itself is being deleted, trg_standings_match_delete handled it
+        IF FOUND THEN
+            PERFORM apply_match_standing(OLD.LeagueID, OLD.SeasonNo, OLD.SeasonYear, m, -1);
+        END IF;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT * INTO m FROM Match WHERE MatchID = NEW.MatchID;
+        IF FOUND THEN
+            PERFORM apply_match_standing(NEW.LeagueID, NEW.SeasonNo, NEW.SeasonYear, m, 1);
+        END IF;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_standings_seasonal_match
+AFTER INSERT OR UPDATE OR DELETE ON SeasonalMatch
+FOR EACH ROW
+EXECUTE FUNCTION standings_on_seasonal_match_change();
+
+-- recompute every standing from scratch (repair / backfill)
+CREATE OR REPLACE FUNCTION rebuild_team_season_standings()
+RETURNS INT AS $$
+DECLARE
+    v_rows INT;
+BEGIN
+    DELETE FROM TeamSeasonStanding;
+
+    INSERT INTO TeamSeasonStanding (
+        LeagueID, SeasonNo, SeasonYear, TeamID, TeamName,
+        Played, Wins, Draws, Losses, GoalsFor, GoalsAgainst, Points
+    )
+    SELECT
+        sm.LeagueID,
+        sm.SeasonNo,
+        sm.SeasonYear,
+        side.TeamID,
+        (ARRAY_AGG(side.TeamName ORDER BY m.MatchStartDatetime DESC))[1],
+        COUNT(*),
+        COUNT(*) FILTER (WHERE side.GoalsFor > side.GoalsAgainst),
+        COUNT(*) FILTER (WHERE side.GoalsFor = side.GoalsAgainst),
+        COUNT(*) FILTER (WHERE side.GoalsFor < side.GoalsAgainst),
+        SUM(side.GoalsFor),
+        SUM(side.GoalsAgainst),
+        3 * COUNT(*) FILTER (WHERE side.GoalsFor > side.GoalsAgainst)
+            + COUNT(*) FILTER (WHERE side.GoalsFor = side.GoalsAgainst)
+    FROM Match m
+    JOIN SeasonalMatch sm ON sm.MatchID = m.MatchID
+    CROSS JOIN LATERAL (
+        VALUES
+            (m.HomeTeamID, m.HomeTeamName, m.HomeTeamScore, m.AwayTeamScore),
+            (m.AwayTeamID, m.AwayTeamName, m.AwayTeamScore, m.HomeTeamScore)
+    ) AS side(TeamID, TeamName, GoalsFor, GoalsAgainst)
+    WHERE m.HomeTeamScore IS NOT NULL
+      AND m.AwayTeamScore IS NOT NULL
+    GROUP BY sm.LeagueID, sm.SeasonNo, sm.SeasonYear, side.TeamID;
+
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    RETURN v_rows;
+END;
+$$ LANGUAGE plpgsql;
+
+-- materialized player statistics -------------------------------------------
+-- Recomputes every statistics row of the given players (NULL = everyone).
+CREATE OR REPLACE FUNCTION refresh_player_stats_for(p_players INT[])
+RETURNS VOID AS $$
+BEGIN
+    DELETE FROM PlayerStatsAllMat WHERE p_players IS NULL OR UsersID = ANY(p_players);
+    DELETE FROM PlayerSeasonStatsMat WHERE p_players IS NULL OR UsersID = ANY(p_players);
+    DELETE FROM PlayerTournamentStatsMat WHERE p_players IS NULL OR UsersID = ANY(p_players);
+
+    INSERT INTO PlayerStatsAllMat (
+        UsersID,
+        total_appearances, total_goals, total_penalties, total_minutes,
+        total_yellowcards, total_redcards, total_saves,
+        total_successfulpasses, total_totalpasses, total_assistsmade
+    )
+    SELECT
+        P1.PlayerID,
+        COUNT(DISTINCT P1.MatchID),
+        SUM(P1.GoalsScored),
+        SUM(P1.PenaltiesScored),
+        SUM(COALESCE(P1.StopTime, 0) - COALESCE(P1.StartTime, 0)) / 60,
+        SUM(P1.YellowCards),
+        SUM(P1.RedCards),
+        SUM(P1.Saves),
+        SUM(P1.SuccessfulPasses),
+        SUM(P1.TotalPasses),
+        SUM(P1.AssistsMade)
+    FROM Play P1
+    JOIN Match M1 ON M1.MatchID = P1.MatchID
+    WHERE p_players IS NULL OR P1.PlayerID = ANY(p_players)
+    GROUP BY P1.PlayerID;
+
+    INSERT INTO PlayerSeasonStatsMat (
+        UsersID, LeagueID, SeasonNo, SeasonYear,
+        total_appearances, total_goals, total_penalties, total_minutes,
+        total_yellowcards, total_redcards, total_saves,
+        total_successfulpasses, total_totalpasses, total_assistsmade
+    )
+    SELECT
+        P1.PlayerID,
+        SMa1.LeagueID,
+        SMa1.SeasonNo,
+        SMa1.SeasonYear,
+        COUNT(DISTINCT P1.MatchID),
+        SUM(P1.GoalsScored),
+        SUM(P1.PenaltiesScored),
+        SUM(COALESCE(P1.StopTime, 0) - COALESCE(P1.StartTime, 0)) / 60,
+        SUM(P1.YellowCards),
+        SUM(P1.RedCards),
+        SUM(P1.Saves),
+        SUM(P1.SuccessfulPasses),
+        SUM(P1.TotalPasses),
+        SUM(P1.AssistsMade)
+    FROM SeasonalMatch SMa1
+    JOIN Play P1 ON P1.MatchID = SMa1.MatchID
+    WHERE p_players IS NULL OR P1.PlayerID = ANY(p_players)
+    GROUP BY P1.PlayerID, SMa1.LeagueID, SMa1.SeasonNo, SMa1.SeasonYear;
+
+    INSERT INTO PlayerTournamentStatsMat (
+        UsersID, TournamentID,
+        total_appearances, total_goals, total_penalties, total_minutes,
+        total_yellowcards, total_redcards, total_saves,
+        total_successfulpasses, total_totalpasses, total_assistsmade
+    )
+    SELECT
+        P1.PlayerID,
+        R1.TournamentID,
+        COUNT(DISTINCT P1.MatchID),
+        SUM(P1.GoalsScored),
+        SUM(P1.PenaltiesScored),
+        SUM(COALESCE(P1.StopTime, 0) - COALESCE(P1.StartTime, 0)) / 60,
+        SUM(P1.YellowCards),
+        SUM(P1.RedCards),
+        SUM(P1.Saves),
+        SUM(P1.SuccessfulPasses),
+        SUM(P1.TotalPasses),
+        SUM(P1.AssistsMade)
+    FROM TournamentMatch TM1
+    JOIN Round R1 ON R1.T_MatchID = TM1.MatchID
+    JOIN Play P1 ON P1.MatchID = TM1.MatchID
+    WHERE p_players IS NULL OR P1.PlayerID = ANY(p_players)
+    GROUP BY P1.PlayerID, R1.TournamentID;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Drains up to p_limit queued players (NULL = all). Returns how many were refreshed.
+CREATE OR REPLACE FUNCTION refresh_player_stats(p_limit INT DEFAULT NULL)
+RETURNS INT AS $$
+DECLARE
+    v_players INT[];
+BEGIN
+    WITH picked AS (
+        SELECT PlayerID
+        FROM PlayerStatsDirty
+        ORDER BY QueuedAt
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    ),
+    dequeued AS (
+        DELETE FROM PlayerStatsDirty d
+        USING picked
+        WHERE d.PlayerID = picked.PlayerID
+        RETURNING d.PlayerID
+    )
+    SELECT ARRAY_AGG(PlayerID) INTO v_players FROM dequeued;
+
+    IF v_players IS NULL THEN
+        RETURN 0;
+    END IF;
+
+    PERFORM refresh_player_stats_for(v_players);
+    RETURN CARDINALITY(v_players);
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION rebuild_player_stats()
+RETURNS VOID AS $$
+BEGIN
+    DELETE FROM PlayerStatsDirty;
+    PERFORM refresh_player_stats_for(NULL);
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION enqueue_player_stats(p_players INT[])
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO PlayerStatsDirty (PlayerID)
+    SELECT DISTINCT UNNEST(p_players)
+    ON CONFLICT (PlayerID) DO NOTHING;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION enqueue_player_stats_from_new_plays()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM enqueue_player_stats(ARRAY(SELECT PlayerID FROM new_plays));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION enqueue_player_stats_from_changed_plays()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM enqueue_player_stats(ARRAY(
+        SELECT PlayerID FROM new_plays UNION SELECT PlayerID FROM old_plays
+    ));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION enqueue_player_stats_from_old_plays()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM enqueue_player_stats(ARRAY(SELECT PlayerID FROM old_plays));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_player_stats_play_insert
+AFTER INSERT ON Play
+REFERENCING NEW TABLE AS new_plays
+FOR EACH STATEMENT
+EXECUTE FUNCTION enqueue_player_stats_from_new_plays();
+
+CREATE TRIGGER trg_player_stats_play_update
+AFTER UPDATE ON Play
+REFERENCING OLD TABLE AS old_plays NEW TABLE AS new_plays
+FOR EACH STATEMENT
+EXECUTE FUNCTION enqueue_player_stats_from_changed_plays();
+
+CREATE TRIGGER trg_player_stats_play_delete
+AFTER DELETE ON Play
+REFERENCING OLD TABLE AS old_plays
+FOR EACH STATEMENT
+EXECUTE FUNCTION enqueue_player_stats_from_old_plays();
+
+-- a match joining/leaving a season or a tournament round changes which rows its plays count towards
+CREATE OR REPLACE FUNCTION enqueue_player_stats_from_match_link()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_matches INT[];
+BEGIN
+    IF TG_TABLE_NAME = 'round' THEN
+        v_matches := ARRAY[
+            CASE WHEN TG_OP <> 'INSERT' THEN OLD.T_MatchID END,
+            CASE WHEN TG_OP <> 'DELETE' THEN NEW.T_MatchID END
+        ];
+    ELSE
+        v_matches := ARRAY[
+            CASE WHEN TG_OP <> 'INSERT' THEN OLD.MatchID END,
+            CASE WHEN TG_OP <> 'DELETE' THEN NEW.MatchID END
+        ];
+    END IF;
+
+    PERFORM enqueue_player_stats(ARRAY(
+        SELECT PlayerID FROM Play WHERE MatchID = ANY(v_matches)
+    ));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_player_stats_seasonal_match
+AFTER INSERT OR UPDATE OR DELETE ON SeasonalMatch
+FOR EACH ROW
+EXECUTE FUNCTION enqueue_player_stats_from_match_link();
+
+CREATE TRIGGER trg_player_stats_round
+AFTER INSERT OR DELETE OR UPDATE OF T_MatchID, TournamentID ON Round
+FOR EACH ROW
+EXECUTE FUNCTION enqueue_player_stats_from_match_link();
+
+-- expired-injury sweep: an edit can move a RecoveryDate back to a day that was
+-- already swept, and a delete can leave an older, healed injury as the latest one
+CREATE OR REPLACE FUNCTION enqueue_injury_recheck()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO InjuryRecheck (PlayerID) VALUES (OLD.PlayerID)
+    ON CONFLICT (PlayerID) DO NOTHING;
+    IF TG_OP = 'UPDATE' AND NEW.PlayerID IS DISTINCT FROM OLD.PlayerID THEN
+        INSERT INTO InjuryRecheck (PlayerID) VALUES (NEW.PlayerID)
+        ON CONFLICT (PlayerID) DO NOTHING;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_injury_recheck
+AFTER DELETE OR UPDATE OF PlayerID, InjuryDate, RecoveryDate ON Injury
+FOR EACH ROW
+EXECUTE FUNCTION enqueue_injury_recheck();
+
+-- ===== Match catalog =====
+-- MatchCatalog mirrors each Match with its league season or tournament round already
+-- joined in. sync_match_catalog() rebuilds the rows of the given matches from the base
+-- tables; the triggers below call it whenever a match or one of its links changes.
+CREATE OR REPLACE FUNCTION sync_match_catalog(p_match_ids INT[])
+RETURNS VOID AS $$
+BEGIN
+    DELETE FROM MatchCatalog mc
+    WHERE mc.MatchID = ANY(p_match_ids)
+      AND NOT EXISTS (SELECT 1 FROM Match m WHERE m.MatchID = mc.MatchID);
+
+    INSERT INTO MatchCatalog (
+        MatchID, CompetitionType, CompetitionID, CompetitionName,
+        LeagueID, SeasonNo, SeasonYear, TournamentID, RoundNo,
+        HomeTeamID, AwayTeamID, HomeTeamName, AwayTeamName,
+        HomeTeamScore, AwayTeamScore, WinnerTeam, IsLocked,
+        MatchStartDatetime, MatchEndDatetime
+    )
+    SELECT m.MatchID,
+           CASE
+               WHEN tm.MatchID IS NOT NULL THEN 'tournament'
+               WHEN sm.MatchID IS NOT NULL THEN 'league'
+               ELSE 'unknown'
+           END,
+           CASE WHEN tm.MatchID IS NOT NULL THEN r.TournamentID ELSE sm.LeagueID END,
+           CASE WHEN tm.MatchID IS NOT NULL THEN t.Name ELSE l.Name END,
+           sm.LeagueID, sm.SeasonNo, sm.SeasonYear, r.TournamentID, r.RoundNo,
+           m.HomeTeamID, m.AwayTeamID, m.HomeTeamName, m.AwayTeamName,
+           m.HomeTeamScore, m.AwayTeamScore, m.WinnerTeam, m.IsLocked,
+           m.MatchStartDatetime, m.MatchEndDatetime
+    FROM Match m
+    LEFT JOIN SeasonalMatch sm ON sm.MatchID = m.MatchID
+    LEFT JOIN League l ON l.LeagueID = sm.LeagueID
+    LEFT JOIN TournamentMatch tm ON tm.MatchID = m.MatchID
+    LEFT JOIN Round r ON r.T_MatchID = m.MatchID
+    LEFT JOIN Tournament t ON t.TournamentID = r.TournamentID
+    WHERE m.MatchID = ANY(p_match_ids)
+    ON CONFLICT (MatchID) DO UPDATE
+    SET CompetitionType = EXCLUDED.CompetitionType,
+        CompetitionID = EXCLUDED.CompetitionID,
+        CompetitionName = EXCLUDED.CompetitionName,
+        LeagueID = EXCLUDED.LeagueID,
+        SeasonNo = EXCLUDED.SeasonNo,
+        SeasonYear = EXCLUDED.SeasonYear,
+        TournamentID = EXCLUDED.TournamentID,
+        RoundNo = EXCLUDED.RoundNo,
+        HomeTeamID = EXCLUDED.HomeTeamID,
+        AwayTeamID = EXCLUDED.AwayTeamID,
+        HomeTeamName = EXCLUDED.HomeTeamName,
+        AwayTeamName = EXCLUDED.AwayTeamName,
+        HomeTeamScore = EXCLUDED.HomeTeamScore,
+        AwayTeamScore = EXCLUDED.AwayTeamScore,
+        WinnerTeam = EXCLUDED.WinnerTeam,
+        IsLocked = EXCLUDED.IsLocked,
+        MatchStartDatetime = EXCLUDED.MatchStartDatetime,
+        MatchEndDatetime = EXCLUDED.MatchEndDatetime;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION match_catalog_from_new_matches()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM sync_match_catalog(ARRAY(SELECT MatchID FROM new_matches));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- score, lock and schedule changes only touch Match's own columns, so no re-join
+CREATE OR REPLACE FUNCTION match_catalog_from_updated_matches()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE MatchCatalog mc
+    SET HomeTeamID = nm.HomeTeamID,
+        AwayTeamID = nm.AwayTeamID,
+        HomeTeamName = nm.HomeTeamName,
+        AwayTeamName = nm.AwayTeamName,
+        HomeTeamScore = nm.HomeTeamScore,
+        AwayTeamScore = nm.AwayTeamScore,
+        WinnerTeam = nm.WinnerTeam,
+        IsLocked = nm.IsLocked,
+        MatchStartDatetime = nm.MatchStartDatetime,
+        MatchEndDatetime = nm.MatchEndDatetime
+    FROM new_matches nm
+    WHERE mc.MatchID = nm.MatchID
+      AND (mc.HomeTeamID, mc.AwayTeamID, mc.HomeTeamName, mc.AwayTeamName, mc.HomeTeamScore,
+           mc.AwayTeamScore, mc.WinnerTeam, mc.IsLocked, mc.MatchStartDatetime, mc.MatchEndDatetime)
+          IS DISTINCT FROM
+          (nm.HomeTeamID, nm.AwayTeamID, nm.HomeTeamName, nm.AwayTeamName, nm.HomeTeamScore,
+           nm.AwayTeamScore, nm.WinnerTeam, nm.IsLocked, nm.MatchStartDatetime, nm.MatchEndDatetime);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_match_catalog_match_insert
+AFTER INSERT ON Match
+REFERENCING NEW TABLE AS new_matches
+FOR EACH STATEMENT
+EXECUTE FUNCTION match_catalog_from_new_matches();
+
+CREATE TRIGGER trg_match_catalog_match_update
+AFTER UPDATE ON Match
+REFERENCING NEW TABLE AS new_matches
+FOR EACH STATEMENT
+EXECUTE FUNCTION match_catalog_from_updated_matches();
+
+-- a match joining/leaving a season, a tournament or a round changes its competition
+CREATE OR REPLACE FUNCTION match_catalog_from_match_link()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'round' THEN
+        PERFORM sync_match_catalog(ARRAY[
+            CASE WHEN TG_OP <> 'INSERT' THEN OLD.T_MatchID END,
+            CASE WHEN TG_OP <> 'DELETE' THEN NEW.T_MatchID END
+        ]);
+    ELSE
+        PERFORM sync_match_catalog(ARRAY[
+            CASE WHEN TG_OP <> 'INSERT' THEN OLD.MatchID END,
+            CASE WHEN TG_OP <> 'DELETE' THEN NEW.MatchID END
+        ]);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_match_catalog_seasonal_match
+AFTER INSERT OR UPDATE OR DELETE ON SeasonalMatch
+FOR EACH ROW
+EXECUTE FUNCTION match_catalog_from_match_link();
+
+CREATE TRIGGER trg_match_catalog_tournament_match
+AFTER INSERT OR DELETE ON TournamentMatch
+FOR EACH ROW
+EXECUTE FUNCTION match_catalog_from_match_link();
+
+CREATE TRIGGER trg_match_catalog_round
+AFTER INSERT OR DELETE OR UPDATE OF T_MatchID, TournamentID ON Round
+FOR EACH ROW
+EXECUTE FUNCTION match_catalog_from_match_link();
+
+CREATE OR REPLACE FUNCTION match_catalog_from_competition_name()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'league' THEN
+        UPDATE MatchCatalog
+        SET CompetitionName = NEW.Name
+        WHERE CompetitionType = 'league' AND LeagueID = NEW.LeagueID;
+    ELSE
+        UPDATE MatchCatalog
+        SET CompetitionName = NEW.Name
+        WHERE CompetitionType = 'tournament' AND TournamentID = NEW.TournamentID;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_match_catalog_league_name
+AFTER UPDATE OF Name ON League
+FOR EACH ROW
+EXECUTE FUNCTION match_catalog_from_competition_name();
+
+CREATE TRIGGER trg_match_catalog_tournament_name
+AFTER UPDATE OF Name ON Tournament
+FOR EACH ROW
+EXECUTE FUNCTION match_catalog_from_competition_name();
+
 -- trigger to update a player's employment after accepting an offer ----------
 CREATE OR REPLACE FUNCTION handle_accepted_transfer_offer()
 RETURNS TRIGGER AS $$
@@ -1139,6 +2050,68 @@ AFTER INSERT ON Employed
 FOR EACH ROW
 EXECUTE FUNCTION handle_employment_start();
 
+-- ===== Employment periods =====
+-- Employed.Period mirrors [StartDate, EndDate) of its Employment row so that
+-- "which team was this player on at time T" is a GiST lookup (Period @> T), and
+-- overlapping contracts for the same employee are rejected by
+-- employed_no_overlapping_contracts. The bound is half-open so a contract ended at
+-- NOW() and one started at NOW() (transfers, coach moves) do not overlap.
+-- A contract ended before it started becomes an empty range.
+CREATE OR REPLACE FUNCTION employment_period(p_start TIMESTAMP, p_end TIMESTAMP)
+RETURNS TSRANGE AS $$
+    SELECT tsrange(p_start, GREATEST(p_start, p_end), '[)');
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION set_employed_period()
+RETURNS TRIGGER AS $$
+BEGIN
+    SELECT employment_period(e.StartDate, e.EndDate)
+    INTO NEW.Period
+    FROM Employment e
+    WHERE e.EmploymentID = NEW.EmploymentID;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_employed_period
+BEFORE INSERT OR UPDATE OF EmploymentID ON Employed
+FOR EACH ROW
+EXECUTE FUNCTION set_employed_period();
+
+CREATE OR REPLACE FUNCTION sync_employed_period()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE Employed
+    SET Period = employment_period(NEW.StartDate, NEW.EndDate)
+    WHERE EmploymentID = NEW.EmploymentID;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_employment_period_sync
+AFTER UPDATE OF StartDate, EndDate ON Employment
+FOR EACH ROW
+EXECUTE FUNCTION sync_employed_period();
+
+-- team of one employee at a point in time (NULL when not employed then)
+CREATE OR REPLACE FUNCTION team_at(p_user INT, p_at TIMESTAMP)
+RETURNS INT AS $$
+    SELECT TeamID
+    FROM Employed
+    WHERE UsersID = p_user
+      AND Period @> p_at;
+$$ LANGUAGE sql STABLE;
+
+-- bulk version: one row per (user, time) pair given as parallel arrays, in input order
+CREATE OR REPLACE FUNCTION teams_at(p_users INT[], p_times TIMESTAMP[])
+RETURNS TABLE (Ord BIGINT, UsersID INT, AtTime TIMESTAMP, TeamID INT) AS $$
+    SELECT q.Ord, q.UsersID, q.AtTime, em.TeamID
+    FROM unnest(p_users, p_times) WITH ORDINALITY AS q (UsersID, AtTime, Ord)
+    LEFT JOIN Employed em ON em.UsersID = q.UsersID
+                         AND em.Period @> q.AtTime
+    ORDER BY q.Ord;
+$$ LANGUAGE sql STABLE;
+
 -- ===== TRIGGER: Set training attendance to Status=2 (Injured) when injury is added =====
 CREATE OR REPLACE FUNCTION set_training_status_on_injury_insert()
 RETURNS TRIGGER AS $$
@@ -1288,6 +2261,217 @@ FOR EACH ROW
 WHEN (NEW.SessionDate <= NOW())
 EXECUTE FUNCTION auto_mark_training_skipped();
 
+-- ===== Cache invalidation bus =====
+-- every write to a table the app caches in process (app/cache_bus.py), including
+-- writes made by other triggers, sends 'table:key' on the cache_invalidation
+-- channel when its transaction commits; a second trigger argument replaces the
+-- table name in the payload
+CREATE OR REPLACE FUNCTION notify_cache_change()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_row JSONB;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        v_row := to_jsonb(OLD);
+    ELSE
+        v_row := to_jsonb(NEW);
+    END IF;
+    -- identical payloads are sent once per transaction, so bulk writes stay cheap
+    PERFORM pg_notify(
+        'cache_invalidation',
+        COALESCE(TG_ARGV[1], lower(TG_TABLE_NAME)) || ':' || COALESCE(v_row ->> lower(TG_ARGV[0]), '')
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_cache_notify_league
+AFTER INSERT OR UPDATE OR DELETE ON League
+FOR EACH ROW
+EXECUTE FUNCTION notify_cache_change('LeagueID');
+
+CREATE TRIGGER trg_cache_notify_season
+AFTER INSERT OR UPDATE OR DELETE ON Season
+FOR EACH ROW
+EXECUTE FUNCTION notify_cache_change('LeagueID');
+
+-- BracketVersion moves on every bracket match change; only the columns the
+-- dropdown caches read notify 'tournament', and BracketVersion bumps are sent as
+-- 'bracket', which only bracket.py listens to
+CREATE TRIGGER trg_cache_notify_tournament
+AFTER INSERT OR DELETE OR UPDATE OF Name, Size ON Tournament
+FOR EACH ROW
+EXECUTE FUNCTION notify_cache_change('TournamentID');
+
+CREATE TRIGGER trg_cache_notify_bracket
+AFTER UPDATE OF BracketVersion ON Tournament
+FOR EACH ROW
+EXECUTE FUNCTION notify_cache_change('TournamentID', 'bracket');
+
+CREATE TRIGGER trg_cache_notify_team
+AFTER INSERT OR UPDATE OR DELETE ON Team
+FOR EACH ROW
+EXECUTE FUNCTION notify_cache_change('TeamID');
+
+CREATE TRIGGER trg_cache_notify_users
+AFTER INSERT OR DELETE OR UPDATE OF FirstName, LastName, Nationality, Role ON Users
+FOR EACH ROW
+EXECUTE FUNCTION notify_cache_change('UsersID');
+
+CREATE TRIGGER trg_cache_notify_player
+AFTER INSERT OR DELETE OR UPDATE OF Position ON Player
+FOR EACH ROW
+EXECUTE FUNCTION notify_cache_change('UsersID');
+
+-- Employee.TeamID is moved by handle_accepted_transfer_offer as well as by the app
+CREATE TRIGGER trg_cache_notify_employee
+AFTER INSERT OR DELETE OR UPDATE OF TeamID ON Employee
+FOR EACH ROW
+EXECUTE FUNCTION notify_cache_change('UsersID');
+
+-- ===== Data revisions =====
+-- bumped whenever rankings, standings, brackets or player stats of a league or
+-- tournament change; app/revision.py turns them into ETags
+CREATE OR REPLACE FUNCTION bump_data_revision(p_scope TEXT, p_ids INT[])
+RETURNS VOID AS $$
+    -- ids in order, so concurrent bumps lock the rows in the same order
+    INSERT INTO DataRevision (Scope, ScopeID, Revision)
+    SELECT p_scope, ids.id, nextval('data_revision_seq')
+    FROM (SELECT DISTINCT unnest(p_ids) AS id) ids
+    WHERE ids.id IS NOT NULL
+    ORDER BY ids.id
+    ON CONFLICT (Scope, ScopeID) DO UPDATE SET Revision = EXCLUDED.Revision;
+$$ LANGUAGE sql;
+
+-- Match updates; every Play statement updates its matches, so Play changes count too
+CREATE OR REPLACE FUNCTION bump_data_revision_from_matches()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM bump_data_revision('league', ARRAY(
+        SELECT sm.LeagueID
+        FROM SeasonalMatch sm
+        WHERE sm.MatchID IN (SELECT MatchID FROM changed_rows)
+    ));
+    PERFORM bump_data_revision('tournament', ARRAY(
+        SELECT r.TournamentID
+        FROM Round r
+        WHERE r.T_MatchID IN (SELECT MatchID FROM changed_rows)
+    ));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- any table with a LeagueID column (SeasonalMatch, PlayerSeasonStatsMat)
+CREATE OR REPLACE FUNCTION bump_data_revision_from_leagues()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM bump_data_revision('league', ARRAY(SELECT LeagueID FROM changed_rows));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- any table with a TournamentID column (Round, PlayerTournamentStatsMat)
+CREATE OR REPLACE FUNCTION bump_data_revision_from_tournaments()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM bump_data_revision('tournament', ARRAY(SELECT TournamentID FROM changed_rows));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- single rows of League, Season, Tournament and TournamentModeration:
+-- TG_ARGV[0] is the scope, TG_ARGV[1] the column holding its id
+CREATE OR REPLACE FUNCTION bump_data_revision_row()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_row JSONB;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        v_row := to_jsonb(OLD);
+    ELSE
+        v_row := to_jsonb(NEW);
+    END IF;
+    PERFORM bump_data_revision(TG_ARGV[0], ARRAY[(v_row ->> lower(TG_ARGV[1]))::INT]);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_data_revision_match
+AFTER UPDATE ON Match
+REFERENCING NEW TABLE AS changed_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_data_revision_from_matches();
+
+CREATE TRIGGER trg_data_revision_seasonal_match_insert
+AFTER INSERT ON SeasonalMatch
+REFERENCING NEW TABLE AS changed_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_data_revision_from_leagues();
+
+CREATE TRIGGER trg_data_revision_seasonal_match_delete
+AFTER DELETE ON SeasonalMatch
+REFERENCING OLD TABLE AS changed_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_data_revision_from_leagues();
+
+CREATE TRIGGER trg_data_revision_round_update
+AFTER UPDATE ON Round
+REFERENCING NEW TABLE AS changed_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_data_revision_from_tournaments();
+
+CREATE TRIGGER trg_data_revision_round_delete
+AFTER DELETE ON Round
+REFERENCING OLD TABLE AS changed_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_data_revision_from_tournaments();
+
+-- refresh_player_stats() replaces a player's rows with a DELETE and an INSERT
+CREATE TRIGGER trg_data_revision_season_stats_insert
+AFTER INSERT ON PlayerSeasonStatsMat
+REFERENCING NEW TABLE AS changed_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_data_revision_from_leagues();
+
+CREATE TRIGGER trg_data_revision_season_stats_delete
+AFTER DELETE ON PlayerSeasonStatsMat
+REFERENCING OLD TABLE AS changed_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_data_revision_from_leagues();
+
+CREATE TRIGGER trg_data_revision_tournament_stats_insert
+AFTER INSERT ON PlayerTournamentStatsMat
+REFERENCING NEW TABLE AS changed_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_data_revision_from_tournaments();
+
+CREATE TRIGGER trg_data_revision_tournament_stats_delete
+AFTER DELETE ON PlayerTournamentStatsMat
+REFERENCING OLD TABLE AS changed_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_data_revision_from_tournaments();
+
+CREATE TRIGGER trg_data_revision_league
+AFTER INSERT OR DELETE OR UPDATE OF Name ON League
+FOR EACH ROW
+EXECUTE FUNCTION bump_data_revision_row('league', 'LeagueID');
+
+CREATE TRIGGER trg_data_revision_season
+AFTER INSERT OR UPDATE OR DELETE ON Season
+FOR EACH ROW
+EXECUTE FUNCTION bump_data_revision_row('league', 'LeagueID');
+
+CREATE TRIGGER trg_data_revision_tournament
+AFTER INSERT OR DELETE OR UPDATE OF Name, Size ON Tournament
+FOR EACH ROW
+EXECUTE FUNCTION bump_data_revision_row('tournament', 'TournamentID');
+
+-- an admin's tournament list depends on who moderates what
+CREATE TRIGGER trg_data_revision_tournament_moderation
+AFTER INSERT OR UPDATE OR DELETE ON TournamentModeration
+FOR EACH ROW
+EXECUTE FUNCTION bump_data_revision_row('tournament', 'T_ID');
+
 
 
 -- sample data ---------------------------------------------------------------
@@ -1986,3 +3170,6 @@ VALUES
 ((SELECT LeagueID FROM League WHERE Name = 'Premier Test League'), (SELECT TeamID FROM Team WHERE TeamName = 'Blue Knights')),
 ((SELECT LeagueID FROM League WHERE Name = 'Ancient League'), (SELECT TeamID FROM Team WHERE TeamName = 'Spartans FC')),
 ((SELECT LeagueID FROM League WHERE Name = 'Ancient League'), (SELECT TeamID FROM Team WHERE TeamName = 'Trojans United'));
+
+-- fill the materialized player statistics for the sample data
+SELECT rebuild_player_stats();